@@ -1,5 +1,7 @@
 from django.contrib import admin
-from api.models import UxTelemetryEvent
+from django.utils import timezone
+
+from api.models import OutboxEmail, UxTelemetryEvent
 
 
 @admin.register(UxTelemetryEvent)
@@ -16,3 +18,28 @@ class UxTelemetryEventAdmin(admin.ModelAdmin):
     list_filter = ("event_type", "stage", "level", "created_at")
     search_fields = ("user__email", "event_type", "stage", "level")
     ordering = ("-created_at", "-id")
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "created_at",
+        "subject",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "sent_at",
+    )
+    list_filter = ("status", "created_at")
+    search_fields = ("subject", "to", "last_error")
+    ordering = ("-id",)
+    actions = ["requeue"]
+
+    @admin.action(description="Requeue selected emails")
+    def requeue(self, request, queryset):
+        queryset.exclude(status=OutboxEmail.STATUS_SENT).update(
+            status=OutboxEmail.STATUS_PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+        )
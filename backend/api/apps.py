@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from api import profiles
+        from userauths.models import Profile, User
+
+        for model in (User, Profile):
+            post_save.connect(profiles.invalidate, sender=model)
+            post_delete.connect(profiles.invalidate, sender=model)
@@ -0,0 +1,323 @@
+"""Async versions of the high-traffic assessment endpoints.
+
+DRF's ``APIView`` only runs synchronously, so under ASGI every request to it
+holds a thread for its whole lifetime. These views are plain Django async
+views with the same URLs, validation and response bodies as their
+counterparts in ``api.views``. Reads use the async ORM; transactional writes
+reuse the sync helpers from ``api.views`` through ``sync_to_async`` because
+``transaction.atomic`` has no async form.
+
+``urls.py`` routes to these classes when ``ASYNC_VIEWS`` is on, which is how
+the uvicorn profile in ``docs/asgi.md`` runs.
+"""
+
+import functools
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, ParseError
+
+from api import conditional
+from api import fieldsets
+from api import question_bank
+from api import renderers
+from api import scoring
+from api import serializer as api_serializer
+from api import telemetry
+from api import views as api_views
+from api.authentication import CachedJWTAuthentication, aprofile_id_for
+from userauths.models import (
+    Assessment,
+    AssessmentLevelScore,
+    AssessmentQuestion,
+    Choice,
+    Profile,
+)
+
+FORM_CONTENT_TYPES = ("application/x-www-form-urlencoded", "multipart/form-data")
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    return HttpResponse(
+        renderers.dumps(data), status=status, content_type="application/json"
+    )
+
+
+class AsyncAPIView(View):
+    """Authenticated JSON endpoint; the async subset of ``APIView``."""
+
+    authentication = CachedJWTAuthentication()
+    query_budget = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Bearer-token API, exempt like every DRF view.
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            # Honour APIClient.force_authenticate the way DRF's Request does.
+            auth = getattr(request, "_force_auth_user", None)
+            if auth is not None:
+                auth = (auth, getattr(request, "_force_auth_token", None))
+            else:
+                auth = await self.authentication.aauthenticate(request)
+            if auth is None:
+                raise NotAuthenticated()
+            request.user, request.auth = auth
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            return self.handle_exception(request, exc)
+
+    def handle_exception(self, request, exc):
+        data = exc.detail
+        if not isinstance(data, (list, dict)):
+            data = {"detail": data}
+        response = json_response(data, status=exc.status_code)
+        if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+            response["WWW-Authenticate"] = self.authentication.authenticate_header(
+                request
+            )
+        return response
+
+    def parse(self, request):
+        """Return the body as ``APIView`` would with the default parsers."""
+        if request.content_type in FORM_CONTENT_TYPES:
+            return request.POST
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+        if not isinstance(data, dict):
+            raise ParseError("Expected a JSON object.")
+        return data
+
+    def validate(self, serializer_class, data):
+        serializer = serializer_class(data=data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+
+class AssessmentQuestionListView(AsyncAPIView):
+    query_budget = 4
+
+    async def get(self, request, *args, **kwargs):
+        level = request.GET.get("level")
+        version = await question_bank.acurrent_version()
+        etag = conditional.etag("questions", level, version)
+        not_modified = conditional.not_modified(request, etag)
+        if not_modified:
+            return not_modified
+        version, body = await question_bank.aget_level_payload(level, version)
+        response = HttpResponse(body, content_type="application/json")
+        response.precompressed = functools.partial(
+            question_bank.get_encoded_payload, level, version
+        )
+        return conditional.tag(response, etag)
+
+
+class AssessmentResponseSubmitView(AsyncAPIView):
+    query_budget = 9
+
+    async def post(self, request, *args, **kwargs):
+        data = self.parse(request)
+        assessment_id = data.get("assessment")
+        profile_id = data.get("profile")
+        question_id = data.get("question")
+
+        if not all([assessment_id, profile_id, question_id]):
+            return json_response(
+                {"detail": "assessment, profile, and question are required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        assessment = await Assessment.objects.filter(id=assessment_id).afirst()
+        profile = await Profile.objects.filter(id=profile_id).afirst()
+        question = await AssessmentQuestion.objects.filter(
+            id=question_id, is_active=True
+        ).afirst()
+        if not assessment or not profile or not question:
+            return json_response(
+                {"detail": "Invalid assessment, profile, or question."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        selected_choice = None
+        if data.get("selected_choice"):
+            selected_choice = await Choice.objects.filter(
+                id=data["selected_choice"], question=question
+            ).afirst()
+            if not selected_choice:
+                return json_response(
+                    {"detail": "Selected choice is invalid for this question."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        response_id = await sync_to_async(api_views.save_response)(
+            assessment, profile, question, selected_choice, data.get("text_response")
+        )
+        return json_response(
+            {
+                "message": "Response submitted successfully.",
+                "response_id": response_id,
+            }
+        )
+
+
+class AssessmentResponseBulkSubmitView(AsyncAPIView):
+    # Clearing an answer recounts the level: three more queries.
+    query_budget = 11
+
+    async def post(self, request, *args, **kwargs):
+        payload = self.validate(
+            api_serializer.BulkResponseSubmitSerializer, self.parse(request)
+        )
+
+        assessment = (
+            await Assessment.objects.select_related("profile")
+            .filter(id=payload["assessment"])
+            .afirst()
+        )
+        if not assessment:
+            return json_response(
+                {"detail": "Assessment not found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if assessment.profile.user_id != request.user.id:
+            return json_response(
+                {"detail": "You are not allowed to answer this assessment."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        if assessment.completed_at:
+            return json_response(
+                {"detail": "Assessment already completed."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        items = payload["responses"]
+        questions = {
+            question.id: question
+            async for question in AssessmentQuestion.objects.filter(
+                id__in=[item["question"] for item in items],
+                level=assessment.current_level,
+                is_active=True,
+            ).prefetch_related("choices")
+        }
+
+        invalid_questions = [
+            item["question"] for item in items if item["question"] not in questions
+        ]
+        if invalid_questions:
+            return json_response(
+                {
+                    "detail": "Questions do not belong to the current level.",
+                    "invalid_questions": invalid_questions,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rows, invalid_choices = api_views.build_bulk_responses(
+            assessment, questions, items
+        )
+        if invalid_choices:
+            return json_response(
+                {
+                    "detail": "Selected choice is invalid for these questions.",
+                    "invalid_questions": invalid_choices,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        await sync_to_async(api_views.save_bulk_responses)(assessment, questions, rows)
+        return json_response(
+            {"message": "Responses submitted successfully.", "saved": len(rows)}
+        )
+
+
+class AssessmentResultsAPIView(AsyncAPIView):
+    query_budget = 4
+    read_replica = True
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            fields = fieldsets.parse_fields(
+                request.GET.get("fields"),
+                api_views.AssessmentResultsAPIView.item_fields,
+            )
+        except fieldsets.InvalidFields as exc:
+            return json_response(
+                {"detail": f"Unknown field: {exc}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        profile_id = await aprofile_id_for(request.user)
+        if not profile_id:
+            return json_response({"results": []})
+
+        etag = await conditional.aresults_etag(profile_id)
+        not_modified = conditional.not_modified(request, etag)
+        if not_modified:
+            return not_modified
+
+        latest_assessment = (
+            await Assessment.objects.filter(profile_id=profile_id)
+            .order_by("-completed_at", "-started_at", "-id")
+            .afirst()
+        )
+        if not latest_assessment:
+            return conditional.tag(json_response({"results": []}), etag)
+
+        payload = []
+        async for counter in AssessmentLevelScore.objects.filter(
+            assessment=latest_assessment, answered_count__gt=0
+        ).order_by("level"):
+            level_score = scoring.score_from_counter(counter, answered_only=True)
+            row = {
+                "level": counter.level,
+                "score": level_score["score"],
+                "passed": level_score["passed"],
+                "date": level_score["last_submitted_at"],
+                "feedback": None,
+            }
+            payload.append(fieldsets.pick(row, fields))
+        return conditional.tag(json_response({"results": payload}), etag)
+
+
+async def record_telemetry(user, payloads):
+    events = [api_views.build_telemetry_event(user, payload) for payload in payloads]
+    if not await telemetry.arecord_events(events):
+        response = json_response(
+            {"detail": "Telemetry is busy. Retry later."},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+        response["Retry-After"] = "5"
+        return response
+    return json_response(
+        {"status": "accepted", "accepted": len(events)},
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
+class UxTelemetryEventAPIView(AsyncAPIView):
+    query_budget = 2
+
+    async def post(self, request, *args, **kwargs):
+        payload = self.validate(
+            api_serializer.UxTelemetryEventSerializer, self.parse(request)
+        )
+        return await record_telemetry(request.user, [payload])
+
+
+class UxTelemetryEventBatchAPIView(AsyncAPIView):
+    query_budget = 3
+
+    async def post(self, request, *args, **kwargs):
+        payload = self.validate(
+            api_serializer.UxTelemetryEventBatchSerializer, self.parse(request)
+        )
+        return await record_telemetry(request.user, payload["events"])
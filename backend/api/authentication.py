@@ -0,0 +1,128 @@
+"""JWT authentication that avoids loading the user row on hot paths.
+
+Access tokens issued by ``MyTokenObtainPairSerializer`` carry ``profile_id``
+and ``is_staff`` claims, so ``CachedJWTAuthentication`` can build a
+``ClaimsUser`` straight from the token. Tokens issued before those claims
+existed fall back to one lookup per user, kept in a short-TTL per-worker
+cache that holds at most ``AUTH_CLAIMS_CACHE_SIZE`` users, least recently
+used first out. Claims are trusted for the token lifetime, so views that change
+account state keep the default ``JWTAuthentication`` and a real ``User``.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import F
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from api import profiles
+from userauths.models import User
+
+CLAIMS = ("profile_id", "is_staff")
+
+# user_id -> (expires_at, claims), least recently used first
+_claims_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+class ClaimsUser(TokenUser):
+    """A user built from token claims instead of a database row."""
+
+    @cached_property
+    def profile_id(self):
+        return self.token.get("profile_id")
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+    @cached_property
+    def full_name(self):
+        return self.token.get("full_name", "")
+
+
+def profile_id_for(user):
+    """Return the profile id of ``user``, via the profile cache for full user rows."""
+    profile_id = getattr(user, "profile_id", None)
+    if profile_id is None:
+        entry = profiles.get(user.id)
+        profile_id = entry["profile"]["id"] if entry else None
+    return profile_id
+
+
+async def aprofile_id_for(user):
+    """Async ``profile_id_for``."""
+    profile_id = getattr(user, "profile_id", None)
+    if profile_id is None:
+        entry = await profiles.aget(user.id)
+        profile_id = entry["profile"]["id"] if entry else None
+    return profile_id
+
+
+def lookup_claims(user_id):
+    ttl = settings.AUTH_CLAIMS_CACHE_TTL
+    now = time.monotonic()
+    with _lock:
+        cached = _claims_cache.get(user_id)
+        if cached is not None and cached[0] > now:
+            _claims_cache.move_to_end(user_id)
+            return cached[1]
+
+    row = (
+        User.objects.filter(id=user_id)
+        .values("is_active", "is_staff", "is_superuser", "email", "full_name")
+        .annotate(profile_id=F("profile__id"))
+        .first()
+    )
+    if row is not None and ttl > 0:
+        with _lock:
+            _claims_cache[user_id] = (now + ttl, row)
+            _claims_cache.move_to_end(user_id)
+            while len(_claims_cache) > settings.AUTH_CLAIMS_CACHE_SIZE:
+                _claims_cache.popitem(last=False)
+    return row
+
+
+def clear():
+    with _lock:
+        _claims_cache.clear()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        if all(claim in validated_token for claim in CLAIMS):
+            return ClaimsUser(validated_token)
+
+        claims = lookup_claims(user_id)
+        if claims is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if not claims["is_active"]:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return ClaimsUser({**validated_token.payload, **claims})
+
+    async def aauthenticate(self, request):
+        """Async ``authenticate``; only tokens without claims touch the database."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if all(claim in validated_token for claim in CLAIMS):
+            return self.get_user(validated_token), validated_token
+        user = await sync_to_async(self.get_user)(validated_token)
+        return user, validated_token
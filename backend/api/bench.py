@@ -0,0 +1,58 @@
+"""Helpers shared by the ``bench_*`` management commands."""
+
+import contextlib
+import os
+import statistics
+import tempfile
+import time
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from api.stats import percentile
+
+
+@contextlib.contextmanager
+def scratch_database(on_disk=True):
+    """Run the block against a freshly migrated throwaway database.
+
+    SQLite test databases default to ``:memory:``, which hides commit and
+    fsync costs, so ``on_disk`` points the test database at a temp file.
+    """
+    setup_test_environment(debug=False)
+    tmpdir = None
+    if on_disk and connection.vendor == "sqlite":
+        tmpdir = tempfile.mkdtemp(prefix="medpro-bench-")
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = os.path.join(
+            tmpdir, "bench.sqlite3"
+        )
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        if tmpdir:
+            with contextlib.suppress(OSError):
+                os.rmdir(tmpdir)
+
+
+def summarize(samples):
+    return {
+        "count": len(samples),
+        "mean_ms": round(statistics.fmean(samples), 3) if samples else None,
+        "p50_ms": round(percentile(samples, 50), 3) if samples else None,
+        "p95_ms": round(percentile(samples, 95), 3) if samples else None,
+        "p99_ms": round(percentile(samples, 99), 3) if samples else None,
+        "max_ms": round(max(samples), 3) if samples else None,
+    }
+
+
+def measure(fn, repeat):
+    """Call ``fn`` ``repeat`` times and summarize wall-clock milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
@@ -0,0 +1,61 @@
+"""TTL caching with single-flight recomputation.
+
+Entries are stored in the Django cache together with the time they were
+computed. Once an entry is older than its TTL, exactly one caller wins a
+short-lived lock (``cache.add``) and recomputes it while every other caller
+keeps serving the stale value. With a shared cache backend (Redis, Memcached,
+database) this holds across all workers; with the default local-memory backend
+it holds per worker.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.utils import timezone
+
+# How long a stale entry may still be served while it is being recomputed.
+STALE_GRACE_SECONDS = 600
+LOCK_SECONDS = 30
+COLD_WAIT_SECONDS = 5
+
+
+def single_flight(key, ttl, compute, force=False):
+    """Return ``(value, as_of)`` for ``key``, recomputing at most once at a time.
+
+    ``force`` skips the cached value and recomputes immediately.
+    """
+    entry = None if force else cache.get(key)
+    if entry is not None and time.time() - entry["computed_at"] < ttl:
+        return entry["value"], entry["as_of"]
+
+    lock_key = f"{key}:lock"
+    acquired = cache.add(lock_key, True, LOCK_SECONDS)
+    if acquired or force:
+        try:
+            return store(key, ttl, compute())
+        finally:
+            # A forced recompute must not release a lock another caller holds.
+            if acquired:
+                cache.delete(lock_key)
+
+    if entry is not None:
+        return entry["value"], entry["as_of"]
+
+    # Cold cache and someone else is computing: wait for their result.
+    deadline = time.monotonic() + COLD_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry["value"], entry["as_of"]
+    return store(key, ttl, compute())
+
+
+def store(key, ttl, value):
+    as_of = timezone.now()
+    cache.set(
+        key,
+        {"value": value, "as_of": as_of, "computed_at": time.time()},
+        ttl + STALE_GRACE_SECONDS,
+    )
+    return value, as_of
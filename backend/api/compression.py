@@ -0,0 +1,150 @@
+"""Negotiated gzip/brotli compression of responses.
+
+``CompressionMiddleware`` replaces Django's ``GZipMiddleware``. It picks
+brotli when the client accepts it and the ``brotli`` package is installed,
+otherwise gzip. Bodies under ``COMPRESSION_MIN_BYTES``, non-text content
+types and views with ``compress = False`` are sent as they are.
+
+A view that serves the same bytes to everyone can attach a
+``precompressed(encoding)`` callable to its response that returns cached
+compressed bytes. The middleware then uses those bytes instead of
+compressing on every request; the question bank does this.
+
+As with ``GZipMiddleware``, a compressed response gets a weak ETag, and gzip
+bodies carry random padding against BREACH (streamed bodies do not). Token
+endpoints opt out since they return secrets.
+"""
+
+import gzip
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+GZIP_PADDING_BYTES = 100
+
+
+def negotiate(request):
+    """Return ``"br"``, ``"gzip"`` or ``None`` from the Accept-Encoding header."""
+    accepted = {}
+    for item in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    candidates = ("br", "gzip") if brotli is not None else ("gzip",)
+    for coding in candidates:
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+def compress(content, encoding, best=False):
+    """Compress ``content`` at the request-time level, or the smallest with ``best``."""
+    if encoding == "br":
+        quality = 11 if best else settings.COMPRESSION_BROTLI_QUALITY
+        return brotli.compress(content, quality=quality)
+    if best:
+        return gzip.compress(content, compresslevel=9, mtime=0)
+    return compress_string(content, max_random_bytes=GZIP_PADDING_BYTES)
+
+
+class StreamCompressor:
+    """Incremental compressor for streaming responses (gzip without padding)."""
+
+    def __init__(self, encoding):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+            self.process, self.finish = compressor.process, compressor.finish
+        else:
+            # wbits=31 writes a gzip header and trailer.
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+            self.process, self.finish = compressor.compress, compressor.flush
+
+
+def compress_stream(sequence, encoding):
+    compressor = StreamCompressor(encoding)
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_stream(sequence, encoding):
+    compressor = StreamCompressor(encoding)
+    async for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "view_class", None)
+        if not getattr(view_class, "compress", True):
+            request._compress = False
+
+    def process_response(self, request, response):
+        if (
+            not getattr(request, "_compress", True)
+            or response.has_header("Content-Encoding")
+            or not response.get("Content-Type", "").startswith(COMPRESSIBLE_TYPES)
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(
+                    response.streaming_content, encoding
+                )
+            else:
+                response.streaming_content = compress_stream(
+                    response.streaming_content, encoding
+                )
+            del response["Content-Length"]
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_BYTES:
+                return response
+            precompressed = getattr(response, "precompressed", None)
+            if precompressed is not None:
+                content = precompressed(encoding)
+            else:
+                content = compress(response.content, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response["Content-Length"] = str(len(content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,82 @@
+"""ETags from version stamps, for conditional GETs.
+
+A view builds a strong ETag from stamps that change whenever its response
+would, reads them before doing its real work and returns 304 when the
+client's ``If-None-Match`` matches. Nothing is hashed and the body is never
+rendered for a 304.
+
+    etag = conditional.etag("questions", level, version)
+    not_modified = conditional.not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    ...
+    return conditional.tag(response, etag)
+
+Responses are per user, so they are marked private and must be revalidated.
+"""
+
+from django.db.models import Max
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+
+from userauths.models import Assessment
+
+
+def etag(*stamps):
+    return '"{}"'.format("-".join(str(stamp) for stamp in stamps))
+
+
+def not_modified(request, etag):
+    """Return a 304 (or 412) response if ``etag`` meets the preconditions."""
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        tag(response, etag)
+    return response
+
+
+def tag(response, etag):
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ["Authorization"])
+    return response
+
+
+# Results show the newest assessment's level counters. A new assessment
+# raises the max id, completing one raises the max completed_at and every
+# answer sets its level's last_submitted_at to its submitted_at, now. Answers
+# are upserted in place, so response ids alone would miss changed answers.
+def _results_stamps():
+    return {
+        "latest": Max("id"),
+        "completed": Max("completed_at"),
+        "answered": Max("level_scores__last_submitted_at"),
+    }
+
+
+def _results_etag(profile_id, stamps):
+    return etag(
+        "results",
+        profile_id,
+        stamps["latest"] or 0,
+        *(
+            stamps[key].timestamp() if stamps[key] else 0
+            for key in ("completed", "answered")
+        ),
+    )
+
+
+def results_etag(profile_id):
+    stamps = Assessment.objects.filter(profile_id=profile_id).aggregate(
+        **_results_stamps()
+    )
+    return _results_etag(profile_id, stamps)
+
+
+async def aresults_etag(profile_id):
+    stamps = await Assessment.objects.filter(profile_id=profile_id).aaggregate(
+        **_results_stamps()
+    )
+    return _results_etag(profile_id, stamps)
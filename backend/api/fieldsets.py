@@ -0,0 +1,41 @@
+"""Sparse fieldsets: ``?fields=`` selects the keys a response returns.
+
+``fields=assessment_id,level_results`` keeps two top-level keys of each
+item, and ``fields=level_results.score`` keeps only ``score`` inside each
+nested ``level_results`` entry. Without ``fields`` everything is returned.
+Views use the selection to skip the queries and columns behind the keys
+that were left out.
+"""
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def parse_fields(value, schema):
+    """Return ``{field: subfields}`` selected by ``value``, in ``schema`` order.
+
+    ``schema`` maps each top-level field to the tuple of its nested keys, or
+    to ``()`` for a plain value.
+    """
+    if not value:
+        return dict(schema)
+
+    selected = {}
+    for item in value.split(","):
+        name, _, subfield = item.strip().partition(".")
+        if name not in schema or (subfield and subfield not in schema[name]):
+            raise InvalidFields(item.strip())
+        if subfield:
+            selected.setdefault(name, set()).add(subfield)
+        else:
+            selected[name] = set(schema[name])
+    return {
+        name: tuple(key for key in subfields if key in selected[name])
+        for name, subfields in schema.items()
+        if name in selected
+    }
+
+
+def pick(row, keys):
+    return {key: row[key] for key in keys}
@@ -0,0 +1,140 @@
+import json
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client
+
+from api import bench
+from api import compression
+from api.serializer import MyTokenObtainPairSerializer
+from userauths.models import Profile, User
+
+# name -> path under /api/v1/
+ENDPOINTS = {
+    "questions": "assessment/questions/?level=1",
+    "history": "assessment/history/?limit=50",
+    "results": "assessment/results/",
+    "telemetry_summary": "assessment/telemetry-summary/",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Report bytes on the wire and compression CPU per endpoint for "
+        "identity, gzip and brotli. Runs in-process through the full "
+        "middleware stack against a throwaway database filled by "
+        "generate_dataset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument(
+            "--assessments-per-user",
+            type=int,
+            default=20,
+            help="History length of the busiest candidate grows with this.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Compressions timed per endpoint and encoding; the mean is reported.",
+        )
+        parser.add_argument(
+            "--output", help="Write machine-readable results to this JSON file."
+        )
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        encodings = ["gzip"]
+        if compression.brotli is not None:
+            encodings.append("br")
+        else:
+            self.stderr.write("brotli is not installed; measuring gzip only.")
+
+        with bench.scratch_database():
+            call_command(
+                "generate_dataset",
+                users=options["users"],
+                assessments_per_user=options["assessments_per_user"],
+                stdout=StringIO(),
+            )
+            client = self.client_for_busiest_candidate()
+            results = [
+                self.measure(client, name, path, encodings, options["repeat"])
+                for name, path in ENDPOINTS.items()
+            ]
+
+        for result in results:
+            self.report(result, encodings)
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def client_for_busiest_candidate(self):
+        profile = (
+            Profile.objects.annotate(attempts=Count("assessments"))
+            .order_by("-attempts")
+            .first()
+        )
+        # Staff, so the telemetry summary can be measured with the same token.
+        User.objects.filter(pk=profile.user_id).update(is_staff=True)
+        user = User.objects.get(pk=profile.user_id)
+        token = MyTokenObtainPairSerializer.get_token(user).access_token
+        return Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def measure(self, client, name, path, encodings, repeat):
+        url = f"/api/v1/{path}"
+        response = client.get(url, HTTP_ACCEPT_ENCODING="identity")
+        if response.status_code != 200:
+            raise CommandError(f"GET {url} returned {response.status_code}.")
+        body = response.content
+        result = {"endpoint": name, "identity_bytes": len(body)}
+
+        for encoding in encodings:
+            response = client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+            stats = {
+                "bytes": len(response.content),
+                "applied": response.get("Content-Encoding") == encoding,
+                "cpu_ms": None,
+            }
+            precompressed = getattr(response, "precompressed", None)
+            if stats["applied"] and precompressed is not None:
+                # Paid once per bank version; requests only look it up.
+                stats["build_ms"] = self.time(
+                    lambda: compression.compress(body, encoding, best=True), 1
+                )
+                stats["cpu_ms"] = self.time(lambda: precompressed(encoding), repeat)
+            elif stats["applied"]:
+                stats["cpu_ms"] = self.time(
+                    lambda: compression.compress(body, encoding), repeat
+                )
+            result[encoding] = stats
+        return result
+
+    def time(self, func, repeat):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+        return bench.summarize(samples)["mean_ms"]
+
+    def report(self, result, encodings):
+        line = f"{result['endpoint']:<18} identity {result['identity_bytes']:>8} B"
+        for encoding in encodings:
+            stats = result[encoding]
+            ratio = stats["bytes"] / result["identity_bytes"]
+            if not stats["applied"]:
+                note = "below threshold"
+            elif "build_ms" in stats:
+                note = f"{stats['cpu_ms']:.3f}ms, built in {stats['build_ms']:.1f}ms"
+            else:
+                note = f"{stats['cpu_ms']:.3f}ms"
+            line += f"  {encoding} {stats['bytes']:>7} B {ratio:>4.0%} {note}"
+        self.stdout.write(line)
@@ -0,0 +1,222 @@
+import json
+import threading
+import time
+import uuid
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from api import bench
+from api.management.commands.loadtest import PASSWORD
+
+# name -> (method, path, JSON body); each connection cycles through them.
+REQUESTS = {
+    "questions": ("GET", "assessment/questions/?level=1", None),
+    "results": ("GET", "assessment/results/", None),
+    "telemetry": (
+        "POST",
+        "assessment/telemetry/batch/",
+        {"events": [{"event_type": "bench_ping", "stage": "bench"}]},
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Hold increasing numbers of concurrent keep-alive connections against a "
+        "running server and report throughput, latency and errors at each "
+        "level. Run it against the gunicorn (WSGI) and uvicorn (ASGI) profiles "
+        "and compare with --compare; see docs/asgi.md."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            default="http://127.0.0.1:8000/api/v1/",
+            help="API root of the server under test.",
+        )
+        parser.add_argument(
+            "--connections",
+            nargs="+",
+            type=int,
+            default=[10, 50, 100, 200],
+            help="Concurrent connection levels to step through.",
+        )
+        parser.add_argument(
+            "--duration", type=float, default=10.0, help="Seconds per level."
+        )
+        parser.add_argument(
+            "--endpoints",
+            nargs="+",
+            choices=sorted(REQUESTS),
+            default=sorted(REQUESTS),
+            help="Requests each connection cycles through.",
+        )
+        parser.add_argument(
+            "--slo-ms",
+            type=float,
+            default=500.0,
+            help="A level counts towards capacity while p95 stays under this "
+            "and under 1%% of requests fail.",
+        )
+        parser.add_argument("--timeout", type=float, default=10.0)
+        parser.add_argument("--label", default="", help="Name stored with the run.")
+        parser.add_argument(
+            "--output", help="Write machine-readable results to this JSON file."
+        )
+        parser.add_argument(
+            "--compare", help="Print throughput changes against a previous --output."
+        )
+
+    def handle(self, *args, **options):
+        if min(options["connections"]) < 1:
+            raise CommandError("--connections must all be at least 1.")
+
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+
+        base_url = options["base_url"].rstrip("/")
+        token = self.login(base_url, options["timeout"])
+
+        levels = []
+        for connections in options["connections"]:
+            levels.append(self.run_level(base_url, token, connections, options))
+            self.report_level(levels[-1], baseline)
+
+        ok = [level for level in levels if self.within_slo(level, options["slo_ms"])]
+        results = {
+            "label": options["label"],
+            "config": {
+                key: options[key]
+                for key in ("base_url", "duration", "endpoints", "slo_ms")
+            },
+            "capacity_connections": max(
+                (level["connections"] for level in ok), default=0
+            ),
+            "levels": levels,
+        }
+        self.stdout.write(
+            f"Capacity: {results['capacity_connections']} concurrent connections "
+            f"within p95 < {options['slo_ms']:.0f}ms and < 1% errors."
+        )
+
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def login(self, base_url, timeout):
+        email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+        session = requests.Session()
+        try:
+            session.post(
+                f"{base_url}/user/register/",
+                json={
+                    "full_name": email.split("@")[0],
+                    "email": email,
+                    "password": PASSWORD,
+                    "password2": PASSWORD,
+                },
+                timeout=timeout,
+            ).raise_for_status()
+            response = session.post(
+                f"{base_url}/user/token/",
+                json={"email": email, "password": PASSWORD},
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            token = response.json()["access"]
+            # Give the results endpoint an assessment to read.
+            session.post(
+                f"{base_url}/assessment/start/",
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=timeout,
+            ).raise_for_status()
+        except requests.RequestException as exc:
+            raise CommandError(f"Cannot set up a benchmark user: {exc}")
+        return token
+
+    def run_level(self, base_url, token, connections, options):
+        samples = []
+        errors = [0]
+        lock = threading.Lock()
+        ready = threading.Barrier(connections + 1)
+        deadline = [None]
+        plan = [REQUESTS[name] for name in options["endpoints"]]
+
+        def connection():
+            session = requests.Session()
+            session.headers["Authorization"] = f"Bearer {token}"
+            local_samples = []
+            local_errors = 0
+            ready.wait()
+            index = 0
+            while time.perf_counter() < deadline[0]:
+                method, path, body = plan[index % len(plan)]
+                index += 1
+                start = time.perf_counter()
+                try:
+                    response = session.request(
+                        method,
+                        f"{base_url}/{path}",
+                        json=body,
+                        timeout=options["timeout"],
+                    )
+                    failed = response.status_code >= 400
+                except requests.RequestException:
+                    failed = True
+                local_samples.append((time.perf_counter() - start) * 1000)
+                local_errors += int(failed)
+            with lock:
+                samples.extend(local_samples)
+                errors[0] += local_errors
+
+        threads = [
+            threading.Thread(target=connection, daemon=True) for _ in range(connections)
+        ]
+        for thread in threads:
+            thread.start()
+        deadline[0] = time.perf_counter() + options["duration"]
+        ready.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        return {
+            "connections": connections,
+            **bench.summarize(samples),
+            "errors": errors[0],
+            "error_rate": round(errors[0] / len(samples), 4) if samples else None,
+            "throughput_rps": round(len(samples) / elapsed, 3),
+        }
+
+    def within_slo(self, level, slo_ms):
+        return (
+            level["count"] > 0
+            and level["error_rate"] < 0.01
+            and level["p95_ms"] < slo_ms
+        )
+
+    def report_level(self, level, baseline):
+        line = (
+            f"{level['connections']:>5} conns  {level['throughput_rps']:>8.1f} req/s  "
+            f"p50 {level['p50_ms'] or 0:>7.1f}ms  p95 {level['p95_ms'] or 0:>7.1f}ms  "
+            f"p99 {level['p99_ms'] or 0:>7.1f}ms  errors {level['errors']}"
+        )
+        base = {
+            item["connections"]: item for item in (baseline or {}).get("levels", [])
+        }.get(level["connections"])
+        if base and base["throughput_rps"]:
+            change = (
+                (level["throughput_rps"] - base["throughput_rps"])
+                / base["throughput_rps"]
+                * 100
+            )
+            line += f"  req/s vs base {change:+.1f}%"
+        self.stdout.write(line)
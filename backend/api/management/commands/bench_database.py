@@ -0,0 +1,214 @@
+import json
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection
+
+from api import bench
+from api import views as api_views
+from userauths.models import (
+    Assessment,
+    AssessmentLevelScore,
+    AssessmentQuestion,
+    AssessmentResponse,
+    Choice,
+    User,
+)
+
+QUESTIONS = 30
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark mixed read/write throughput of the configured database "
+        "profile with concurrent threads. Runs against a throwaway on-disk "
+        "database; run once per DATABASE_PROFILE and compare with --compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument(
+            "--duration", type=float, default=10.0, help="Seconds to run."
+        )
+        parser.add_argument(
+            "--write-ratio",
+            type=float,
+            default=0.3,
+            help="Share of operations that save an answer; the rest read results.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--label", default="", help="Name stored with the run.")
+        parser.add_argument(
+            "--output", help="Write machine-readable results to this JSON file."
+        )
+        parser.add_argument(
+            "--compare", help="Print throughput changes against a previous --output."
+        )
+
+    def handle(self, *args, **options):
+        if options["threads"] < 1:
+            raise CommandError("--threads must be at least 1.")
+        if not 0 <= options["write_ratio"] <= 1:
+            raise CommandError("--write-ratio must be between 0 and 1.")
+
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+
+        with bench.scratch_database():
+            results = self.run(options)
+        self.report(results, baseline)
+
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def setup(self, threads):
+        AssessmentQuestion.objects.bulk_create(
+            AssessmentQuestion(level="1", type="MC", text=f"Q{index}")
+            for index in range(QUESTIONS)
+        )
+        Choice.objects.bulk_create(
+            Choice(question=question, text=f"C{index}", is_correct=index == 0)
+            for question in AssessmentQuestion.objects.all()
+            for index in range(4)
+        )
+        questions = list(AssessmentQuestion.objects.prefetch_related("choices"))
+
+        assessments = []
+        for index in range(threads):
+            user = User.objects.create(email=f"bench-{index}@example.com")
+            assessment = Assessment.objects.create(profile=user.profile)
+            api_views.prepopulate_level_responses(assessment, "1")
+            assessments.append(assessment)
+        return questions, assessments
+
+    def run(self, options):
+        questions, assessments = self.setup(options["threads"])
+        # Later connections are opened by the worker threads.
+        connection.close()
+
+        reads = []
+        writes = []
+        errors = {"locked": 0, "other": 0}
+        lock = threading.Lock()
+        ready = threading.Barrier(options["threads"] + 1)
+        deadline = [None]
+
+        def worker(index):
+            rng = random.Random(options["seed"] + index)
+            assessment = assessments[index]
+            local_reads = []
+            local_writes = []
+            local_errors = {"locked": 0, "other": 0}
+            ready.wait()
+            while time.perf_counter() < deadline[0]:
+                write = rng.random() < options["write_ratio"]
+                start = time.perf_counter()
+                try:
+                    if write:
+                        question = rng.choice(questions)
+                        api_views.save_response(
+                            assessment,
+                            assessment.profile,
+                            question,
+                            rng.choice(question.choices.all()),
+                            None,
+                        )
+                    else:
+                        list(
+                            AssessmentLevelScore.objects.filter(
+                                assessment_id=assessment.id
+                            )
+                        )
+                        AssessmentResponse.objects.filter(
+                            assessment_id=assessment.id, is_correct=True
+                        ).count()
+                except OperationalError as exc:
+                    key = "locked" if "locked" in str(exc) else "other"
+                    local_errors[key] += 1
+                else:
+                    elapsed = (time.perf_counter() - start) * 1000
+                    (local_writes if write else local_reads).append(elapsed)
+                finally:
+                    # What the end of a request does; honours CONN_MAX_AGE.
+                    close_old_connections()
+            connection.close()
+            with lock:
+                reads.extend(local_reads)
+                writes.extend(local_writes)
+                for key, count in local_errors.items():
+                    errors[key] += count
+
+        threads = [
+            threading.Thread(target=worker, args=(index,), daemon=True)
+            for index in range(options["threads"])
+        ]
+        for thread in threads:
+            thread.start()
+        deadline[0] = time.perf_counter() + options["duration"]
+        ready.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        database = settings.DATABASES["default"]
+        return {
+            "label": options["label"],
+            "config": {
+                "profile": settings.DATABASE_PROFILE,
+                "engine": database["ENGINE"],
+                "conn_max_age": database["CONN_MAX_AGE"],
+                "threads": options["threads"],
+                "duration": options["duration"],
+                "write_ratio": options["write_ratio"],
+            },
+            "throughput_ops": round((len(reads) + len(writes)) / elapsed, 3),
+            "reads": {
+                **bench.summarize(reads),
+                "per_second": round(len(reads) / elapsed, 3),
+            },
+            "writes": {
+                **bench.summarize(writes),
+                "per_second": round(len(writes) / elapsed, 3),
+            },
+            "errors": errors,
+        }
+
+    def report(self, results, baseline):
+        config = results["config"]
+        self.stdout.write(
+            f"Profile {config['profile']} ({config['engine']}, "
+            f"CONN_MAX_AGE={config['conn_max_age']}): {config['threads']} threads, "
+            f"{config['write_ratio']:.0%} writes, {config['duration']}s"
+        )
+        line = f"{results['throughput_ops']:.1f} ops/s"
+        if baseline and baseline.get("throughput_ops"):
+            change = (
+                (results["throughput_ops"] - baseline["throughput_ops"])
+                / baseline["throughput_ops"]
+                * 100
+            )
+            line += f" ({change:+.1f}% vs {baseline.get('label') or 'baseline'})"
+        self.stdout.write(line)
+        for kind in ("reads", "writes"):
+            stats = results[kind]
+            if not stats["count"]:
+                continue
+            self.stdout.write(
+                f"{kind:<7} {stats['per_second']:>8.1f}/s  p50 {stats['p50_ms']:>7.2f}ms  "
+                f"p95 {stats['p95_ms']:>7.2f}ms  p99 {stats['p99_ms']:>7.2f}ms"
+            )
+        self.stdout.write(
+            f"errors  locked {results['errors']['locked']}, "
+            f"other {results['errors']['other']}"
+        )
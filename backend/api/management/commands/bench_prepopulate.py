@@ -0,0 +1,105 @@
+import json
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api import bench
+from api import views as api_views
+from userauths.models import (
+    User,
+    AssessmentQuestion,
+    AssessmentResponse,
+    Assessment,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark assessment start and level advance latency as the question "
+        "bank grows. Runs against a throwaway database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[10, 100, 1000],
+            help="Questions per level to benchmark.",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--json", action="store_true", help="Print machine-readable results."
+        )
+
+    def handle(self, *args, **options):
+        with bench.scratch_database():
+            results = self.run(options["sizes"], options["repeat"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'questions':>10} {'start p50':>10} {'start p95':>10} "
+            f"{'advance p50':>12} {'advance p95':>12}"
+        )
+        for row in results:
+            self.stdout.write(
+                f"{row['questions_per_level']:>10} "
+                f"{row['start']['p50_ms']:>8.2f}ms {row['start']['p95_ms']:>8.2f}ms "
+                f"{row['advance']['p50_ms']:>10.2f}ms {row['advance']['p95_ms']:>10.2f}ms"
+            )
+
+    def run(self, sizes, repeat):
+        factory = APIRequestFactory()
+        user = User.objects.create(email="bench@example.com")
+        start_view = api_views.StartAssessmentAPIView.as_view()
+        submit_view = api_views.SubmitAssessmentAPIView.as_view()
+
+        def start():
+            request = factory.post("/api/v1/assessment/start/", {}, format="json")
+            force_authenticate(request, user=user)
+            response = start_view(request)
+            assert response.status_code == 201, response.data
+            return response.data["assessment_id"]
+
+        def advance(assessment_id):
+            request = factory.post(
+                "/api/v1/assessment/submit/",
+                {"assessment_id": assessment_id},
+                format="json",
+            )
+            force_authenticate(request, user=user)
+            response = submit_view(request)
+            assert response.data.get("next_level") == "2", response.data
+
+        results = []
+        for size in sizes:
+            Assessment.objects.all().delete()
+            AssessmentQuestion.objects.all().delete()
+            AssessmentQuestion.objects.bulk_create(
+                AssessmentQuestion(level=level, type="MC", text=f"Q{level}-{index}")
+                for level in ("1", "2")
+                for index in range(size)
+            )
+
+            start_stats = bench.measure(start, repeat)
+
+            pending = []
+            for _ in range(repeat):
+                assessment_id = start()
+                AssessmentResponse.objects.filter(assessment_id=assessment_id).update(
+                    is_correct=True
+                )
+                pending.append(assessment_id)
+            advance_stats = bench.measure(lambda: advance(pending.pop()), repeat)
+
+            results.append(
+                {
+                    "questions_per_level": size,
+                    "start": start_stats,
+                    "advance": advance_stats,
+                }
+            )
+        return results
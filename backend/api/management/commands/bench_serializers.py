@@ -0,0 +1,148 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api import serializer as api_serializer
+from userauths.models import AssessmentQuestion, Choice, Profile
+
+CHOICES_PER_QUESTION = 4
+
+
+def make_questions(count):
+    """Unsaved questions with prefetched choices; serializing them hits no database."""
+    questions = []
+    for index in range(1, count + 1):
+        question = AssessmentQuestion(
+            id=index, level="1", type="MC", text=f"Question {index} " * 8
+        )
+        question._prefetched_objects_cache = {
+            "choices": [
+                Choice(
+                    id=index * CHOICES_PER_QUESTION + offset,
+                    question_id=index,
+                    text=f"Answer {offset}",
+                    is_correct=offset == 0,
+                )
+                for offset in range(CHOICES_PER_QUESTION)
+            ]
+        }
+        questions.append(question)
+    return questions
+
+
+def make_profiles(count):
+    now = timezone.now()
+    return [
+        Profile(id=index, user_id=index, full_name=f"Candidate {index}", date=now)
+        for index in range(1, count + 1)
+    ]
+
+
+# payload -> (build items, DRF serializer, hand-written serializer)
+PAYLOADS = {
+    "questions": (
+        make_questions,
+        api_serializer.AssessmentQuestionSerializer,
+        api_serializer.question_data,
+    ),
+    "profiles": (
+        make_profiles,
+        api_serializer.ProfileSerializer,
+        api_serializer.profile_data,
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-object serialization and rendering cost of the DRF "
+        "ModelSerializer + JSONRenderer path against the hand-written "
+        "serializers + ORJSONRenderer, at several list sizes. Needs no database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 10000])
+        parser.add_argument(
+            "--payloads",
+            nargs="+",
+            choices=sorted(PAYLOADS),
+            default=sorted(PAYLOADS),
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Runs per measurement; the fastest one is reported.",
+        )
+        parser.add_argument(
+            "--output", help="Write machine-readable results to this JSON file."
+        )
+
+    def handle(self, *args, **options):
+        if min(options["sizes"]) < 1:
+            raise CommandError("--sizes must all be at least 1.")
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        if renderers.orjson is None:
+            self.stderr.write("orjson is not installed; ORJSONRenderer falls back.")
+
+        results = []
+        for payload in options["payloads"]:
+            build, drf_serializer, lean_serializer = PAYLOADS[payload]
+            for size in options["sizes"]:
+                items = build(size)
+                result = self.measure(
+                    items, drf_serializer, lean_serializer, options["repeat"]
+                )
+                result.update(payload=payload, size=size)
+                results.append(result)
+                self.report(result)
+
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def measure(self, items, drf_serializer, lean_serializer, repeat):
+        drf_data = drf_serializer(items, many=True).data
+        lean_data = [lean_serializer(item) for item in items]
+        drf_body = JSONRenderer().render(drf_data)
+        if renderers.dumps(lean_data) != drf_body:
+            raise CommandError("Hand-written output differs from the DRF output.")
+
+        timings = {
+            "drf_serialize": lambda: drf_serializer(items, many=True).data,
+            "lean_serialize": lambda: [lean_serializer(item) for item in items],
+            "drf_render": lambda: JSONRenderer().render(drf_data),
+            "orjson_render": lambda: renderers.ORJSONRenderer().render(lean_data),
+        }
+        per_object = {}
+        for name, func in timings.items():
+            best = min(self.time(func) for _ in range(repeat))
+            per_object[name] = round(best / len(items) * 1e6, 3)
+        per_object["drf_total"] = round(
+            per_object["drf_serialize"] + per_object["drf_render"], 3
+        )
+        per_object["lean_total"] = round(
+            per_object["lean_serialize"] + per_object["orjson_render"], 3
+        )
+        return {"bytes": len(drf_body), "per_object_us": per_object}
+
+    def time(self, func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    def report(self, result):
+        us = result["per_object_us"]
+        self.stdout.write(
+            f"{result['payload']:<10} {result['size']:>6} items  "
+            f"serialize {us['drf_serialize']:>7.2f} -> {us['lean_serialize']:>6.2f}us  "
+            f"render {us['drf_render']:>6.2f} -> {us['orjson_render']:>5.2f}us  "
+            f"total {us['drf_total']:>7.2f} -> {us['lean_total']:>6.2f}us/object "
+            f"({us['drf_total'] / us['lean_total']:.1f}x)"
+        )
@@ -0,0 +1,454 @@
+import contextlib
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api import scoring
+from api.models import UxTelemetryEvent
+from userauths.models import (
+    Assessment,
+    AssessmentLevelScore,
+    AssessmentQuestion,
+    AssessmentResponse,
+    Choice,
+    Profile,
+    Result,
+    User,
+    bump_question_bank_version,
+)
+
+PASSWORD = "Synthetic-Pass-2024!"
+
+# Chance that a candidate walks away partway through a level.
+ABANDON_RATE = 0.08
+# Each level is a little harder than the one before.
+LEVEL_DIFFICULTY = {"1": 0.0, "2": 0.05, "3": 0.1}
+
+
+@contextlib.contextmanager
+def explicit_timestamps(*fields):
+    """Let ``bulk_create`` keep the timestamps we set on ``auto_now_add`` fields."""
+    saved = [(field, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now_add in saved:
+            field.auto_now_add = auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic candidates, assessments, responses, "
+        "results and telemetry for scaling tests. The same --seed and --end "
+        "always produce the same rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument(
+            "--assessments-per-user",
+            type=int,
+            default=2,
+            help="Average attempts per candidate; the actual count varies.",
+        )
+        parser.add_argument(
+            "--questions-per-level",
+            type=int,
+            default=10,
+            help="Questions to create per level when the bank is empty.",
+        )
+        parser.add_argument(
+            "--days", type=int, default=90, help="Spread activity over this window."
+        )
+        parser.add_argument(
+            "--end",
+            help="ISO date the activity window ends on (default: today, UTC).",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--prefix", default="synth")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Candidates generated and inserted per transaction.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["chunk_size"] < 1:
+            raise CommandError("--users and --chunk-size must be at least 1.")
+
+        if options["end"]:
+            try:
+                end = datetime.fromisoformat(options["end"])
+            except ValueError:
+                raise CommandError(f"--end must be an ISO date, got {options['end']}")
+            if end.tzinfo is None:
+                end = end.replace(tzinfo=dt_timezone.utc)
+        else:
+            end = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.window_end = end
+        self.window_start = end - timedelta(days=options["days"])
+        self.window_seconds = options["days"] * 86400
+
+        self.email_prefix = f"{options['prefix']}-{options['seed']}-"
+        if User.objects.filter(email__startswith=self.email_prefix).exists():
+            raise CommandError(
+                f"Users starting with {self.email_prefix} already exist; "
+                "pick another --seed or --prefix."
+            )
+
+        if connection.vendor == "sqlite" and not connection.in_atomic_block:
+            # A bulk load can be rerun from scratch, so skip fsync on commit.
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA synchronous = OFF")
+
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.bank = self.load_bank(options["questions_per_level"])
+        self.password = make_password(PASSWORD)
+        self.empty_details = UxTelemetryEvent._meta.get_field(
+            "details"
+        ).get_db_prep_save({}, connection)
+
+        totals = dict.fromkeys(
+            ["users", "assessments", "responses", "results", "events"], 0
+        )
+        started = time.perf_counter()
+        with explicit_timestamps(
+            Profile._meta.get_field("date"),
+            Assessment._meta.get_field("started_at"),
+        ):
+            for first in range(0, options["users"], options["chunk_size"]):
+                last = min(first + options["chunk_size"], options["users"])
+                with transaction.atomic():
+                    counts = self.generate_chunk(
+                        range(first, last), options["assessments_per_user"]
+                    )
+                for key, value in counts.items():
+                    totals[key] += value
+                self.stdout.write(
+                    f"{last}/{options['users']} candidates, "
+                    f"{totals['responses']} responses, "
+                    f"{time.perf_counter() - started:.1f}s"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Generated {users} users, {assessments} assessments, "
+                "{responses} responses, {results} results and {events} telemetry "
+                "events in {seconds:.1f}s. Run rollup_telemetry to compact the "
+                "new events.".format(seconds=time.perf_counter() - started, **totals)
+            )
+        )
+
+    def load_bank(self, questions_per_level):
+        """Return ``{level: [(question_id, correct_ids, other_ids), ...]}``."""
+        if not AssessmentQuestion.objects.exists():
+            self.create_questions(questions_per_level)
+
+        bank = {level: [] for level in scoring.LEVELS}
+        choices = {}
+        for question_id, choice_id, is_correct in Choice.objects.values_list(
+            "question_id", "id", "is_correct"
+        ).order_by("id"):
+            correct, other = choices.setdefault(question_id, ([], []))
+            (correct if is_correct else other).append(choice_id)
+        for question_id, level in (
+            AssessmentQuestion.objects.filter(is_active=True)
+            .values_list("id", "level")
+            .order_by("id")
+        ):
+            correct, other = choices.get(question_id, ([], []))
+            bank[level].append((question_id, correct, other))
+        return bank
+
+    def create_questions(self, questions_per_level):
+        with transaction.atomic():
+            questions = AssessmentQuestion.objects.bulk_create(
+                AssessmentQuestion(
+                    level=level, type="MC", text=f"Synthetic level {level} #{index}"
+                )
+                for level in scoring.LEVELS
+                for index in range(questions_per_level)
+            )
+            Choice.objects.bulk_create(
+                Choice(
+                    question=question,
+                    text=f"Option {index + 1}",
+                    is_correct=index == 0,
+                )
+                for question in questions
+                for index in range(4)
+            )
+            # Bulk inserts skip the post_save signal that normally does this.
+            bump_question_bank_version()
+
+    def random_time(self):
+        return self.window_start + timedelta(
+            seconds=self.rng.uniform(0, self.window_seconds)
+        )
+
+    def generate_chunk(self, indexes, assessments_per_user):
+        rng = self.rng
+        users = User.objects.bulk_create(
+            [
+                User(
+                    email=f"{self.email_prefix}{index}@example.com",
+                    username=f"{self.email_prefix}{index}",
+                    full_name=f"{self.email_prefix}{index}",
+                    password=self.password,
+                )
+                for index in indexes
+            ],
+            batch_size=self.batch_size,
+        )
+        joined = [self.random_time() for _ in users]
+        # bulk_create skips the post_save signal that creates profiles.
+        profiles = Profile.objects.bulk_create(
+            [
+                Profile(user=user, full_name=user.full_name, date=date)
+                for user, date in zip(users, joined)
+            ],
+            batch_size=self.batch_size,
+        )
+
+        # Plan every attempt first so assessments can be inserted in one go.
+        plans = []
+        for profile, date in zip(profiles, joined):
+            skill = rng.betavariate(5, 2.5)
+            attempts = rng.randint(0, 2 * assessments_per_user)
+            for _ in range(attempts):
+                started_at = date + timedelta(
+                    seconds=rng.uniform(0, (self.window_end - date).total_seconds())
+                )
+                plans.append(self.plan_attempt(profile, skill, started_at))
+
+        assessments = Assessment.objects.bulk_create(
+            [plan["assessment"] for plan in plans], batch_size=self.batch_size
+        )
+
+        # The bulk of the rows skip model instances and go straight to
+        # executemany; building and compiling millions of instances dominates
+        # the run time otherwise.
+        db_time = connection.ops.adapt_datetimefield_value
+        responses = []
+        counters = []
+        events = []
+        latest_results = {}
+        for assessment, plan in zip(assessments, plans):
+            for level in plan["levels"]:
+                responses.extend(
+                    (
+                        assessment.id,
+                        assessment.profile_id,
+                        question_id,
+                        choice_id,
+                        is_correct,
+                        db_time(submitted_at),
+                    )
+                    for question_id, choice_id, is_correct, submitted_at in level[
+                        "answers"
+                    ]
+                )
+                counter = level["counter"]
+                counters.append(
+                    (
+                        assessment.id,
+                        level["level"],
+                        counter["total_count"],
+                        counter["answered_count"],
+                        counter["correct_count"],
+                        db_time(counter["last_submitted_at"]),
+                    )
+                )
+                if level["score"] is not None:
+                    latest_results[(assessment.profile_id, level["level"])] = level[
+                        "score"
+                    ]
+            events.extend(
+                (
+                    plan["user_id"],
+                    event_type,
+                    stage,
+                    level,
+                    assessment.id,
+                    self.empty_details,
+                    db_time(created_at),
+                )
+                for event_type, stage, level, created_at in plan["events"]
+            )
+
+        self.insert_rows(
+            AssessmentResponse,
+            [
+                "assessment",
+                "profile",
+                "question",
+                "selected_choice",
+                "is_correct",
+                "submitted_at",
+            ],
+            responses,
+        )
+        self.insert_rows(
+            AssessmentLevelScore,
+            [
+                "assessment",
+                "level",
+                "total_count",
+                "answered_count",
+                "correct_count",
+                "last_submitted_at",
+            ],
+            counters,
+        )
+        Result.objects.bulk_create(
+            [
+                Result(
+                    profile_id=profile_id,
+                    level=level,
+                    score=score["score"],
+                    passed=score["passed"],
+                )
+                for (profile_id, level), score in latest_results.items()
+            ],
+            batch_size=self.batch_size,
+        )
+        self.insert_rows(
+            UxTelemetryEvent,
+            [
+                "user",
+                "event_type",
+                "stage",
+                "level",
+                "assessment_id",
+                "details",
+                "created_at",
+            ],
+            events,
+        )
+        return {
+            "users": len(users),
+            "assessments": len(assessments),
+            "responses": len(responses),
+            "results": len(latest_results),
+            "events": len(events),
+        }
+
+    def plan_attempt(self, profile, skill, started_at):
+        """Walk one attempt level by level the way the assessment views do."""
+        rng = self.rng
+        clock = started_at
+        levels = []
+        events = [
+            self.event("assessment_ready_viewed", "ready", "1", clock),
+            self.event("assessment_started", "level", "1", clock),
+        ]
+        completed_at = None
+        current_level = "1"
+
+        for level in scoring.LEVELS:
+            current_level = level
+            questions = self.bank[level]
+            abandoned = rng.random() < ABANDON_RATE
+            answer_count = rng.randint(0, len(questions)) if abandoned else None
+            accuracy = max(0.05, skill - LEVEL_DIFFICULTY[level])
+
+            answers = []
+            answered = correct = 0
+            last_submitted_at = None
+            for position, (question_id, right, wrong) in enumerate(questions):
+                clock += timedelta(seconds=rng.uniform(5, 45))
+                if (answer_count is not None and position >= answer_count) or not (
+                    right or wrong
+                ):
+                    answers.append((question_id, None, None, clock))
+                    continue
+                if right and (rng.random() < accuracy or not wrong):
+                    choice_id, is_correct = rng.choice(right), True
+                else:
+                    choice_id, is_correct = rng.choice(wrong), False
+                answers.append((question_id, choice_id, is_correct, clock))
+                answered += 1
+                correct += is_correct
+                last_submitted_at = clock
+
+            score = None
+            if not abandoned:
+                score = scoring.level_score(level, len(questions), correct)
+            levels.append(
+                {
+                    "level": level,
+                    "answers": answers,
+                    "score": score,
+                    "counter": {
+                        "level": level,
+                        "total_count": len(questions),
+                        "answered_count": answered,
+                        "correct_count": correct,
+                        "last_submitted_at": last_submitted_at,
+                    },
+                }
+            )
+            if abandoned:
+                events.append(
+                    self.event("assessment_exit_confirmed", "level", level, clock)
+                )
+                break
+
+            events.append(
+                self.event("assessment_level_submitted", "level", level, clock)
+            )
+            if not score["passed"]:
+                completed_at = clock
+                events.append(self.event("assessment_failed", "result", level, clock))
+                break
+            if level == scoring.LEVELS[-1]:
+                completed_at = clock
+                events.append(
+                    self.event("assessment_completed", "result", level, clock)
+                )
+                break
+            clock += timedelta(seconds=rng.uniform(10, 120))
+            events.append(
+                self.event(
+                    "assessment_transition_auto_advanced", "transition", level, clock
+                )
+            )
+
+        return {
+            "user_id": profile.user_id,
+            "assessment": Assessment(
+                profile=profile,
+                current_level=current_level,
+                started_at=started_at,
+                completed_at=completed_at,
+            ),
+            "levels": levels,
+            "events": events,
+        }
+
+    def event(self, event_type, stage, level, created_at):
+        return (event_type, stage, level, created_at)
+
+    def insert_rows(self, model, fields, rows):
+        quote = connection.ops.quote_name
+        columns = ", ".join(
+            quote(model._meta.get_field(name).column) for name in fields
+        )
+        placeholders = ", ".join(["%s"] * len(fields))
+        sql = (
+            f"INSERT INTO {quote(model._meta.db_table)} ({columns}) "
+            f"VALUES ({placeholders})"
+        )
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), self.batch_size):
+                cursor.executemany(sql, rows[start : start + self.batch_size])
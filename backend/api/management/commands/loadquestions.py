@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api import question_packs
+
+
+class Command(BaseCommand):
+    help = (
+        "Load question packs (JSON or YAML) into the question bank. Safe to re-run: "
+        "only questions whose content changed are written, and active questions "
+        "missing from the packs are retired."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            help="Pack files or directories (default: question_packs/).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without writing anything.",
+        )
+        parser.add_argument(
+            "--no-retire",
+            action="store_true",
+            help="Keep active questions that are not in the given packs.",
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or [settings.BASE_DIR / "question_packs"]
+        try:
+            files = question_packs.pack_files(paths)
+            if not files:
+                raise CommandError("No question packs found.")
+            entries = []
+            for path in files:
+                entries.extend(question_packs.read_pack(path))
+            counts = question_packs.sync_questions(
+                entries,
+                retire=not options["no_retire"],
+                dry_run=options["dry_run"],
+            )
+        except question_packs.PackError as exc:
+            raise CommandError(str(exc))
+
+        prefix = "Would load" if options["dry_run"] else "Loaded"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix} {len(entries)} questions from {len(files)} pack(s): "
+                "{created} created, {updated} updated, {retired} retired, "
+                "{unchanged} unchanged.".format(**counts)
+            )
+        )
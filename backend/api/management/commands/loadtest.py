@@ -0,0 +1,363 @@
+import json
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api import bench
+
+PASSWORD = "Load-Test-Pass-2024!"
+
+ENDPOINTS = [
+    "register",
+    "token",
+    "profile",
+    "start",
+    "questions",
+    "submit-response",
+    "submit",
+    "results",
+    "history",
+    "telemetry",
+]
+
+
+class FlowError(Exception):
+    pass
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {name: [] for name in ENDPOINTS}
+        self.errors = {name: 0 for name in ENDPOINTS}
+        self.lock = threading.Lock()
+
+    def add(self, name, elapsed_ms, ok):
+        with self.lock:
+            self.samples[name].append(elapsed_ms)
+            if not ok:
+                self.errors[name] += 1
+
+
+class Candidate:
+    """One virtual candidate walking through the assessment like the frontend."""
+
+    def __init__(self, base_url, email, recorder, rng, options):
+        self.base_url = base_url.rstrip("/")
+        self.email = email
+        self.recorder = recorder
+        self.rng = rng
+        self.accuracy = options["accuracy"]
+        self.answer_mode = options["answer_mode"]
+        self.timeout = options["timeout"]
+        self.session = requests.Session()
+
+    def call(self, name, method, path, expected=(200,), **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, f"{self.base_url}/{path}", timeout=self.timeout, **kwargs
+            )
+        except requests.RequestException as exc:
+            self.recorder.add(name, (time.perf_counter() - start) * 1000, ok=False)
+            raise FlowError(f"{name}: {exc}") from exc
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        ok = response.status_code in expected
+        data = None
+        if ok and response.content:
+            try:
+                data = response.json()
+            except ValueError:
+                ok = False
+        self.recorder.add(name, elapsed_ms, ok)
+        if not ok:
+            detail = response.reason
+            if "json" in response.headers.get("Content-Type", ""):
+                detail = response.text[:200]
+            raise FlowError(f"{name}: HTTP {response.status_code} {detail}")
+        return data
+
+    def telemetry(self, *event_types, **fields):
+        events = [{"event_type": event_type, **fields} for event_type in event_types]
+        self.call(
+            "telemetry",
+            "POST",
+            "assessment/telemetry/batch/",
+            expected=(201, 202, 503),
+            json={"events": events},
+        )
+
+    def run(self):
+        try:
+            self.walk()
+        finally:
+            # Idle keep-alive sockets would hold server handler threads open.
+            self.session.close()
+
+    def walk(self):
+        self.call(
+            "register",
+            "POST",
+            "user/register/",
+            expected=(201,),
+            json={
+                "full_name": self.email.split("@")[0],
+                "email": self.email,
+                "password": PASSWORD,
+                "password2": PASSWORD,
+            },
+        )
+        tokens = self.call(
+            "token",
+            "POST",
+            "user/token/",
+            json={"email": self.email, "password": PASSWORD},
+        )
+        self.session.headers["Authorization"] = f"Bearer {tokens['access']}"
+        profile = self.call("profile", "GET", "user/profile/")
+
+        self.telemetry("assessment_ready_viewed", stage="ready", level="1")
+        started = self.call("start", "POST", "assessment/start/", expected=(201,))
+        assessment_id = started["assessment_id"]
+
+        level = "1"
+        while level:
+            questions = self.call(
+                "questions", "GET", "assessment/questions/", params={"level": level}
+            )
+            if level == "1":
+                self.telemetry(
+                    "assessment_started",
+                    stage="level",
+                    level=level,
+                    assessment_id=assessment_id,
+                )
+            self.answer(assessment_id, profile["id"], questions)
+            outcome = self.call(
+                "submit",
+                "POST",
+                "assessment/submit/",
+                json={"assessment_id": assessment_id},
+            )
+            finished = []
+            if outcome.get("completed"):
+                finished = [
+                    (
+                        "assessment_completed"
+                        if outcome.get("passed")
+                        else "assessment_failed"
+                    )
+                ]
+            self.telemetry(
+                "assessment_level_submitted",
+                *finished,
+                stage="level",
+                level=level,
+                assessment_id=assessment_id,
+            )
+            level = outcome.get("next_level")
+
+        self.call("results", "GET", "assessment/results/")
+        self.call("history", "GET", "assessment/history/")
+
+    def answer(self, assessment_id, profile_id, questions):
+        picks = []
+        for question in questions:
+            choices = question.get("choices") or []
+            if not choices:
+                picks.append((question["id"], None))
+                continue
+            correct = [choice for choice in choices if choice.get("is_correct")]
+            if correct and self.rng.random() < self.accuracy:
+                picks.append((question["id"], correct[0]["id"]))
+            else:
+                picks.append((question["id"], self.rng.choice(choices)["id"]))
+
+        if self.answer_mode == "bulk":
+            if picks:
+                self.call(
+                    "submit-response",
+                    "POST",
+                    "assessment/submit-response/bulk/",
+                    json={
+                        "assessment": assessment_id,
+                        "responses": [
+                            {"question": question_id, "selected_choice": choice_id}
+                            for question_id, choice_id in picks
+                        ],
+                    },
+                )
+            return
+
+        for question_id, choice_id in picks:
+            self.call(
+                "submit-response",
+                "POST",
+                "assessment/submit-response/",
+                expected=(200, 201),
+                json={
+                    "assessment": assessment_id,
+                    "profile": profile_id,
+                    "question": question_id,
+                    "selected_choice": choice_id,
+                },
+            )
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive concurrent virtual candidates through the full assessment flow "
+        "against a running server and report per-endpoint latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            default="http://127.0.0.1:8000/api/v1/",
+            help="API root of the server under test.",
+        )
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument(
+            "--accuracy",
+            type=float,
+            default=0.8,
+            help="Probability that a candidate picks the correct choice.",
+        )
+        parser.add_argument(
+            "--answer-mode",
+            choices=["bulk", "single"],
+            default="bulk",
+            help="Submit a level's answers in one request, as the frontend "
+            "does, or one request per question.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--timeout", type=float, default=30.0)
+        parser.add_argument("--label", default="", help="Name stored with the run.")
+        parser.add_argument(
+            "--output", help="Write machine-readable results to this JSON file."
+        )
+        parser.add_argument(
+            "--compare", help="Print p95 changes against a previous --output file."
+        )
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--users and --concurrency must be at least 1.")
+
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+
+        results = self.run(options)
+        self.report(results, baseline)
+
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def run(self, options):
+        recorder = Recorder()
+        run_id = uuid.uuid4().hex[:8]
+        candidates = [
+            Candidate(
+                options["base_url"],
+                f"loadtest-{run_id}-{index}@example.com",
+                recorder,
+                random.Random(options["seed"] + index),
+                options,
+            )
+            for index in range(options["users"])
+        ]
+
+        started_at = timezone.now()
+        start = time.perf_counter()
+        failures = []
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            futures = [pool.submit(candidate.run) for candidate in candidates]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except FlowError as exc:
+                    failures.append(str(exc))
+                except Exception as exc:
+                    # A malformed response must not end the run and lose the
+                    # latencies collected so far; count the candidate as failed.
+                    failures.append(f"{type(exc).__name__}: {exc}")
+        duration = time.perf_counter() - start
+
+        for message in failures[:5]:
+            self.stderr.write(message)
+
+        total_requests = sum(len(samples) for samples in recorder.samples.values())
+        endpoints = {}
+        for name in ENDPOINTS:
+            samples = recorder.samples[name]
+            if not samples:
+                continue
+            endpoints[name] = {
+                **bench.summarize(samples),
+                "errors": recorder.errors[name],
+                "throughput_rps": round(len(samples) / duration, 3),
+            }
+
+        return {
+            "label": options["label"],
+            "started_at": started_at.isoformat(),
+            "config": {
+                key: options[key]
+                for key in (
+                    "base_url",
+                    "users",
+                    "concurrency",
+                    "accuracy",
+                    "answer_mode",
+                    "seed",
+                )
+            },
+            "duration_s": round(duration, 3),
+            "requests": total_requests,
+            "throughput_rps": round(total_requests / duration, 3),
+            "candidates": {
+                "completed": len(candidates) - len(failures),
+                "failed": len(failures),
+            },
+            "endpoints": endpoints,
+        }
+
+    def report(self, results, baseline):
+        self.stdout.write(
+            f"{results['candidates']['completed']} of {results['config']['users']} "
+            f"candidates finished in {results['duration_s']}s; "
+            f"{results['requests']} requests at {results['throughput_rps']} req/s"
+        )
+        header = (
+            f"{'endpoint':<16} {'count':>6} {'errors':>6} {'req/s':>8} "
+            f"{'p50':>9} {'p95':>9} {'p99':>9}"
+        )
+        if baseline:
+            header += f" {'p95 vs base':>12}"
+        self.stdout.write(header)
+
+        base_endpoints = (baseline or {}).get("endpoints", {})
+        for name, stats in results["endpoints"].items():
+            line = (
+                f"{name:<16} {stats['count']:>6} {stats['errors']:>6} "
+                f"{stats['throughput_rps']:>8.2f} {stats['p50_ms']:>7.1f}ms "
+                f"{stats['p95_ms']:>7.1f}ms {stats['p99_ms']:>7.1f}ms"
+            )
+            base_p95 = base_endpoints.get(name, {}).get("p95_ms")
+            if baseline and base_p95:
+                change = (stats["p95_ms"] - base_p95) / base_p95 * 100
+                line += f" {change:>+11.1f}%"
+            self.stdout.write(line)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from api import token_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding refresh tokens and their blacklist entries "
+        "in batches. Workers also do this on their own every "
+        "TOKEN_PRUNE_INTERVAL_SECONDS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        pruned = token_index.prune_expired(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Pruned {pruned} expired tokens."))
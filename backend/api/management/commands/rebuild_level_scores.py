@@ -0,0 +1,104 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import scoring
+from userauths.models import Assessment, AssessmentLevelScore
+
+COUNTER_FIELDS = (
+    "total_count",
+    "answered_count",
+    "correct_count",
+    "last_submitted_at",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per-level AssessmentLevelScore counters from raw "
+        "AssessmentResponse rows, or verify them with --verify."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only compare counters with the raw responses; exit 1 on drift.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        assessment_ids = Assessment.objects.order_by("id").values_list("id", flat=True)
+
+        checked = mismatched = 0
+        chunk = []
+        for assessment_id in assessment_ids.iterator(chunk_size=chunk_size):
+            chunk.append(assessment_id)
+            if len(chunk) == chunk_size:
+                checked, mismatched = self.process(chunk, options, checked, mismatched)
+                chunk = []
+        if chunk:
+            checked, mismatched = self.process(chunk, options, checked, mismatched)
+
+        if options["verify"]:
+            if mismatched:
+                raise CommandError(
+                    f"{mismatched} of {checked} level counters are out of date. "
+                    "Run rebuild_level_scores without --verify to repair them."
+                )
+            self.stdout.write(
+                self.style.SUCCESS(f"All {checked} level counters match.")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Rebuilt {checked} level counters ({mismatched} were out of date)."
+                )
+            )
+
+    def process(self, assessment_ids, options, checked, mismatched):
+        expected = scoring.count_level_responses(assessment_ids)
+        stored = {
+            (counter.assessment_id, counter.level): counter
+            for counter in AssessmentLevelScore.objects.filter(
+                assessment_id__in=assessment_ids
+            )
+        }
+
+        stale = []
+        for key in expected.keys() | stored.keys():
+            checked += 1
+            values = expected.get(key)
+            counter = stored.get(key)
+            if (
+                values
+                and counter
+                and all(
+                    getattr(counter, field) == values[field] for field in COUNTER_FIELDS
+                )
+            ):
+                continue
+            mismatched += 1
+            stale.append(key)
+            if options["verify"]:
+                self.stderr.write(
+                    f"Assessment {key[0]} level {key[1]}: stored "
+                    f"{self.describe(counter)}, expected {self.describe(values)}"
+                )
+
+        if stale and not options["verify"]:
+            orphaned = [key for key in stale if key not in expected]
+            for assessment_id, level in orphaned:
+                AssessmentLevelScore.objects.filter(
+                    assessment_id=assessment_id, level=level
+                ).delete()
+            scoring.refresh_level_scores(assessment_ids)
+        return checked, mismatched
+
+    def describe(self, counter):
+        if counter is None:
+            return "nothing"
+        if isinstance(counter, dict):
+            values = [counter[field] for field in COUNTER_FIELDS]
+        else:
+            values = [getattr(counter, field) for field in COUNTER_FIELDS]
+        return "total={} answered={} correct={} last_submitted_at={}".format(*values)
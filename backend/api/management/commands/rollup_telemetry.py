@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Compact raw UxTelemetryEvent rows into hourly and daily rollups. "
+        "Run it from cron every few minutes, or keep it running with "
+        "--interval; the telemetry summary slows down as the un-rolled tail "
+        "grows. Runs once unless --interval is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=50000)
+        parser.add_argument(
+            "--settle-seconds",
+            type=int,
+            default=rollups.DEFAULT_SETTLE_SECONDS,
+            help="Leave events younger than this in the raw tail.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep compacting every this many seconds until interrupted.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                processed = rollups.compact(
+                    chunk_size=options["chunk_size"],
+                    settle_seconds=options["settle_seconds"],
+                )
+                state = rollups.get_state()
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Rolled up {processed} events; watermark is event "
+                        f"{state.last_event_id}."
+                    )
+                )
+                if options["interval"] is None:
+                    break
+                close_old_connections()
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from api import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Send queued outbox emails in batches, retrying failures with backoff. "
+        "Runs until interrupted unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when no email is due.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send everything that is due now, then exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        totals = [0, 0, 0]
+        try:
+            while True:
+                counts = outbox.deliver(batch_size=options["batch_size"])
+                totals = [total + count for total, count in zip(totals, counts)]
+                if any(counts):
+                    self.stdout.write(
+                        "Sent {}, will retry {}, dead {}.".format(*counts)
+                    )
+                    continue
+                if options["once"]:
+                    break
+                close_old_connections()
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Outbox done: {} sent, {} to retry, {} dead.".format(*totals)
+            )
+        )
@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api import replica
+
+SQLITE_ENGINES = ("django.db.backends.sqlite3", "backend.sqlite")
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into the replica configured by "
+        "DATABASE_REPLICA_URL. Copies once unless --interval is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep copying every this many seconds until interrupted.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.REPLICA_DATABASE:
+            raise CommandError("DATABASE_REPLICA_URL is not set.")
+        primary = settings.DATABASES["default"]
+        target = settings.DATABASES[settings.REPLICA_DATABASE]
+        if (
+            primary["ENGINE"] not in SQLITE_ENGINES
+            or target["ENGINE"] not in SQLITE_ENGINES
+        ):
+            raise CommandError(
+                "sync_replica only copies SQLite files; use the database's own "
+                "replication for anything else."
+            )
+
+        try:
+            while True:
+                start = time.perf_counter()
+                replica.copy_sqlite(primary["NAME"], target["NAME"])
+                self.stdout.write(
+                    f"Copied {primary['NAME']} to {target['NAME']} in "
+                    f"{(time.perf_counter() - start) * 1000:.0f}ms."
+                )
+                if options["interval"] is None:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
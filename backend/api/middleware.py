@@ -0,0 +1,228 @@
+"""Per-view SQL and timing instrumentation.
+
+``QueryMetricsMiddleware`` records, for every request routed to a view, the
+number of SQL queries, total database time, the slowest statement, the time
+spent rendering the response and the overall wall time. Samples are kept in a
+bounded per-worker window and exposed through ``QueryMetricsAPIView``.
+
+Views may declare ``query_budget``; a request that runs more queries logs a
+warning, or raises ``QueryBudgetExceeded`` when ``QUERY_BUDGET_STRICT`` is on
+(the default under ``manage.py test``).
+
+Connections are per thread, and under ASGI the ORM runs on a worker thread
+rather than the event loop. The recorder therefore lives in a context
+variable, which ``sync_to_async`` carries into that thread, and a single
+dispatching wrapper is installed on whichever thread's connections run the
+request's queries.
+"""
+
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from api.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_WINDOW = 1000
+SQL_PREVIEW_LENGTH = 500
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_sql = None
+        self.slowest_duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if elapsed >= self.slowest_duration:
+                self.slowest_duration = elapsed
+                self.slowest_sql = sql
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.over_budget = 0
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+        self.slowest_sql = None
+        self.slowest_sql_ms = 0.0
+
+    def add(self, sample, recorder, over_budget):
+        self.requests += 1
+        self.over_budget += int(over_budget)
+        self.samples.append(sample)
+        slowest_ms = recorder.slowest_duration * 1000
+        if recorder.slowest_sql and slowest_ms >= self.slowest_sql_ms:
+            self.slowest_sql_ms = slowest_ms
+            self.slowest_sql = recorder.slowest_sql[:SQL_PREVIEW_LENGTH]
+
+    def summary(self):
+        samples = list(self.samples)
+
+        def stats(field):
+            values = [sample[field] for sample in samples]
+            return {
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+                "max": max(values) if values else None,
+            }
+
+        return {
+            "requests": self.requests,
+            "over_budget": self.over_budget,
+            "total_ms": stats("total_ms"),
+            "db_ms": stats("db_ms"),
+            "queries": stats("queries"),
+            "serialization_ms": stats("serialization_ms"),
+            "slowest_sql": {"sql": self.slowest_sql, "ms": self.slowest_sql_ms},
+        }
+
+
+_metrics = {}
+_budgets = {}
+_lock = threading.Lock()
+
+
+def snapshot():
+    with _lock:
+        return {
+            name: {**metrics.summary(), "query_budget": _budgets.get(name)}
+            for name, metrics in sorted(_metrics.items())
+        }
+
+
+def reset():
+    with _lock:
+        _metrics.clear()
+
+
+_recorder = contextvars.ContextVar("query_recorder", default=None)
+
+
+def _dispatch(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install():
+    """Attach the dispatching wrapper to this thread's connections."""
+    for connection in connections.all():
+        if _dispatch not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_dispatch)
+
+
+@contextlib.contextmanager
+def recording(recorder):
+    install()
+    token = _recorder.set(recorder)
+    try:
+        yield
+    finally:
+        _recorder.reset(token)
+
+
+def record(name, sample, recorder, budget):
+    over_budget = budget is not None and sample["queries"] > budget
+    with _lock:
+        _budgets[name] = budget
+        _metrics.setdefault(name, ViewMetrics()).add(sample, recorder, over_budget)
+    return over_budget
+
+
+class QueryMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, "QUERY_METRICS_ENABLED", True):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        request._query_metrics = {"serialization": 0.0}
+        start = time.perf_counter()
+        with recording(recorder):
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if not getattr(settings, "QUERY_METRICS_ENABLED", True):
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        request._query_metrics = {"serialization": 0.0}
+        start = time.perf_counter()
+        with recording(recorder):
+            # Async ORM calls and sync_to_async views run on the request's
+            # thread-sensitive worker thread, so its connections need the
+            # wrapper too.
+            await sync_to_async(install)()
+            response = await self.get_response(request)
+        return self.finish(request, response, recorder, time.perf_counter() - start)
+
+    def finish(self, request, response, recorder, total):
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return response
+
+        view_class = getattr(match.func, "view_class", None)
+        name = view_class.__name__ if view_class else match.view_name
+        budget = getattr(view_class, "query_budget", None)
+        sample = {
+            "total_ms": round(total * 1000, 3),
+            "db_ms": round(recorder.duration * 1000, 3),
+            "queries": recorder.count,
+            "serialization_ms": round(
+                request._query_metrics["serialization"] * 1000, 3
+            ),
+        }
+        if record(name, sample, recorder, budget):
+            message = (
+                f"{name} ran {recorder.count} queries, over its budget of {budget}. "
+                f"Slowest: {recorder.slowest_sql}"
+            )
+            if getattr(settings, "QUERY_BUDGET_STRICT", False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook returns.
+        metrics = getattr(request, "_query_metrics", None)
+        if metrics is not None:
+            start = time.perf_counter()
+
+            def finished(rendered):
+                metrics["serialization"] += time.perf_counter() - start
+
+            response.add_post_render_callback(finished)
+        return response
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('userauths', '0009_assessmentlevelscore'),
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UxTelemetryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('bucket_start', models.DateTimeField()),
+                ('event_type', models.CharField(max_length=100)),
+                ('stage', models.CharField(blank=True, max_length=30)),
+                ('level', models.CharField(blank=True, max_length=10)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-bucket_start', 'event_type'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UxTelemetryRollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_event_id', models.BigIntegerField(default=0)),
+                ('gap_ids', models.JSONField(blank=True, default=list)),
+                ('daily_through', models.DateTimeField(blank=True, null=True)),
+                ('last_event_at', models.DateTimeField(blank=True, null=True)),
+                ('rolled_up_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UxTelemetryRollupUser',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ux_telemetry_rollup', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('first_seen_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='uxtelemetryrollup',
+            constraint=models.UniqueConstraint(fields=('period', 'bucket_start', 'event_type', 'stage', 'level'), name='unique_ux_telemetry_rollup_bucket'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class UxTelemetryEvent(models.Model):
@@ -21,3 +22,102 @@ class UxTelemetryEvent(models.Model):
 
     def __str__(self):
         return f"{self.event_type} by user {self.user_id} at {self.created_at}"
+
+
+class UxTelemetryRollup(models.Model):
+    """Event counts per time bucket, compacted from ``UxTelemetryEvent``."""
+
+    PERIOD_HOUR = "hour"
+    PERIOD_DAY = "day"
+    PERIOD_CHOICES = [(PERIOD_HOUR, "Hour"), (PERIOD_DAY, "Day")]
+
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    bucket_start = models.DateTimeField()
+    event_type = models.CharField(max_length=100)
+    stage = models.CharField(max_length=30, blank=True)
+    level = models.CharField(max_length=10, blank=True)
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-bucket_start", "event_type"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["period", "bucket_start", "event_type", "stage", "level"],
+                name="unique_ux_telemetry_rollup_bucket",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} x{self.count} ({self.period} of {self.bucket_start})"
+
+
+class UxTelemetryRollupUser(models.Model):
+    """Users seen in events that have already been rolled up."""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="ux_telemetry_rollup",
+    )
+    first_seen_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"user {self.user_id} since {self.first_seen_at}"
+
+
+class UxTelemetryRollupState(models.Model):
+    """Single-row watermark: events with ``id <= last_event_id`` are rolled up.
+
+    ``gap_ids`` holds ``[id, seen_at]`` pairs for ids below the watermark that
+    were missing when their range was rolled up. Hourly rollups before
+    ``daily_through`` have been summed into daily rows.
+    """
+
+    last_event_id = models.BigIntegerField(default=0)
+    gap_ids = models.JSONField(default=list, blank=True)
+    daily_through = models.DateTimeField(null=True, blank=True)
+    last_event_at = models.DateTimeField(null=True, blank=True)
+    rolled_up_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Telemetry rolled up to event {self.last_event_id}"
+
+
+class OutboxEmail(models.Model):
+    """An email queued in the request transaction and sent by ``send_outbox``."""
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_DEAD = "dead"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_DEAD, "Dead"),
+    ]
+
+    to = models.JSONField(default=list)
+    from_email = models.CharField(max_length=254, blank=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(
+        max_length=7, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="api_outbox_due_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)} ({self.status})"
@@ -0,0 +1,125 @@
+"""Transactional email outbox.
+
+Views call ``enqueue`` inside their transaction instead of talking to the mail
+provider, so a request only pays for one INSERT and no email is sent for a
+rolled-back request. The ``send_outbox`` command calls ``deliver`` to send due
+messages in batches over one backend connection, which for the Mailgun
+backend means one reused HTTP session per batch. Failed messages are retried
+with exponential backoff until ``OUTBOX_MAX_ATTEMPTS``, after which they are
+marked dead and left in the table for inspection.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(to, subject, body, html_body="", from_email=None):
+    """Queue an email; it is sent only if the surrounding transaction commits."""
+    if isinstance(to, str):
+        to = [to]
+    return OutboxEmail.objects.create(
+        to=list(to),
+        from_email=from_email or settings.FROM_EMAIL or "",
+        subject=subject,
+        body=body,
+        html_body=html_body,
+    )
+
+
+def retry_delay(attempts):
+    delay = settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(delay, settings.OUTBOX_RETRY_MAX_SECONDS))
+
+
+def claim(batch_size, now=None):
+    """Lease up to ``batch_size`` due messages to this worker.
+
+    Claimed rows have ``next_attempt_at`` pushed past the lease, so a worker
+    that dies mid-batch leaves them to be retried rather than lost.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        rows = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if rows:
+            OutboxEmail.objects.filter(id__in=[row.id for row in rows]).update(
+                next_attempt_at=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+            )
+    return rows
+
+
+def build_message(row, connection):
+    message = EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.body,
+        from_email=row.from_email or None,
+        to=row.to,
+        connection=connection,
+    )
+    if row.html_body:
+        message.attach_alternative(row.html_body, "text/html")
+    return message
+
+
+def deliver(batch_size=100, connection=None):
+    """Send one batch of due messages; return ``(sent, retried, dead)`` counts."""
+    rows = claim(batch_size)
+    if not rows:
+        return 0, 0, 0
+
+    connection = connection or get_connection(fail_silently=False)
+    sent = []
+    failed = []
+    try:
+        with connection:
+            for row in rows:
+                try:
+                    if not build_message(row, connection).send():
+                        raise RuntimeError("The email backend sent nothing.")
+                except Exception as exc:
+                    failed.append((row, exc))
+                else:
+                    sent.append(row)
+    except Exception as exc:
+        # Opening or closing the connection failed; retry whatever is left.
+        done = {row.id for row in sent} | {row.id for row, _ in failed}
+        failed.extend((row, exc) for row in rows if row.id not in done)
+
+    now = timezone.now()
+    for row in sent:
+        row.status = OutboxEmail.STATUS_SENT
+        row.attempts += 1
+        row.sent_at = now
+        row.last_error = ""
+    dead = 0
+    for row, exc in failed:
+        row.attempts += 1
+        row.last_error = f"{type(exc).__name__}: {exc}"[:2000]
+        if row.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            row.status = OutboxEmail.STATUS_DEAD
+            dead += 1
+            logger.error(
+                "Outbox email %s dead after %s attempts: %s",
+                row.id,
+                row.attempts,
+                row.last_error,
+            )
+        else:
+            row.next_attempt_at = now + retry_delay(row.attempts)
+
+    OutboxEmail.objects.bulk_update(
+        rows, ["status", "attempts", "next_attempt_at", "last_error", "sent_at"]
+    )
+    return len(sent), len(failed) - dead, dead
@@ -0,0 +1,69 @@
+"""Keyset (cursor) pagination helpers.
+
+Cursors encode the ``(timestamp, id)`` of the last row on a page, so each page
+is an indexed range scan instead of an OFFSET that grows with history size.
+"""
+
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(timestamp, pk):
+    raw = f"{timestamp.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        timestamp, pk = raw.split("|", 1)
+        parsed = parse_datetime(timestamp)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(cursor)
+    if parsed is None:
+        raise InvalidCursor(cursor)
+    return parsed, pk
+
+
+def parse_limit(value, default, maximum):
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+def keyset_filter(queryset, field, cursor):
+    """Order ``queryset`` by ``-field, -id`` and skip the rows up to ``cursor``."""
+    queryset = queryset.order_by(f"-{field}", "-id")
+    if cursor:
+        timestamp, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f"{field}__lt": timestamp}) | Q(**{field: timestamp, "id__lt": pk})
+        )
+    return queryset
+
+
+def keyset_page(queryset, field, cursor, limit):
+    """Return ``(rows, next_cursor)`` for ``queryset`` ordered by ``-field, -id``.
+
+    ``cursor`` is a value previously returned as ``next_cursor`` (or ``None``
+    for the first page).
+    """
+    queryset = keyset_filter(queryset, field, cursor)
+    rows = list(queryset[: limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return rows, next_cursor
@@ -0,0 +1,82 @@
+"""Per-user cache of the current user and profile payloads.
+
+``get(user_id)`` returns ``{"user": ..., "profile": ...}``, the bodies of
+``UserMeAPIView`` and ``UserProfileView``, from the Django cache, loading
+both rows in one query on a miss. ``for_request`` memoizes the entry on the
+request, so a request resolves its profile at most once however many
+helpers ask. Saving or deleting a ``User`` or ``Profile`` drops the entry;
+bulk updates skip signals and must call ``invalidate_user`` themselves.
+
+Invalidation reaches every worker only with a shared cache backend; with
+the default local-memory cache other workers catch up after
+``PROFILE_CACHE_TTL``.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from api import serializer as api_serializer
+from userauths.models import Profile, User
+
+
+def cache_key(user_id):
+    return f"profile:{user_id}"
+
+
+def load(user_id):
+    profile = Profile.objects.select_related("user").filter(user_id=user_id).first()
+    if profile is None:
+        return None
+    user = profile.user
+    return {
+        "user": {
+            "id": user.id,
+            "email": user.email,
+            "full_name": user.full_name,
+            "is_staff": user.is_staff,
+        },
+        "profile": api_serializer.profile_data(profile),
+    }
+
+
+def get(user_id):
+    key = cache_key(user_id)
+    entry = cache.get(key)
+    if entry is None:
+        entry = load(user_id)
+        if entry is not None:
+            cache.set(key, entry, settings.PROFILE_CACHE_TTL)
+    return entry
+
+
+async def aget(user_id):
+    entry = await cache.aget(cache_key(user_id))
+    if entry is None:
+        entry = await sync_to_async(get)(user_id)
+    return entry
+
+
+def for_request(request):
+    """Return ``get()`` for the request's user, resolved once per request."""
+    # DRF wraps the Django request; memoize on the one both of them share.
+    http_request = getattr(request, "_request", request)
+    try:
+        return http_request._profile_entry
+    except AttributeError:
+        entry = get(request.user.id)
+        http_request._profile_entry = entry
+        return entry
+
+
+def invalidate_user(user_id):
+    key = cache_key(user_id)
+    cache.delete(key)
+    # Again after commit, in case a concurrent request cached the old rows
+    # before this transaction became visible.
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def invalidate(sender, instance, **kwargs):
+    invalidate_user(instance.pk if sender is User else instance.user_id)
@@ -0,0 +1,108 @@
+"""Per-worker cache of the rendered question bank.
+
+The bank is identical for every candidate, so each worker renders a level's
+questions once and keeps the JSON bytes keyed by the shared
+``QuestionBankVersion`` stamp. A request costs one single-row version read
+plus a dictionary lookup; any question or choice edit bumps the stamp and
+every worker re-renders on its next request.
+"""
+
+import threading
+
+from asgiref.sync import sync_to_async
+
+from api import compression
+from api import renderers
+from api import serializer as api_serializer
+from userauths.models import AssessmentQuestion, QuestionBankVersion, QuestionLevel
+
+EMPTY_PAYLOAD = b"[]"
+
+# level -> (version, rendered bytes)
+_payloads = {}
+# (level, encoding) -> (version, compressed bytes)
+_encoded = {}
+_lock = threading.Lock()
+
+
+def current_version():
+    version = (
+        QuestionBankVersion.objects.filter(pk=1)
+        .values_list("version", flat=True)
+        .first()
+    )
+    return version or 0
+
+
+def render_level(level):
+    questions = (
+        AssessmentQuestion.objects.filter(level=level, is_active=True)
+        .prefetch_related("choices")
+        .order_by("id")
+    )
+    return renderers.dumps([api_serializer.question_data(q) for q in questions])
+
+
+async def acurrent_version():
+    version = (
+        await QuestionBankVersion.objects.filter(pk=1)
+        .values_list("version", flat=True)
+        .afirst()
+    )
+    return version or 0
+
+
+def get_level_payload(level, version=None):
+    """Return ``(version, json_bytes)`` for the questions of ``level``.
+
+    Pass ``version`` when the caller has already read it, e.g. for an ETag.
+    """
+    if version is None:
+        version = current_version()
+    if level not in QuestionLevel.values:
+        return version, EMPTY_PAYLOAD
+
+    cached = _payloads.get(level)
+    if cached is not None and cached[0] == version:
+        return cached
+
+    with _lock:
+        cached = _payloads.get(level)
+        if cached is None or cached[0] != version:
+            cached = (version, render_level(level))
+            _payloads[level] = cached
+    return cached
+
+
+async def aget_level_payload(level, version=None):
+    """Async ``get_level_payload``; only a stale level re-renders off the loop."""
+    if version is None:
+        version = await acurrent_version()
+    cached = _payloads.get(level)
+    if level in QuestionLevel.values and (cached is None or cached[0] != version):
+        return await sync_to_async(get_level_payload)(level, version)
+    if cached is None:
+        return version, EMPTY_PAYLOAD
+    return cached
+
+
+def get_encoded_payload(level, version, encoding):
+    """Return the ``level`` payload at ``version`` compressed with ``encoding``.
+
+    Compressed once per version at the best ratio, for
+    ``CompressionMiddleware`` to serve as is.
+    """
+    key = (level, encoding)
+    cached = _encoded.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    _, body = get_level_payload(level, version)
+    cached = (version, compression.compress(body, encoding, best=True))
+    _encoded[key] = cached
+    return cached[1]
+
+
+def clear():
+    _payloads.clear()
+    _encoded.clear()
@@ -0,0 +1,258 @@
+"""Load question packs into the question bank.
+
+A pack is a JSON or YAML file of questions::
+
+    {"questions": [{"key": "level1-01", "level": "1", "type": "MC",
+                    "text": "...", "choices": [{"text": "...",
+                                                "is_correct": true}]}]}
+
+``sync_questions`` diffs the packs against the bank by content hash and
+applies inserts, updates and retirements with bulk queries in a single
+transaction, so loading the same packs again changes nothing. Questions are
+matched by ``key`` when the entry has one and by content hash otherwise.
+Retired questions are deactivated rather than deleted so past responses keep
+their question. Choices are never rewritten: a question whose choices change
+is retired and loaded again as a new question, so past responses keep the
+choices they were scored against.
+"""
+
+import hashlib
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from django.db import transaction
+
+from userauths.models import (
+    AssessmentQuestion,
+    Choice,
+    QuestionLevel,
+    QuestionType,
+    bump_question_bank_version,
+)
+
+PACK_SUFFIXES = (".json", ".yaml", ".yml")
+BATCH_SIZE = 1000
+
+
+class PackError(ValueError):
+    pass
+
+
+def content_hash(level, type, text, choices):
+    """Fingerprint of a question; ``choices`` is a list of ``(text, is_correct)``."""
+    payload = json.dumps(
+        [level, type, text, [[choice, bool(correct)] for choice, correct in choices]],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def pack_files(paths):
+    """Expand directories into the pack files they contain, in name order."""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(
+                sorted(
+                    child
+                    for child in path.iterdir()
+                    if child.suffix.lower() in PACK_SUFFIXES
+                )
+            )
+        elif path.exists():
+            files.append(path)
+        else:
+            raise PackError(f"{path} does not exist.")
+    return files
+
+
+def read_pack(path):
+    path = Path(path)
+    with path.open(encoding="utf-8") as handle:
+        if path.suffix.lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise PackError(f"PyYAML is required to read {path}.")
+            data = yaml.safe_load(handle)
+        else:
+            data = json.load(handle)
+    if isinstance(data, dict):
+        data = data.get("questions")
+    if not isinstance(data, list):
+        raise PackError(f"{path} must contain a list of questions.")
+    return [parse_entry(entry, f"{path}[{index}]") for index, entry in enumerate(data)]
+
+
+def parse_entry(entry, where):
+    if not isinstance(entry, dict):
+        raise PackError(f"{where}: expected an object.")
+    level = str(entry.get("level", ""))
+    type = entry.get("type", QuestionType.MULTIPLE_CHOICE)
+    text = (entry.get("text") or "").strip()
+    key = entry.get("key") or None
+    if level not in QuestionLevel.values:
+        raise PackError(f"{where}: level must be one of {QuestionLevel.values}.")
+    if type not in QuestionType.values:
+        raise PackError(f"{where}: type must be one of {QuestionType.values}.")
+    if not text:
+        raise PackError(f"{where}: text is required.")
+
+    choices = [
+        ((choice.get("text") or "").strip(), bool(choice.get("is_correct")))
+        for choice in entry.get("choices") or []
+    ]
+    if any(not choice for choice, _ in choices):
+        raise PackError(f"{where}: every choice needs text.")
+    if type == QuestionType.MULTIPLE_CHOICE and not any(
+        correct for _, correct in choices
+    ):
+        raise PackError(f"{where}: multiple choice questions need a correct choice.")
+
+    return {
+        "key": str(key) if key is not None else None,
+        "level": level,
+        "type": type,
+        "text": text,
+        "choices": choices,
+        "content_hash": content_hash(level, type, text, choices),
+        "where": where,
+    }
+
+
+def load_bank():
+    """Return the current bank as pack-shaped dicts with their row ids."""
+    choices = defaultdict(list)
+    for question_id, text, is_correct in Choice.objects.values_list(
+        "question_id", "text", "is_correct"
+    ).order_by("id"):
+        choices[question_id].append((text, is_correct))
+
+    bank = []
+    for row in AssessmentQuestion.objects.values(
+        "id", "key", "level", "type", "text", "content_hash", "is_active"
+    ).order_by("id"):
+        row["choices"] = choices.get(row["id"], [])
+        row["current_hash"] = content_hash(
+            row["level"], row["type"], row["text"], row["choices"]
+        )
+        bank.append(row)
+    return bank
+
+
+def sync_questions(entries, retire=True, dry_run=False):
+    """Make the bank match ``entries``; return counts of what changed."""
+    seen = {}
+    for entry in entries:
+        identity = entry["key"] or entry["content_hash"]
+        if identity in seen:
+            raise PackError(
+                f"{entry['where']} duplicates {seen[identity]} "
+                f"({'key ' + entry['key'] if entry['key'] else 'same content'})."
+            )
+        seen[identity] = entry["where"]
+
+    with transaction.atomic():
+        bank = load_bank()
+        by_key = {row["key"]: row for row in bank if row["key"]}
+        by_hash = defaultdict(list)
+        # Prefer active rows, then the oldest, when several share content.
+        for row in sorted(bank, key=lambda row: (not row["is_active"], row["id"])):
+            if not row["key"]:
+                by_hash[row["current_hash"]].append(row)
+
+        to_create = []
+        to_update = []
+        replaced = []
+        matched = set()
+        for entry in entries:
+            row = by_key.get(entry["key"]) if entry["key"] else None
+            if row is None and by_hash[entry["content_hash"]]:
+                row = by_hash[entry["content_hash"]].pop(0)
+            if row is None:
+                to_create.append(entry)
+                continue
+
+            matched.add(row["id"])
+            if row["choices"] != entry["choices"]:
+                replaced.append(row["id"])
+                to_create.append(entry)
+                continue
+            if (
+                row["current_hash"] != entry["content_hash"]
+                or row["content_hash"] != entry["content_hash"]
+                or row["key"] != entry["key"]
+                or not row["is_active"]
+            ):
+                to_update.append(
+                    AssessmentQuestion(
+                        id=row["id"],
+                        key=entry["key"],
+                        level=entry["level"],
+                        type=entry["type"],
+                        text=entry["text"],
+                        content_hash=entry["content_hash"],
+                        is_active=True,
+                    )
+                )
+
+        to_retire = [
+            row["id"]
+            for row in bank
+            if retire and row["is_active"] and row["id"] not in matched
+        ]
+
+        # Free the keys of replaced questions before their copies claim them.
+        for start in range(0, len(replaced), BATCH_SIZE):
+            AssessmentQuestion.objects.filter(
+                id__in=replaced[start : start + BATCH_SIZE]
+            ).update(is_active=False, key=None)
+        AssessmentQuestion.objects.bulk_update(
+            to_update,
+            ["key", "level", "type", "text", "content_hash", "is_active"],
+            batch_size=BATCH_SIZE,
+        )
+        created = AssessmentQuestion.objects.bulk_create(
+            [
+                AssessmentQuestion(
+                    key=entry["key"],
+                    level=entry["level"],
+                    type=entry["type"],
+                    text=entry["text"],
+                    content_hash=entry["content_hash"],
+                )
+                for entry in to_create
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        Choice.objects.bulk_create(
+            [
+                Choice(question=question, text=text, is_correct=is_correct)
+                for question, entry in zip(created, to_create)
+                for text, is_correct in entry["choices"]
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        for start in range(0, len(to_retire), BATCH_SIZE):
+            AssessmentQuestion.objects.filter(
+                id__in=to_retire[start : start + BATCH_SIZE]
+            ).update(is_active=False)
+
+        changed = bool(to_create or to_update or to_retire)
+        if changed:
+            # Bulk queries skip the post_save signal that normally does this.
+            bump_question_bank_version()
+        if dry_run:
+            transaction.set_rollback(True)
+
+    # A replaced question counts as updated, not as created and retired.
+    new = len(to_create) - len(replaced)
+    updated = len(to_update) + len(replaced)
+    return {
+        "created": new,
+        "updated": updated,
+        "retired": len(to_retire),
+        "unchanged": len(entries) - new - updated,
+    }
@@ -0,0 +1,53 @@
+"""JSON rendering with orjson when it is installed.
+
+``ORJSONRenderer`` produces the same bytes as DRF's compact ``JSONRenderer``
+for the data our views return, several times faster. Types orjson does not
+know are handed to DRF's encoder, and it falls back to ``JSONRenderer``
+itself when orjson is missing, when the client asks for indented output or
+when orjson cannot encode the data (e.g. integers over 64 bits).
+"""
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# DRF escapes these so the output is also valid JavaScript; orjson does not.
+LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+_default = JSONEncoder().default
+
+
+def dumps(data):
+    """Encode ``data`` to compact JSON bytes the way ``ORJSONRenderer`` does."""
+    if orjson is not None:
+        try:
+            return _escape(
+                orjson.dumps(
+                    data,
+                    default=_default,
+                    option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+                )
+            )
+        except orjson.JSONEncodeError:
+            pass
+    return JSONRenderer().render(data)
+
+
+def _escape(content):
+    for raw, escaped in LINE_SEPARATORS:
+        if raw in content:
+            content = content.replace(raw, escaped)
+    return content
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
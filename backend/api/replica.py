@@ -0,0 +1,154 @@
+"""Send heavy read-only views to a read replica.
+
+``ReplicaRouter`` routes reads to ``settings.REPLICA_DATABASE`` only while
+``ReplicaMiddleware`` is handling a request for a designated view, meaning a
+view class with ``read_replica = True`` or an admin changelist. Every other
+read and all writes stay on ``default``, and so do sessions, permissions and
+user rows, which authentication loads.
+
+A user who has just written may not see their write on a lagging replica.
+After any successful unsafe request, the middleware pins the user to the
+primary for ``REPLICA_STICKY_SECONDS``. It checks the pin in ``process_view``
+and leaves the router a plain flag, so routing never evaluates
+``request.user``, whose lazy load would itself be routed. The pin lives in
+the Django cache, so it holds across workers only with a shared cache
+backend.
+
+For local testing with SQLite, ``copy_sqlite`` (``manage.py sync_replica``)
+copies the primary file into the replica file.
+"""
+
+import contextlib
+import contextvars
+import sqlite3
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+# Apps whose reads stay on the primary, as authentication depends on them.
+PRIMARY_APPS = ("auth", "sessions")
+
+_request = contextvars.ContextVar("replica_request", default=None)
+
+
+def pin_key(user_id):
+    return f"replica-pin:{user_id}"
+
+
+def _user_id(request):
+    return getattr(getattr(request, "user", None), "id", None)
+
+
+def _viewer_id(request):
+    """Return the id of the user the view will authenticate.
+
+    API views authenticate inside the view, after ``process_view``. The user
+    id claim of the bearer token is all a pin needs, so the token is
+    validated but no user row is read. Other requests use the session user.
+    """
+    forced = getattr(request, "_force_auth_user", None)
+    if forced is not None:
+        return forced.id
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return _user_id(request)
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        return authentication.get_validated_token(raw_token).get(
+            api_settings.USER_ID_CLAIM
+        )
+    except (InvalidToken, TokenError):
+        return None
+
+
+def uses_replica(request, view_func):
+    view_class = getattr(view_func, "view_class", None)
+    if getattr(view_class, "read_replica", False):
+        return True
+    match = request.resolver_match
+    return match.namespace == "admin" and (match.url_name or "").endswith("_changelist")
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        request = _request.get()
+        if (
+            request is None
+            or not getattr(request, "_replica", False)
+            or model._meta.app_label in PRIMARY_APPS
+            or model._meta.label == settings.AUTH_USER_MODEL
+        ):
+            return None
+        return settings.REPLICA_DATABASE
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary.
+        return None if db != settings.REPLICA_DATABASE else False
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _request.set(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        self.pin_writer(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = _request.set(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request.reset(token)
+        self.pin_writer(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Decided before the flag is set, so the session and user loads
+        # behind it read from the primary.
+        request._replica = False
+        if not settings.REPLICA_DATABASE or not uses_replica(request, view_func):
+            return
+        user_id = _viewer_id(request)
+        request._replica = user_id is None or cache.get(pin_key(user_id)) is None
+
+    def pin_writer(self, request, response):
+        if (
+            not settings.REPLICA_DATABASE
+            or request.method in SAFE_METHODS
+            or response.status_code >= 400
+        ):
+            return
+        user_id = _user_id(request)
+        if user_id is not None:
+            cache.set(pin_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def copy_sqlite(source, target):
+    """Copy the SQLite database ``source`` into ``target`` as one snapshot."""
+    with contextlib.closing(sqlite3.connect(source)) as src:
+        with contextlib.closing(sqlite3.connect(target)) as dst:
+            src.backup(dst)
@@ -0,0 +1,289 @@
+"""Hourly and daily rollups of UX telemetry.
+
+``compact`` folds raw ``UxTelemetryEvent`` rows past the watermark into
+hourly ``UxTelemetryRollup`` buckets keyed by event type, stage and level,
+then sums the hours of each finished day into one daily row. ``totals``
+answers the summary endpoint from the daily rows, the hourly rows of days
+not yet closed and the not-yet-compacted tail, so its cost does not grow
+with the raw table.
+
+Ids are allocated before commit, so an event can become visible after the
+watermark has passed it. Ids missing from a compacted range are kept on the
+state row as gaps for ``GAP_RETENTION_SECONDS``; later runs fold any of
+them that show up, and ``totals`` counts them in the tail until then.
+
+Nothing compacts on its own: schedule ``manage.py rollup_telemetry`` from
+cron, or keep ``rollup_telemetry --interval 300`` running next to the web
+workers. The tail, and with it the summary's cost, grows until it runs.
+"""
+
+import logging
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from api.models import (
+    UxTelemetryEvent,
+    UxTelemetryRollup,
+    UxTelemetryRollupState,
+    UxTelemetryRollupUser,
+)
+
+logger = logging.getLogger(__name__)
+
+# Events younger than this are left in the tail, so most events that commit
+# slightly out of id order are rolled up in order instead of as gaps.
+DEFAULT_SETTLE_SECONDS = 60
+
+# How long a missing id is waited for before it is taken as rolled back.
+GAP_RETENTION_SECONDS = 3600
+
+# Ranges with more missing ids than this are not tracked id by id.
+MAX_TRACKED_GAPS = 10000
+
+
+def get_state():
+    state, _ = UxTelemetryRollupState.objects.get_or_create(pk=1)
+    return state
+
+
+def compact(chunk_size=50000, settle_seconds=DEFAULT_SETTLE_SECONDS):
+    """Roll up late gap events and every settled event past the watermark.
+
+    Returns how many events were rolled up.
+    """
+    processed = compact_gaps()
+    cutoff = timezone.now() - timedelta(seconds=settle_seconds)
+    state = get_state()
+    high = (
+        UxTelemetryEvent.objects.filter(
+            id__gt=state.last_event_id, created_at__lte=cutoff
+        )
+        .aggregate(high=Max("id"))
+        .get("high")
+    )
+    low = state.last_event_id
+    while high is not None and low < high:
+        boundary = list(
+            UxTelemetryEvent.objects.filter(id__gt=low, id__lte=high)
+            .order_by("id")
+            .values_list("id", flat=True)[chunk_size - 1 : chunk_size]
+        )
+        chunk_high = boundary[0] if boundary else high
+        processed += compact_range(low, chunk_high)
+        low = chunk_high
+    close_days()
+    return processed
+
+
+def compact_range(low, high):
+    """Roll up events with ``low < id <= high`` and advance the watermark."""
+    events = UxTelemetryEvent.objects.filter(id__gt=low, id__lte=high)
+    with transaction.atomic():
+        state = UxTelemetryRollupState.objects.select_for_update().get(pk=1)
+        if state.last_event_id != low:
+            # Another compaction run got here first.
+            return 0
+
+        processed, last_event_at = fold(events, state.daily_through)
+        missing = (high - low) - processed
+        if 0 < missing <= MAX_TRACKED_GAPS:
+            present = set(events.values_list("id", flat=True))
+            seen_at = time.time()
+            state.gap_ids += [
+                [event_id, seen_at]
+                for event_id in range(low + 1, high + 1)
+                if event_id not in present
+            ]
+        elif missing > MAX_TRACKED_GAPS:
+            logger.warning(
+                "Not tracking %s missing telemetry ids in (%s, %s]", missing, low, high
+            )
+
+        state.last_event_id = high
+        state.last_event_at = last_event_at
+        state.rolled_up_at = timezone.now()
+        state.save()
+    return processed
+
+
+def compact_gaps():
+    """Roll up events that committed after the watermark passed their id."""
+    with transaction.atomic():
+        state = UxTelemetryRollupState.objects.select_for_update().filter(pk=1).first()
+        if state is None or not state.gap_ids:
+            return 0
+        expired = time.time() - GAP_RETENTION_SECONDS
+        gaps = {event_id for event_id, seen_at in state.gap_ids if seen_at > expired}
+        found = set(
+            UxTelemetryEvent.objects.filter(id__in=gaps).values_list("id", flat=True)
+        )
+        processed = 0
+        if found:
+            processed, _ = fold(
+                UxTelemetryEvent.objects.filter(id__in=found), state.daily_through
+            )
+        state.gap_ids = [
+            [event_id, seen_at]
+            for event_id, seen_at in state.gap_ids
+            if event_id in gaps and event_id not in found
+        ]
+        state.save(update_fields=["gap_ids"])
+    return processed
+
+
+def fold(events, daily_through):
+    """Add ``events`` to the rollups; return their count and newest time.
+
+    Events from days already closed into daily rows are added to those rows
+    as well as to their hour.
+    """
+    hourly = Counter()
+    daily = Counter()
+    last_event_at = None
+    for row in (
+        events.annotate(bucket=TruncHour("created_at"))
+        .values("bucket", "event_type", "stage", "level")
+        .annotate(count=Count("id"), last=Max("created_at"))
+        .order_by()
+    ):
+        key = (row["bucket"], row["event_type"], row["stage"], row["level"])
+        hourly[key] += row["count"]
+        if daily_through and row["bucket"] < daily_through:
+            day = row["bucket"].replace(hour=0, minute=0, second=0, microsecond=0)
+            daily[(day, *key[1:])] += row["count"]
+        if last_event_at is None or row["last"] > last_event_at:
+            last_event_at = row["last"]
+
+    merge_counts(UxTelemetryRollup.PERIOD_HOUR, hourly)
+    merge_counts(UxTelemetryRollup.PERIOD_DAY, daily)
+    UxTelemetryRollupUser.objects.bulk_create(
+        [
+            UxTelemetryRollupUser(
+                user_id=row["user_id"], first_seen_at=row["first_seen_at"]
+            )
+            for row in events.values("user_id")
+            .annotate(first_seen_at=Min("created_at"))
+            .order_by()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    return sum(hourly.values()), last_event_at
+
+
+def close_days():
+    """Sum the hourly rollups of every finished day into daily rows."""
+    today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    with transaction.atomic():
+        state = UxTelemetryRollupState.objects.select_for_update().filter(pk=1).first()
+        if state is None or (state.daily_through and state.daily_through >= today):
+            return
+        hours = UxTelemetryRollup.objects.filter(
+            period=UxTelemetryRollup.PERIOD_HOUR, bucket_start__lt=today
+        )
+        if state.daily_through:
+            hours = hours.filter(bucket_start__gte=state.daily_through)
+        daily = Counter()
+        for row in (
+            hours.annotate(day=TruncDay("bucket_start"))
+            .values("day", "event_type", "stage", "level")
+            .annotate(count=Sum("count"))
+            .order_by()
+        ):
+            key = (row["day"], row["event_type"], row["stage"], row["level"])
+            daily[key] += row["count"]
+        merge_counts(UxTelemetryRollup.PERIOD_DAY, daily)
+        state.daily_through = today
+        state.save(update_fields=["daily_through"])
+
+
+def merge_counts(period, counts):
+    if not counts:
+        return
+    existing = {
+        (row.bucket_start, row.event_type, row.stage, row.level): row
+        for row in UxTelemetryRollup.objects.filter(
+            period=period, bucket_start__in={key[0] for key in counts}
+        )
+    }
+    to_update = []
+    to_create = []
+    for key, count in counts.items():
+        row = existing.get(key)
+        if row:
+            row.count += count
+            to_update.append(row)
+        else:
+            bucket_start, event_type, stage, level = key
+            to_create.append(
+                UxTelemetryRollup(
+                    period=period,
+                    bucket_start=bucket_start,
+                    event_type=event_type,
+                    stage=stage,
+                    level=level,
+                    count=count,
+                )
+            )
+    UxTelemetryRollup.objects.bulk_update(to_update, ["count"], batch_size=1000)
+    UxTelemetryRollup.objects.bulk_create(to_create, batch_size=1000)
+
+
+def totals():
+    """Return all-time event, stage, level and user totals."""
+    state = UxTelemetryRollupState.objects.filter(pk=1).first()
+    watermark = state.last_event_id if state else 0
+    gaps = [event_id for event_id, _ in state.gap_ids] if state else []
+
+    event_counts = Counter()
+    stage_counts = Counter()
+    level_counts = Counter()
+
+    # Daily rows for closed days, hourly rows for the days since.
+    buckets = Q(period=UxTelemetryRollup.PERIOD_HOUR)
+    if state and state.daily_through:
+        buckets = Q(period=UxTelemetryRollup.PERIOD_DAY) | Q(
+            buckets, bucket_start__gte=state.daily_through
+        )
+    rolled = (
+        UxTelemetryRollup.objects.filter(buckets)
+        .values("event_type", "stage", "level")
+        .annotate(count=Sum("count"))
+        .order_by()
+    )
+    tail = UxTelemetryEvent.objects.filter(Q(id__gt=watermark) | Q(id__in=gaps))
+    tail_counts = (
+        tail.values("event_type", "stage", "level")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for rows in (rolled, tail_counts):
+        for row in rows:
+            event_counts[row["event_type"]] += row["count"]
+            if row["stage"]:
+                stage_counts[row["stage"]] += row["count"]
+            if row["level"]:
+                level_counts[row["level"]] += row["count"]
+
+    new_users = (
+        tail.exclude(user_id__in=UxTelemetryRollupUser.objects.values("user_id"))
+        .values("user_id")
+        .distinct()
+        .count()
+    )
+
+    return {
+        "total_events": sum(event_counts.values()),
+        "distinct_users": UxTelemetryRollupUser.objects.count() + new_users,
+        "event_counts": dict(event_counts),
+        "stage_counts": dict(stage_counts),
+        "level_counts": dict(level_counts),
+        "rolled_up_to": watermark,
+        "rolled_up_at": state.rolled_up_at if state else None,
+    }
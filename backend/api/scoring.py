@@ -0,0 +1,176 @@
+"""Level scoring shared by every endpoint that reports results.
+
+Scores for any number of (assessment, level) pairs come from a single
+conditional-aggregation query over ``AssessmentResponse``. Hot paths read the
+``AssessmentLevelScore`` counters instead, which the response write paths keep
+up to date through ``apply_answer_deltas``.
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Q
+
+from userauths.models import (
+    AssessmentLevelScore,
+    AssessmentResponse,
+    QuestionLevel,
+)
+
+PASS_MARK = 60
+LEVELS = list(QuestionLevel.values)
+
+
+def level_score(level, total, correct, last_submitted_at=None):
+    score = round((correct / total) * 100, 2) if total else 0.0
+    return {
+        "level": level,
+        "total": total,
+        "correct": correct,
+        "score": score,
+        "passed": bool(total) and score >= PASS_MARK,
+        "last_submitted_at": last_submitted_at,
+    }
+
+
+def score_responses(responses, key="assessment_id"):
+    """Return ``{(key value, level): score}`` for a response queryset.
+
+    ``key`` is the response column results are grouped by in addition to the
+    question level, e.g. ``"assessment_id"`` or ``"profile_id"``.
+    """
+    rows = (
+        responses.values(key, question_level=F("question__level"))
+        .annotate(
+            total=Count("id"),
+            correct=Count("id", filter=Q(is_correct=True)),
+            last_submitted_at=Max("submitted_at"),
+        )
+        .order_by()
+    )
+    return {
+        (row[key], row["question_level"]): level_score(
+            row["question_level"],
+            row["total"],
+            row["correct"],
+            row["last_submitted_at"],
+        )
+        for row in rows
+    }
+
+
+def score_assessments(assessment_ids, levels=None, answered_only=False):
+    """Score every level of the given assessments in one query.
+
+    ``answered_only`` ignores the blank rows created when a level starts, so
+    only questions the candidate actually answered count towards the total.
+    """
+    responses = AssessmentResponse.objects.filter(assessment_id__in=assessment_ids)
+    if levels is not None:
+        responses = responses.filter(question__level__in=levels)
+    if answered_only:
+        responses = responses.filter(selected_choice__isnull=False)
+    return score_responses(responses)
+
+
+def score_from_counter(counter, answered_only=False):
+    total = counter.answered_count if answered_only else counter.total_count
+    return level_score(
+        counter.level, total, counter.correct_count, counter.last_submitted_at
+    )
+
+
+def count_level_responses(assessment_ids, levels=None):
+    """Return ``{(assessment_id, level): counter values}`` from raw responses."""
+    responses = AssessmentResponse.objects.filter(assessment_id__in=assessment_ids)
+    if levels is not None:
+        responses = responses.filter(question__level__in=levels)
+    answered = Q(selected_choice__isnull=False)
+    rows = (
+        responses.values("assessment_id", question_level=F("question__level"))
+        .annotate(
+            total=Count("id"),
+            answered=Count("id", filter=answered),
+            correct=Count("id", filter=Q(is_correct=True)),
+            last_submitted_at=Max("submitted_at", filter=answered),
+        )
+        .order_by()
+    )
+    return {
+        (row["assessment_id"], row["question_level"]): {
+            "total_count": row["total"],
+            "answered_count": row["answered"],
+            "correct_count": row["correct"],
+            "last_submitted_at": row["last_submitted_at"],
+        }
+        for row in rows
+    }
+
+
+def refresh_level_scores(assessment_ids, levels=None):
+    """Recompute the counters of the given assessments from their responses."""
+    counts = count_level_responses(assessment_ids, levels)
+    with transaction.atomic():
+        AssessmentLevelScore.objects.bulk_create(
+            [
+                AssessmentLevelScore(assessment_id=assessment_id, level=level, **values)
+                for (assessment_id, level), values in counts.items()
+            ],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["assessment", "level"],
+            update_fields=[
+                "total_count",
+                "answered_count",
+                "correct_count",
+                "last_submitted_at",
+            ],
+        )
+    return counts
+
+
+def answer_delta(before, after):
+    """Counter delta for one response moving from ``before`` to ``after``.
+
+    States are ``(selected_choice_id, is_correct)`` tuples; ``before`` is
+    ``None`` when the response row is new.
+    """
+    was_answered = bool(before and before[0])
+    was_correct = bool(before and before[1])
+    return (
+        0 if before else 1,
+        int(bool(after[0])) - int(was_answered),
+        int(after[1] is True) - int(was_correct),
+    )
+
+
+def apply_answer_deltas(assessment_id, level, deltas, submitted_at=None):
+    """Add ``(total, answered, correct)`` deltas to one level's counters.
+
+    ``submitted_at`` is the newest ``submitted_at`` among the answered
+    responses just written, or ``None`` if none were answered. It becomes
+    ``last_submitted_at``, as ``count_level_responses`` would compute it.
+
+    Must run in the transaction that wrote the responses. Falls back to a full
+    recount when the counter row does not exist yet, or when an answer was
+    cleared, since the previous answer time is not known without one.
+    """
+    total = answered = correct = 0
+    for delta in deltas:
+        if delta[1] < 0:
+            refresh_level_scores([assessment_id], [level])
+            return
+        total += delta[0]
+        answered += delta[1]
+        correct += delta[2]
+
+    changes = {
+        "total_count": F("total_count") + total,
+        "answered_count": F("answered_count") + answered,
+        "correct_count": F("correct_count") + correct,
+    }
+    if submitted_at is not None:
+        changes["last_submitted_at"] = submitted_at
+    updated = AssessmentLevelScore.objects.filter(
+        assessment_id=assessment_id, level=level
+    ).update(**changes)
+    if not updated:
+        refresh_level_scores([assessment_id], [level])
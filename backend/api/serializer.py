@@ -1,6 +1,10 @@
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
 from django.contrib.auth.password_validation import validate_password
+from django.db import transaction
 from userauths.models import (
     User,
     Profile,
@@ -10,18 +14,31 @@ from userauths.models import (
     Result,
     Feedback,
 )
+from api import scoring
+from api.token_index import IndexedRefreshToken
 
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = IndexedRefreshToken
+
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
         token["full_name"] = user.full_name
         token["email"] = user.email
         token["username"] = user.username
+        # Lets CachedJWTAuthentication skip the user and profile lookups.
+        token["is_staff"] = user.is_staff
+        token["profile_id"] = (
+            Profile.objects.filter(user=user).values_list("id", flat=True).first()
+        )
         return token
 
 
+class IndexedTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = IndexedRefreshToken
+
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(
         write_only=True, required=True, validators=[validate_password]
@@ -38,16 +55,15 @@ class RegisterSerializer(serializers.ModelSerializer):
         return attr
 
     def create(self, validated_data):
-        user = User.objects.create(
+        # One INSERT for the user (User.save derives the username from the
+        # email) and one for the profile its post_save signal creates.
+        user = User(
             full_name=validated_data["full_name"],
             email=validated_data["email"],
         )
-
-        email_username, _ = user.email.split("@")
-        user.username = email_username
         user.set_password(validated_data["password"])
-        user.save()
-
+        with transaction.atomic():
+            user.save()
         return user
 
 
@@ -77,6 +93,40 @@ class AssessmentQuestionSerializer(serializers.ModelSerializer):
         fields = ["id", "text", "level", "type", "choices"]
 
 
+# Hand-written equivalents of the read serializers above for the hot read
+# paths. They produce the same keys in the same order without DRF's per-field
+# machinery; datetimes are left for the renderer to format.
+
+
+def choice_data(choice):
+    return {
+        "id": choice.id,
+        "text": choice.text,
+        "is_correct": choice.is_correct,
+        "question": choice.question_id,
+    }
+
+
+def question_data(question):
+    return {
+        "id": question.id,
+        "text": question.text,
+        "level": question.level,
+        "type": question.type,
+        "choices": [choice_data(choice) for choice in question.choices.all()],
+    }
+
+
+def profile_data(profile):
+    return {
+        "id": profile.id,
+        "full_name": profile.full_name,
+        "date": profile.date,
+        "updated_at": profile.updated_at,
+        "user": profile.user_id,
+    }
+
+
 class AssessmentResponseSerializer(serializers.ModelSerializer):
     class Meta:
         model = AssessmentResponse
@@ -120,28 +170,19 @@ class SubmitResponsesSerializer(serializers.Serializer):
             "3": "Review ethical protocols and decision-making best practices.",
         }
 
-        results = []
-        for level in ["1", "2", "3"]:
-            total = 0
-            correct = 0
-            responses = AssessmentResponse.objects.filter(
-                profile=profile, question__level=level, question__type="MC"
-            )
-            print(f"Responses for level {level}: {responses}")  # Debugging line
-            total = int(responses.count())  # Ensure total is an integer
-            correct = int(
-                responses.filter(is_correct=True).count()
-            )  # Ensure correct is an integer
-
-            print(f"total: {total}")  # Debugging line
-            print(f"correct: {correct}")  # Debugging line
+        scores = scoring.score_responses(
+            AssessmentResponse.objects.filter(profile=profile, question__type="MC"),
+            key="profile_id",
+        )
 
-            if total == 0:
-                continue  # Avoid division by zero
+        results = []
+        for level in scoring.LEVELS:
+            level_score = scores.get((profile.id, level))
+            if not level_score:
+                continue  # No responses at this level
 
-            points_per_question = 100 / total
-            score = round(correct * points_per_question, 2)
-            passed = score >= 60
+            score = level_score["score"]
+            passed = level_score["passed"]
 
             result = Result.objects.create(
                 profile=profile, level=level, score=score, passed=passed
@@ -161,6 +202,31 @@ class SubmitResponsesSerializer(serializers.Serializer):
         return {"results": results}
 
 
+class BulkResponseItemSerializer(serializers.Serializer):
+    question = serializers.IntegerField()
+    selected_choice = serializers.IntegerField(required=False, allow_null=True)
+    text_response = serializers.CharField(
+        required=False, allow_null=True, allow_blank=True
+    )
+
+
+class BulkResponseSubmitSerializer(serializers.Serializer):
+    MAX_RESPONSES = 500
+
+    assessment = serializers.IntegerField()
+    responses = BulkResponseItemSerializer(many=True, allow_empty=False)
+
+    def validate_responses(self, value):
+        if len(value) > self.MAX_RESPONSES:
+            raise serializers.ValidationError(
+                f"At most {self.MAX_RESPONSES} responses can be submitted at once."
+            )
+        question_ids = [item["question"] for item in value]
+        if len(question_ids) != len(set(question_ids)):
+            raise serializers.ValidationError("Each question may appear only once.")
+        return value
+
+
 class UxTelemetryEventSerializer(serializers.Serializer):
     event_type = serializers.CharField(max_length=100)
     stage = serializers.CharField(max_length=30, required=False, allow_blank=True)
@@ -168,3 +234,16 @@ class UxTelemetryEventSerializer(serializers.Serializer):
     assessment_id = serializers.IntegerField(required=False, allow_null=True)
     time_left = serializers.IntegerField(required=False, allow_null=True)
     details = serializers.JSONField(required=False)
+
+
+class UxTelemetryEventBatchSerializer(serializers.Serializer):
+    MAX_EVENTS = 100
+
+    events = UxTelemetryEventSerializer(many=True, allow_empty=False)
+
+    def validate_events(self, value):
+        if len(value) > self.MAX_EVENTS:
+            raise serializers.ValidationError(
+                f"At most {self.MAX_EVENTS} events can be sent at once."
+            )
+        return value
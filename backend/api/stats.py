@@ -0,0 +1,12 @@
+"""Small numeric helpers shared by the metrics middleware and bench commands."""
+
+import math
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of ``samples``, or ``None`` when empty."""
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
@@ -0,0 +1,142 @@
+"""Buffered ingestion for UX telemetry events.
+
+Events are queued in-process and written by a background thread with
+``bulk_create`` once a batch fills up or its oldest event reaches the maximum
+age, so telemetry no longer takes the database writer lock once per event.
+The queue is bounded: when a batch does not fit, none of it is queued and
+callers are told to back off instead of growing memory without limit.
+Pending events are flushed when the worker process exits.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from api.models import UxTelemetryEvent
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def write_events(events):
+    UxTelemetryEvent.objects.bulk_create(events, batch_size=500)
+
+
+class TelemetryBuffer:
+    def __init__(self, max_batch=200, max_age=2.0, max_queue=10000, sink=write_events):
+        self.max_batch = max_batch
+        self.max_age = max_age
+        self.max_queue = max_queue
+        self.sink = sink
+        # Each item is one submitted batch; _pending counts their events.
+        self._queue = queue.Queue()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="telemetry-buffer", daemon=True
+        )
+        self._closed = False
+        self._thread.start()
+
+    def submit(self, events):
+        """Queue all of ``events``, or none and return ``False`` if they do not fit."""
+        with self._lock:
+            if self._closed or self._pending + len(events) > self.max_queue:
+                return False
+            self._pending += len(events)
+            self._queue.put(list(events))
+        return True
+
+    def close(self, timeout=5.0):
+        """Flush everything still queued and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            wait = self.max_age if not batch else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush(batch)
+                return
+
+            if item is not None:
+                with self._lock:
+                    self._pending -= len(item)
+                if not batch:
+                    deadline = time.monotonic() + self.max_age
+                batch.extend(item)
+
+            while len(batch) >= self.max_batch:
+                self._flush(batch[: self.max_batch])
+                batch = batch[self.max_batch :]
+                deadline = time.monotonic() + self.max_age
+            if batch and time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        try:
+            self.sink(batch)
+        except Exception:
+            logger.exception(
+                "Dropped %s telemetry events after a failed write", len(batch)
+            )
+        finally:
+            close_old_connections()
+
+
+_buffer = None
+_buffer_pid = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer, _buffer_pid
+    # A buffer started before a fork belongs to the parent; start a new one.
+    if _buffer is None or _buffer_pid != os.getpid():
+        with _buffer_lock:
+            if _buffer is None or _buffer_pid != os.getpid():
+                _buffer = TelemetryBuffer(
+                    max_batch=settings.TELEMETRY_BUFFER_MAX_BATCH,
+                    max_age=settings.TELEMETRY_BUFFER_MAX_AGE_SECONDS,
+                    max_queue=settings.TELEMETRY_BUFFER_MAX_QUEUE,
+                )
+                _buffer_pid = os.getpid()
+                atexit.register(_buffer.close)
+    return _buffer
+
+
+def record_events(events):
+    """Hand events to the buffer; return ``False`` when the caller should back off."""
+    if not settings.TELEMETRY_BUFFER_ENABLED:
+        write_events(events)
+        return True
+    return get_buffer().submit(events)
+
+
+async def arecord_events(events):
+    """Async ``record_events``; never waits on a full queue in the event loop."""
+    if not settings.TELEMETRY_BUFFER_ENABLED:
+        await UxTelemetryEvent.objects.abulk_create(events, batch_size=500)
+        return True
+    return get_buffer().submit(events)
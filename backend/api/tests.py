@@ -1,3 +1,1882 @@
-from django.test import TestCase
+import contextlib
+import gzip
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import Permission
+from django.contrib.sessions.models import Session
+from django.test import (
+    AsyncClient,
+    AsyncRequestFactory,
+    RequestFactory,
+    LiveServerTestCase,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import path, resolve
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api import async_views
+from api import authentication
+from api import caching
+from api import compression
+from api import middleware
+from api.management.commands import loadtest
+from api import question_packs
+from api import question_bank
+from api import renderers
+from api import serializer as api_serializer
+from api import replica
+from api import rollups
+from api.serializer import MyTokenObtainPairSerializer
+from api import telemetry
+from api import outbox
+from api import profiles
+from api import token_index
+from api.models import OutboxEmail, UxTelemetryEvent, UxTelemetryRollup
+from api import views as api_views
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from backend.sqlite import base as sqlite_backend
+from userauths.models import (
+    User,
+    AssessmentQuestion,
+    Choice,
+    Assessment,
+    AssessmentResponse,
+    AssessmentLevelScore,
+    Profile,
+    QuestionBankVersion,
+    Result,
+)
+
+
+def make_user(email="candidate@example.com", **extra):
+    user = User.objects.create(email=email, **extra)
+    user.set_password("Str0ng-pass!")
+    user.save()
+    return user
+
+
+def make_question(level="1", text="Question", correct_index=0, choices=4):
+    question = AssessmentQuestion.objects.create(level=level, type="MC", text=text)
+    for index in range(choices):
+        Choice.objects.create(
+            question=question,
+            text=f"{text} choice {index}",
+            is_correct=index == correct_index,
+        )
+    return question
+
+
+class AssessmentQuestionListViewTests(TestCase):
+    def setUp(self):
+        question_bank.clear()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for index in range(5):
+            make_question(level="1", text=f"Level 1 question {index}")
+        make_question(level="2", text="Level 2 question")
+
+    def get_level(self, level):
+        response = self.client.get("/api/v1/assessment/questions/", {"level": level})
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_returns_questions_with_choices(self):
+        data = self.get_level("1")
+        self.assertEqual(len(data), 5)
+        self.assertEqual(len(data[0]["choices"]), 4)
+        self.assertEqual(set(data[0]), {"id", "text", "level", "type", "choices"})
+
+    def test_unknown_level_returns_empty_list(self):
+        self.assertEqual(self.get_level("9"), [])
+
+    def test_warm_cache_only_reads_version(self):
+        self.get_level("1")
+        with self.assertNumQueries(1):
+            self.get_level("1")
+
+    def test_question_edits_invalidate_cache(self):
+        self.get_level("1")
+        question = AssessmentQuestion.objects.filter(level="1").first()
+        question.text = "Edited"
+        question.save()
+        self.assertEqual(self.get_level("1")[0]["text"], "Edited")
+
+        Choice.objects.filter(question=question).first().delete()
+        self.assertEqual(len(self.get_level("1")[0]["choices"]), 3)
+
+
+class PrepopulateLevelResponsesTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.questions = [
+            make_question(level="1", text=f"Question {index}") for index in range(5)
+        ]
+        retired = make_question(level="1", text="Retired")
+        retired.is_active = False
+        retired.save()
+        make_question(level="2", text="Level 2")
+        self.assessment = Assessment.objects.create(profile=self.user.profile)
+
+    def test_inserts_one_blank_row_per_active_question(self):
+        # Question ids, one INSERT for every row, the score refresh, and the
+        # savepoints of the two atomic blocks.
+        with self.assertNumQueries(8):
+            api_views.prepopulate_level_responses(self.assessment, "1")
+        rows = AssessmentResponse.objects.filter(assessment=self.assessment)
+        self.assertEqual(
+            sorted(rows.values_list("question_id", flat=True)),
+            [question.id for question in self.questions],
+        )
+        self.assertFalse(rows.filter(selected_choice__isnull=False).exists())
+        score = AssessmentLevelScore.objects.get(assessment=self.assessment, level="1")
+        self.assertEqual((score.total_count, score.answered_count), (5, 0))
+
+    def test_ignore_conflicts_keeps_existing_answers(self):
+        api_views.prepopulate_level_responses(self.assessment, "1")
+        question = self.questions[0]
+        choice = question.choices.get(is_correct=True)
+        AssessmentResponse.objects.filter(
+            assessment=self.assessment, question=question
+        ).update(selected_choice=choice, is_correct=True)
+
+        api_views.prepopulate_level_responses(
+            self.assessment, "1", ignore_conflicts=True
+        )
+        rows = AssessmentResponse.objects.filter(assessment=self.assessment)
+        self.assertEqual(rows.count(), 5)
+        answered = rows.get(question=question)
+        self.assertEqual(answered.selected_choice, choice)
+        self.assertTrue(answered.is_correct)
+
+
+class AssessmentResponseBulkSubmitViewTests(TestCase):
+    url = "/api/v1/assessment/submit-response/bulk/"
+
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.questions = [
+            make_question(level="1", text=f"Question {index}") for index in range(10)
+        ]
+        self.assessment = Assessment.objects.create(profile=self.user.profile)
+        api_views.prepopulate_level_responses(self.assessment, "1")
+
+    def answers(self, correct=True):
+        return [
+            {
+                "question": question.id,
+                "selected_choice": question.choices.filter(is_correct=correct)
+                .first()
+                .id,
+            }
+            for question in self.questions
+        ]
+
+    def post(self, responses):
+        return self.client.post(
+            self.url,
+            {"assessment": self.assessment.id, "responses": responses},
+            format="json",
+        )
+
+    def test_saves_all_answers_with_constant_queries(self):
+        responses = self.answers()
+        with self.assertNumQueries(8):
+            response = self.post(responses)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["saved"], 10)
+        self.assertEqual(
+            AssessmentResponse.objects.filter(
+                assessment=self.assessment, is_correct=True
+            ).count(),
+            10,
+        )
+
+    def test_resubmission_updates_existing_rows(self):
+        self.post(self.answers())
+        response = self.post(self.answers(correct=False))
+        self.assertEqual(response.status_code, 200)
+        rows = AssessmentResponse.objects.filter(assessment=self.assessment)
+        self.assertEqual(rows.count(), 10)
+        self.assertFalse(rows.filter(is_correct=True).exists())
+
+    def test_rejects_choice_from_another_question(self):
+        responses = self.answers()
+        responses[0]["selected_choice"] = responses[1]["selected_choice"]
+        response = self.post(responses)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["invalid_questions"], [self.questions[0].id])
+        self.assertFalse(
+            AssessmentResponse.objects.filter(selected_choice__isnull=False).exists()
+        )
+
+    def test_rejects_questions_outside_current_level(self):
+        other = make_question(level="2", text="Level 2")
+        response = self.post([{"question": other.id, "selected_choice": None}])
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_retired_questions(self):
+        retired = self.questions[0]
+        AssessmentQuestion.objects.filter(pk=retired.pk).update(is_active=False)
+        response = self.post(self.answers())
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            json.loads(response.content)["invalid_questions"], [retired.id]
+        )
+
+    def test_rejects_other_users_assessment(self):
+        self.client.force_authenticate(make_user(email="other@example.com"))
+        self.assertEqual(self.post(self.answers()).status_code, 403)
+
+
+class ScoringTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for level in ("1", "2"):
+            for index in range(5):
+                make_question(level=level, text=f"Level {level} question {index}")
+
+    def answer_level(self, assessment_id, level, correct):
+        questions = AssessmentQuestion.objects.filter(level=level).order_by("id")
+        responses = [
+            {
+                "question": question.id,
+                "selected_choice": question.choices.filter(is_correct=index < correct)
+                .first()
+                .id,
+            }
+            for index, question in enumerate(questions)
+        ]
+        self.client.post(
+            "/api/v1/assessment/submit-response/bulk/",
+            {"assessment": assessment_id, "responses": responses},
+            format="json",
+        )
+        return self.client.post(
+            "/api/v1/assessment/submit/", {"assessment_id": assessment_id}
+        )
+
+    def test_scores_are_consistent_across_endpoints(self):
+        assessment_id = self.client.post("/api/v1/assessment/start/").data[
+            "assessment_id"
+        ]
+        passed = self.answer_level(assessment_id, "1", correct=4)
+        self.assertEqual(passed.data["score"], 80.0)
+        self.assertEqual(passed.data["next_level"], "2")
+
+        failed = self.answer_level(assessment_id, "2", correct=2)
+        self.assertEqual(failed.data["score"], 40.0)
+        self.assertFalse(failed.data["passed"])
+        self.assertTrue(failed.data["completed"])
+
+        results = self.client.get("/api/v1/assessment/results/").data["results"]
+        self.assertEqual(
+            [(row["level"], row["score"], row["passed"]) for row in results],
+            [("1", 80.0, True), ("2", 40.0, False)],
+        )
+
+        history = self.client.get("/api/v1/assessment/history/").data["history"]
+        self.assertEqual(
+            [row["score"] for row in history[0]["level_results"]], [80.0, 40.0]
+        )
+
+    def test_results_fields(self):
+        assessment_id = self.client.post("/api/v1/assessment/start/").data[
+            "assessment_id"
+        ]
+        self.answer_level(assessment_id, "1", correct=4)
+        url = "/api/v1/assessment/results/"
+        data = self.client.get(url, {"fields": "level,score"}).data
+        self.assertEqual(data["results"], [{"level": "1", "score": 80.0}])
+        self.assertEqual(self.client.get(url, {"fields": "x"}).status_code, 400)
+
+    def test_results_survive_a_rebuild(self):
+        assessment_id = self.client.post("/api/v1/assessment/start/").data[
+            "assessment_id"
+        ]
+        self.answer_level(assessment_id, "1", correct=4)
+        # Change answers through both upsert paths.
+        question = AssessmentQuestion.objects.filter(level="2").first()
+        self.client.post(
+            "/api/v1/assessment/submit-response/",
+            {
+                "assessment": assessment_id,
+                "profile": self.user.profile.id,
+                "question": question.id,
+                "selected_choice": question.choices.first().id,
+            },
+        )
+        self.client.post(
+            "/api/v1/assessment/submit-response/bulk/",
+            {
+                "assessment": assessment_id,
+                "responses": [
+                    {"question": question.id, "selected_choice": None},
+                ],
+            },
+            format="json",
+        )
+        self.client.post(
+            "/api/v1/assessment/submit-response/",
+            {
+                "assessment": assessment_id,
+                "profile": self.user.profile.id,
+                "question": question.id,
+                "selected_choice": question.choices.last().id,
+            },
+        )
+        url = "/api/v1/assessment/results/"
+        before = self.client.get(url)
+
+        call_command("rebuild_level_scores", verify=True, stdout=StringIO())
+        call_command("rebuild_level_scores", stdout=StringIO())
+        after = self.client.get(url)
+        self.assertEqual(json.loads(after.content), json.loads(before.content))
+        self.assertEqual(after["ETag"], before["ETag"])
+
+    def test_results_query_count_is_constant(self):
+        assessment_id = self.client.post("/api/v1/assessment/start/").data[
+            "assessment_id"
+        ]
+        self.answer_level(assessment_id, "1", correct=5)
+        self.answer_level(assessment_id, "2", correct=5)
+        # ETag stamps, latest assessment, level counters; starting the
+        # assessment left the profile id in the profile cache.
+        with self.assertNumQueries(3):
+            self.client.get("/api/v1/assessment/results/")
+
+
+class AssessmentHistoryAPIViewTests(TestCase):
+    url = "/api/v1/assessment/history/"
+
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.questions = [
+            make_question(level="1", text=f"Question {index}") for index in range(3)
+        ]
+        self.assessments = [self.take_assessment() for _ in range(7)]
+        # Started but never answered: excluded from history.
+        Assessment.objects.create(profile=self.user.profile)
+
+    def take_assessment(self):
+        assessment = Assessment.objects.create(profile=self.user.profile)
+        for question in self.questions:
+            AssessmentResponse.objects.create(
+                assessment=assessment,
+                profile=self.user.profile,
+                question=question,
+                selected_choice=question.choices.get(is_correct=True),
+                is_correct=True,
+            )
+        return assessment
+
+    def test_pages_through_all_attempts_newest_first(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            data = self.client.get(self.url, params).data
+            seen.extend(item["assessment_id"] for item in data["history"])
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(seen, [a.id for a in reversed(self.assessments)])
+
+    def test_question_review_can_be_omitted(self):
+        data = self.client.get(self.url, {"include_review": "0"}).data
+        self.assertNotIn("question_review", data["history"][0])
+
+        data = self.client.get(self.url).data
+        review = data["history"][0]["question_review"]
+        self.assertEqual(len(review), 3)
+        self.assertEqual(review[0]["correct_answer"], review[0]["selected_answer"])
+
+    def test_query_count_is_independent_of_page_size(self):
+        # The first request also loads the profile into the profile cache.
+        with self.assertNumQueries(4):
+            self.client.get(self.url, {"limit": 2})
+        with self.assertNumQueries(3):
+            self.client.get(self.url, {"limit": 50})
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {"limit": 50, "include_review": "false"})
+
+    def test_rejects_malformed_cursor(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_fields_narrow_output_and_queries(self):
+        # Profile id and assessments; no scoring or review queries.
+        with self.assertNumQueries(2):
+            data = self.client.get(self.url, {"fields": "assessment_id"}).data
+        self.assertEqual(data["history"][0], {"assessment_id": self.assessments[-1].id})
+
+        data = self.client.get(
+            self.url,
+            {"fields": "level_results.score,question_review.is_correct"},
+        ).data
+        item = data["history"][0]
+        self.assertEqual(item["level_results"], [{"score": 100.0}])
+        self.assertEqual(item["question_review"], [{"is_correct": True}] * 3)
+
+        response = self.client.get(self.url, {"fields": "level_results.nope"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_streams_every_attempt_in_batches(self):
+        paged = self.client.get(self.url, {"limit": 50}).data["history"]
+        with mock.patch.object(
+            api_views.AssessmentHistoryAPIView, "stream_chunk_size", 2
+        ):
+            response = self.client.get(self.url, {"stream": "1"})
+            body = b"".join(response.streaming_content)
+        self.assertEqual(response["Content-Type"], "application/json")
+        data = json.loads(body)
+        self.assertIsNone(data["next_cursor"])
+        self.assertEqual(
+            [item["assessment_id"] for item in data["history"]],
+            [item["assessment_id"] for item in paged],
+        )
+        self.assertEqual(
+            data["history"][0]["question_review"],
+            json.loads(renderers.dumps(paged[0]["question_review"])),
+        )
+
+    async def test_streams_without_buffering_under_asgi(self):
+        token = await sync_to_async(MyTokenObtainPairSerializer.get_token)(self.user)
+        with mock.patch.object(
+            api_views.AssessmentHistoryAPIView, "stream_chunk_size", 2
+        ):
+            response = await AsyncClient().get(
+                self.url,
+                {"stream": "1"},
+                headers={"Authorization": f"Bearer {token.access_token}"},
+            )
+            self.assertTrue(response.is_async)
+            chunks = [chunk async for chunk in response.streaming_content]
+        # Opening bracket, four batches of up to two attempts, closing bracket.
+        self.assertEqual(len(chunks), 6)
+        data = json.loads(b"".join(chunks))
+        self.assertEqual(len(data["history"]), 7)
+
+
+class AssessmentLevelScoreTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.questions = [
+            make_question(level="1", text=f"Question {index}") for index in range(4)
+        ]
+        self.assessment_id = self.client.post("/api/v1/assessment/start/").data[
+            "assessment_id"
+        ]
+
+    def counter(self):
+        return AssessmentLevelScore.objects.get(
+            assessment_id=self.assessment_id, level="1"
+        )
+
+    def answer(self, question, correct):
+        return self.client.post(
+            "/api/v1/assessment/submit-response/",
+            {
+                "assessment": self.assessment_id,
+                "profile": self.user.profile.id,
+                "question": question.id,
+                "selected_choice": question.choices.filter(is_correct=correct)
+                .first()
+                .id,
+            },
+        )
+
+    def test_counters_follow_single_answer_changes(self):
+        counter = self.counter()
+        self.assertEqual((counter.total_count, counter.answered_count), (4, 0))
+
+        self.answer(self.questions[0], correct=True)
+        self.answer(self.questions[1], correct=False)
+        counter = self.counter()
+        self.assertEqual((counter.answered_count, counter.correct_count), (2, 1))
+
+        # Changing an answer moves the correct count without double counting.
+        self.answer(self.questions[0], correct=False)
+        self.answer(self.questions[1], correct=True)
+        counter = self.counter()
+        self.assertEqual((counter.answered_count, counter.correct_count), (2, 1))
+        self.assertIsNotNone(counter.last_submitted_at)
+
+    def test_submit_reads_counters(self):
+        for question in self.questions[:3]:
+            self.answer(question, correct=True)
+        response = self.client.post(
+            "/api/v1/assessment/submit/", {"assessment_id": self.assessment_id}
+        )
+        self.assertEqual(response.data["score"], 75.0)
+
+        results = self.client.get("/api/v1/assessment/results/").data["results"]
+        self.assertEqual(results[0]["score"], 100.0)
+
+    def test_rebuild_command_repairs_drift(self):
+        self.answer(self.questions[0], correct=True)
+        AssessmentLevelScore.objects.update(correct_count=3)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_level_scores", "--verify", stderr=StringIO())
+
+        call_command("rebuild_level_scores", stdout=StringIO())
+        self.assertEqual(self.counter().correct_count, 1)
+        call_command("rebuild_level_scores", "--verify", stdout=StringIO())
+
+
+@override_settings(TELEMETRY_BUFFER_ENABLED=False)
+class UxTelemetryEventBatchAPIViewTests(TestCase):
+    url = "/api/v1/assessment/telemetry/batch/"
+
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_writes_batch_in_one_insert(self):
+        events = [
+            {"event_type": "timer_tick", "stage": "level", "time_left": 60 - index}
+            for index in range(20)
+        ]
+        with self.assertNumQueries(1):
+            response = self.client.post(self.url, {"events": events}, format="json")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["accepted"], 20)
+        self.assertEqual(UxTelemetryEvent.objects.filter(user=self.user).count(), 20)
+
+    def test_rejects_empty_batch(self):
+        response = self.client.post(self.url, {"events": []}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(TELEMETRY_BUFFER_ENABLED=True)
+    def test_full_buffer_asks_client_to_back_off(self):
+        class FullBuffer:
+            def submit(self, events):
+                return False
+
+        original = telemetry.get_buffer
+        telemetry.get_buffer = FullBuffer
+        try:
+            response = self.client.post(
+                self.url, {"events": [{"event_type": "x"}]}, format="json"
+            )
+        finally:
+            telemetry.get_buffer = original
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "5")
+
+
+class TelemetryBufferTests(SimpleTestCase):
+    def test_flushes_by_size_age_and_on_close(self):
+        batches = []
+        buffer = telemetry.TelemetryBuffer(
+            max_batch=3, max_age=0.2, max_queue=10, sink=batches.append
+        )
+        self.assertTrue(buffer.submit(["a", "b", "c", "d"]))
+        time.sleep(0.5)
+        self.assertEqual(batches, [["a", "b", "c"], ["d"]])
+
+        self.assertTrue(buffer.submit(["e"]))
+        buffer.close()
+        self.assertEqual(batches[-1], ["e"])
+        self.assertFalse(buffer.submit(["f"]))
+
+    def test_rejects_events_beyond_queue_bound(self):
+        batches = []
+        buffer = telemetry.TelemetryBuffer(
+            max_batch=100, max_age=60, max_queue=5, sink=batches.append
+        )
+        try:
+            self.assertFalse(buffer.submit(list(range(6))))
+            self.assertTrue(buffer.submit([0, 1, 2]))
+            # A batch that only partly fits is rejected whole.
+            self.assertFalse(buffer.submit([3, 4, 5]))
+            self.assertTrue(buffer.submit([3, 4]))
+        finally:
+            buffer.close()
+        self.assertEqual(batches, [[0, 1, 2, 3, 4]])
+
+
+class TelemetryRollupTests(TestCase):
+    url = "/api/v1/assessment/telemetry-summary/"
+
+    def setUp(self):
+        cache.clear()
+        self.staff = make_user(email="staff@example.com", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+        self.users = [make_user(email=f"user{index}@example.com") for index in range(3)]
+
+    def add_events(self, user, event_type, count, stage="", level=""):
+        UxTelemetryEvent.objects.bulk_create(
+            UxTelemetryEvent(user=user, event_type=event_type, stage=stage, level=level)
+            for _ in range(count)
+        )
+
+    def test_summary_combines_rollups_and_tail(self):
+        self.add_events(
+            self.users[0], "assessment_started", 4, stage="level", level="1"
+        )
+        self.add_events(self.users[1], "assessment_completed", 2, stage="completed")
+        self.assertEqual(rollups.compact(settle_seconds=0), 6)
+        self.assertEqual(rollups.compact(settle_seconds=0), 0)
+        hourly = UxTelemetryRollup.objects.filter(period=UxTelemetryRollup.PERIOD_HOUR)
+        self.assertEqual(sorted(hourly.values_list("count", flat=True)), [2, 4])
+
+        # Tail events after the watermark are still counted.
+        self.add_events(
+            self.users[0], "assessment_started", 1, stage="level", level="1"
+        )
+        self.add_events(self.users[2], "assessment_ready_viewed", 3)
+
+        data = self.client.get(self.url).data
+        self.assertEqual(data["total_events"], 10)
+        self.assertEqual(data["distinct_users"], 3)
+        self.assertEqual(
+            data["event_counts"],
+            {
+                "assessment_started": 5,
+                "assessment_completed": 2,
+                "assessment_ready_viewed": 3,
+            },
+        )
+        self.assertEqual(data["stage_counts"], {"level": 5, "completed": 2})
+        self.assertEqual(data["level_counts"], {"1": 5})
+        self.assertEqual(data["funnel"]["completion_rate_from_start"], 40.0)
+        self.assertEqual(len(data["recent_events"]), 10)
+
+        rollups.compact(settle_seconds=0)
+        self.assertEqual(
+            self.client.get(self.url).data["event_counts"], data["event_counts"]
+        )
+
+    def test_summary_is_cached_until_fresh_requested(self):
+        self.add_events(self.users[0], "assessment_started", 2)
+        first = self.client.get(self.url).data
+        self.assertIn("as_of", first)
+
+        self.add_events(self.users[0], "assessment_started", 3)
+        self.assertEqual(self.client.get(self.url).data["total_events"], 2)
+        self.assertEqual(
+            self.client.get(self.url, {"fresh": "1"}).data["total_events"], 5
+        )
+
+    def test_events_committed_behind_the_watermark_are_rolled_up(self):
+        self.add_events(self.users[0], "assessment_started", 2)
+        # Ids 3 and 4 are still in flight when id 5 is rolled up.
+        UxTelemetryEvent.objects.create(
+            id=5, user=self.users[0], event_type="assessment_started"
+        )
+        self.assertEqual(rollups.compact(settle_seconds=0), 3)
+        self.assertEqual([gap[0] for gap in rollups.get_state().gap_ids], [3, 4])
+
+        UxTelemetryEvent.objects.create(
+            id=4, user=self.users[1], event_type="assessment_completed"
+        )
+        totals = rollups.totals()
+        self.assertEqual(totals["total_events"], 4)
+        self.assertEqual(totals["distinct_users"], 2)
+
+        self.assertEqual(rollups.compact(settle_seconds=0), 1)
+        self.assertEqual([gap[0] for gap in rollups.get_state().gap_ids], [3])
+        self.assertEqual(rollups.totals()["event_counts"], totals["event_counts"])
+
+    def test_finished_days_are_closed_into_daily_rows(self):
+        two_days_ago = timezone.now() - timedelta(days=2)
+        self.add_events(self.users[0], "assessment_started", 3)
+        UxTelemetryEvent.objects.update(created_at=two_days_ago)
+        self.add_events(self.users[1], "assessment_started", 2)
+        self.assertEqual(rollups.compact(settle_seconds=0), 5)
+
+        daily = UxTelemetryRollup.objects.filter(period=UxTelemetryRollup.PERIOD_DAY)
+        self.assertEqual(list(daily.values_list("count", flat=True)), [3])
+        today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.assertEqual(rollups.get_state().daily_through, today)
+        self.assertEqual(rollups.totals()["total_events"], 5)
+
+        # A late event from a closed day lands in both its hour and its day.
+        late = UxTelemetryEvent.objects.create(
+            user=self.users[2], event_type="assessment_started"
+        )
+        UxTelemetryEvent.objects.filter(id=late.id).update(created_at=two_days_ago)
+        self.assertEqual(rollups.compact(settle_seconds=0), 1)
+        self.assertEqual(list(daily.values_list("count", flat=True)), [4])
+        totals = rollups.totals()
+        self.assertEqual(totals["total_events"], 6)
+        self.assertEqual(totals["distinct_users"], 3)
+
+    def test_unsettled_events_stay_in_tail(self):
+        self.add_events(self.users[0], "assessment_started", 2)
+        self.assertEqual(rollups.compact(), 0)
+        self.assertEqual(self.client.get(self.url).data["total_events"], 2)
+
+
+class SingleFlightCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_callers_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {"value": len(calls)}
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    caching.single_flight("summary", 60, compute)[0]
+                )
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"value": 1}] * 5)
+
+    def test_stale_value_served_while_another_caller_recomputes(self):
+        caching.single_flight("summary", 0, lambda: "old")
+        cache.add("summary:lock", True)
+        value, _ = caching.single_flight("summary", 0, lambda: "new")
+        self.assertEqual(value, "old")
+
+        cache.delete("summary:lock")
+        self.assertEqual(caching.single_flight("summary", 0, lambda: "new")[0], "new")
+
+    def test_force_bypasses_fresh_value(self):
+        caching.single_flight("summary", 60, lambda: "old")
+        self.assertEqual(caching.single_flight("summary", 60, lambda: "new")[0], "old")
+        value, _ = caching.single_flight("summary", 60, lambda: "new", force=True)
+        self.assertEqual(value, "new")
+
+    def test_force_leaves_another_callers_lock_alone(self):
+        cache.add("summary:lock", True)
+        value, _ = caching.single_flight("summary", 60, lambda: "new", force=True)
+        self.assertEqual(value, "new")
+        self.assertTrue(cache.get("summary:lock"))
+
+
+class QueryMetricsMiddlewareTests(TestCase):
+    url = "/api/v1/metrics/queries/"
+
+    def setUp(self):
+        middleware.reset()
+        self.staff = make_user(email="staff@example.com", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_records_per_view_metrics(self):
+        self.client.get("/api/v1/user/profile/")
+        self.client.get("/api/v1/user/profile/")
+        views = self.client.get(self.url).data["views"]
+        profile = views["UserProfileView"]
+        self.assertEqual(profile["requests"], 2)
+        self.assertEqual(profile["query_budget"], 1)
+        # The second request is served from the profile cache.
+        self.assertEqual(profile["queries"]["p50"], 0)
+        self.assertEqual(profile["queries"]["p95"], 1)
+        self.assertIn("userauths_profile", profile["slowest_sql"]["sql"])
+        self.assertIsNotNone(profile["serialization_ms"]["p95"])
+
+    @mock.patch.object(api_views.UserProfileView, "query_budget", 0)
+    def test_budget_overrun_fails_in_strict_mode(self):
+        self.client.force_authenticate(None)
+        token = MyTokenObtainPairSerializer.get_token(self.staff).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        with self.assertRaises(middleware.QueryBudgetExceeded):
+            self.client.get("/api/v1/user/profile/")
+        profiles.invalidate_user(self.staff.id)
+        with override_settings(QUERY_BUDGET_STRICT=False):
+            with self.assertLogs("api.middleware", "WARNING"):
+                self.client.get("/api/v1/user/profile/")
+
+    def test_metrics_are_admin_only(self):
+        self.client.force_authenticate(make_user())
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+@override_settings(TELEMETRY_BUFFER_ENABLED=False)
+class LoadTestCommandTests(LiveServerTestCase):
+    def setUp(self):
+        question_bank.clear()
+        for level in ("1", "2", "3"):
+            make_question(level=level, text=f"Level {level}")
+
+    def test_runs_full_flow_and_writes_results(self):
+        output = os.path.join(tempfile.mkdtemp(), "run.json")
+        call_command(
+            "loadtest",
+            base_url=f"{self.live_server_url}/api/v1/",
+            users=2,
+            concurrency=1,
+            accuracy=1.0,
+            output=output,
+            stdout=StringIO(),
+        )
+        with open(output) as handle:
+            results = json.load(handle)
+
+        self.assertEqual(results["candidates"], {"completed": 2, "failed": 0})
+        endpoints = results["endpoints"]
+        self.assertEqual(endpoints["submit"]["count"], 6)
+        self.assertEqual(endpoints["history"]["count"], 2)
+        self.assertTrue(all(stats["errors"] == 0 for stats in endpoints.values()))
+
+        out = StringIO()
+        call_command(
+            "loadtest",
+            base_url=f"{self.live_server_url}/api/v1/",
+            users=1,
+            concurrency=1,
+            compare=output,
+            stdout=out,
+        )
+        self.assertIn("p95 vs base", out.getvalue())
+
+    def test_unexpected_candidate_error_does_not_end_the_run(self):
+        run = loadtest.Candidate.run
+        calls = []
+
+        def flaky_run(candidate):
+            calls.append(candidate)
+            if len(calls) == 1:
+                raise KeyError("profile_id")
+            return run(candidate)
+
+        output = os.path.join(tempfile.mkdtemp(), "run.json")
+        err = StringIO()
+        with mock.patch.object(loadtest.Candidate, "run", flaky_run):
+            call_command(
+                "loadtest",
+                base_url=f"{self.live_server_url}/api/v1/",
+                users=2,
+                concurrency=1,
+                output=output,
+                stdout=StringIO(),
+                stderr=err,
+            )
+        with open(output) as handle:
+            results = json.load(handle)
+        self.assertEqual(results["candidates"], {"completed": 1, "failed": 1})
+        self.assertEqual(results["endpoints"]["history"]["count"], 1)
+        self.assertIn("KeyError", err.getvalue())
+
+
+class GenerateDatasetCommandTests(TestCase):
+    def generate(self, prefix, users=25):
+        call_command(
+            "generate_dataset",
+            users=users,
+            seed=7,
+            prefix=prefix,
+            end="2026-01-31",
+            chunk_size=10,
+            stdout=StringIO(),
+        )
+
+    def fingerprint(self, prefix):
+        return list(
+            AssessmentLevelScore.objects.filter(
+                assessment__profile__user__email__startswith=prefix
+            )
+            .order_by("assessment_id", "level")
+            .values_list("level", "answered_count", "correct_count")
+        )
+
+    def test_generates_consistent_rows(self):
+        self.generate("a")
+
+        users = User.objects.filter(email__startswith="a-7-")
+        self.assertEqual(users.count(), 25)
+        self.assertEqual(Profile.objects.filter(user__in=users).count(), 25)
+        self.assertEqual(AssessmentQuestion.objects.count(), 30)
+        self.assertTrue(Assessment.objects.exists())
+        self.assertTrue(Result.objects.exists())
+        self.assertTrue(UxTelemetryEvent.objects.exists())
+        self.assertTrue(
+            AssessmentResponse.objects.filter(
+                submitted_at__lt=datetime(2026, 1, 31, tzinfo=dt_timezone.utc)
+            ).exists()
+        )
+        # Counters written alongside the responses must agree with them.
+        call_command("rebuild_level_scores", verify=True, stdout=StringIO())
+
+    def test_same_seed_produces_same_data(self):
+        self.generate("a")
+        self.generate("b")
+        self.assertEqual(self.fingerprint("a-"), self.fingerprint("b-"))
+
+        with self.assertRaises(CommandError):
+            self.generate("a")
+
+
+class LoadQuestionsCommandTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def entry(self, key, text, level="1", correct_index=0, choices=4):
+        return {
+            "key": key,
+            "level": level,
+            "type": "MC",
+            "text": text,
+            "choices": [
+                {"text": f"{text} choice {index}", "is_correct": index == correct_index}
+                for index in range(choices)
+            ],
+        }
+
+    def write_pack(self, questions, name="pack.json"):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as handle:
+            json.dump({"questions": questions}, handle)
+        return path
+
+    def load(self, *paths, **options):
+        out = StringIO()
+        call_command("loadquestions", *paths, stdout=out, **options)
+        return out.getvalue()
+
+    def version(self):
+        return QuestionBankVersion.objects.get(pk=1).version
+
+    def test_bundled_pack_loads_once(self):
+        output = self.load()
+        self.assertIn("30 created", output)
+        self.assertEqual(AssessmentQuestion.objects.count(), 30)
+        self.assertEqual(Choice.objects.count(), 80)
+
+        version = self.version()
+        with self.assertNumQueries(4):
+            output = self.load()
+        self.assertIn("0 created, 0 updated, 0 retired, 30 unchanged", output)
+        self.assertEqual(AssessmentQuestion.objects.count(), 30)
+        self.assertEqual(self.version(), version)
+
+    def test_adopts_matching_rows_and_retires_duplicates(self):
+        original = make_question(text="Shared")
+        duplicate = make_question(text="Shared")
+        path = self.write_pack([self.entry("shared", "Shared")])
+
+        self.assertIn("0 created, 1 updated, 1 retired", self.load(path))
+        original.refresh_from_db()
+        duplicate.refresh_from_db()
+        self.assertEqual(original.key, "shared")
+        self.assertTrue(original.is_active)
+        self.assertFalse(duplicate.is_active)
+
+    def test_updates_in_place_and_retires_removed_questions(self):
+        path = self.write_pack(
+            [self.entry("kept", "Kept"), self.entry("dropped", "Dropped")]
+        )
+        self.load(path)
+        kept = AssessmentQuestion.objects.get(key="kept")
+        dropped = AssessmentQuestion.objects.get(key="dropped")
+        choice_ids = list(kept.choices.order_by("id").values_list("id", flat=True))
+        user = make_user()
+        assessment = Assessment.objects.create(profile=user.profile)
+        AssessmentResponse.objects.create(
+            assessment=assessment, profile=user.profile, question=dropped
+        )
+
+        self.write_pack([{**self.entry("kept", "Kept"), "text": "Kept, reworded"}])
+        self.assertIn("0 created, 1 updated, 1 retired", self.load(path))
+
+        kept.refresh_from_db()
+        self.assertEqual(kept.text, "Kept, reworded")
+        self.assertEqual(
+            list(kept.choices.order_by("id").values_list("id", flat=True)), choice_ids
+        )
+        dropped.refresh_from_db()
+        self.assertFalse(dropped.is_active)
+        self.assertTrue(AssessmentResponse.objects.filter(question=dropped).exists())
+
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get("/api/v1/assessment/questions/", {"level": "1"})
+        self.assertEqual([item["id"] for item in response.json()], [kept.id])
+
+    def test_changed_choices_replace_the_question(self):
+        path = self.write_pack([self.entry("kept", "Kept")])
+        self.load(path)
+        old = AssessmentQuestion.objects.get(key="kept")
+        answer = old.choices.get(is_correct=True)
+        user = make_user()
+        response = AssessmentResponse.objects.create(
+            assessment=Assessment.objects.create(profile=user.profile),
+            profile=user.profile,
+            question=old,
+            selected_choice=answer,
+            is_correct=True,
+        )
+
+        self.write_pack([self.entry("kept", "Kept", correct_index=2)])
+        self.assertIn("0 created, 1 updated, 0 retired", self.load(path))
+
+        old.refresh_from_db()
+        self.assertFalse(old.is_active)
+        self.assertIsNone(old.key)
+        answer.refresh_from_db()
+        self.assertTrue(answer.is_correct)
+        response.refresh_from_db()
+        self.assertEqual(response.selected_choice, answer)
+
+        new = AssessmentQuestion.objects.get(key="kept")
+        self.assertNotEqual(new.id, old.id)
+        self.assertEqual(
+            list(new.choices.order_by("id").values_list("is_correct", flat=True)),
+            [False, False, True, False],
+        )
+        self.assertIn("1 unchanged", self.load(path))
+
+    def test_yaml_pack_and_dry_run(self):
+        path = os.path.join(self.directory, "pack.yaml")
+        with open(path, "w") as handle:
+            handle.write(
+                "questions:\n"
+                "  - key: yaml-1\n"
+                "    level: 2\n"
+                "    type: OE\n"
+                "    text: Describe a hard shift.\n"
+            )
+
+        self.assertIn("Would load 1 questions", self.load(path, dry_run=True))
+        self.assertFalse(AssessmentQuestion.objects.exists())
+        self.load(path)
+        self.assertEqual(AssessmentQuestion.objects.get(key="yaml-1").level, "2")
+
+    def test_rejects_invalid_packs(self):
+        bad = self.entry("bad", "Bad", correct_index=None)
+        with self.assertRaisesMessage(CommandError, "need a correct choice"):
+            self.load(self.write_pack([bad]))
+        with self.assertRaisesMessage(CommandError, "duplicates"):
+            self.load(self.write_pack([self.entry("a", "A"), self.entry("a", "B")]))
+        self.assertFalse(AssessmentQuestion.objects.exists())
+
+    def test_content_hash_ignores_row_ids(self):
+        entry = question_packs.parse_entry(self.entry(None, "Same"), "inline")
+        question = make_question(text="Same")
+        self.assertEqual(
+            question_packs.load_bank()[0]["current_hash"], entry["content_hash"]
+        )
+        self.assertEqual(question.id, question_packs.load_bank()[0]["id"])
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        authentication.clear()
+        self.user = make_user(is_staff=True)
+        self.client = APIClient()
+
+    def use_token(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_claims_token_needs_no_user_lookup(self):
+        token = MyTokenObtainPairSerializer.get_token(self.user).access_token
+        self.assertEqual(token["profile_id"], self.user.profile.id)
+        self.assertTrue(token["is_staff"])
+        self.use_token(token)
+
+        # One query fills the profile cache; both endpoints then read it.
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/v1/user/")
+        self.assertEqual(response.data["email"], self.user.email)
+        self.assertTrue(response.data["is_staff"])
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/v1/user/profile/")
+        self.assertEqual(response.data["id"], self.user.profile.id)
+        with self.assertNumQueries(0):
+            self.client.get("/api/v1/user/")
+
+    @override_settings(TELEMETRY_BUFFER_ENABLED=False)
+    def test_claims_user_can_write_telemetry(self):
+        self.use_token(MyTokenObtainPairSerializer.get_token(self.user).access_token)
+        response = self.client.post(
+            "/api/v1/assessment/telemetry/",
+            {"event_type": "assessment_ready_viewed"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(UxTelemetryEvent.objects.get().user_id, self.user.id)
+
+    @override_settings(AUTH_CLAIMS_CACHE_SIZE=2)
+    def test_claims_cache_is_bounded(self):
+        users = [self.user] + [
+            make_user(email=f"user{index}@example.com") for index in range(2)
+        ]
+        for user in users:
+            authentication.lookup_claims(user.id)
+        authentication.lookup_claims(users[1].id)
+        self.assertEqual(list(authentication._claims_cache), [users[2].id, users[1].id])
+
+    def test_legacy_token_falls_back_to_cached_lookup(self):
+        self.use_token(RefreshToken.for_user(self.user).access_token)
+        # The claims lookup and the profile cache fill.
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get("/api/v1/user/").status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/v1/user/").status_code, 200)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        authentication.clear()
+        self.assertEqual(self.client.get("/api/v1/user/").status_code, 401)
+
+
+class TokenBlacklistIndexTests(TestCase):
+    def setUp(self):
+        token_index.clear()
+        self.user = make_user()
+        self.client = APIClient()
+
+    def refresh(self, token):
+        return self.client.post(
+            "/api/v1/user/token/refresh/", {"refresh": str(token)}, format="json"
+        )
+
+    def test_rotated_refresh_token_cannot_be_reused(self):
+        tokens = self.client.post(
+            "/api/v1/user/token/",
+            {"email": self.user.email, "password": "Str0ng-pass!"},
+            format="json",
+        ).data
+
+        rotated = self.refresh(tokens["refresh"])
+        self.assertEqual(rotated.status_code, 200)
+        self.assertEqual(self.refresh(tokens["refresh"]).status_code, 401)
+        self.assertEqual(self.refresh(rotated.data["refresh"]).status_code, 200)
+        self.assertEqual(BlacklistedToken.objects.count(), 2)
+
+    @override_settings(TOKEN_BLACKLIST_SYNC_SECONDS=60)
+    def test_checks_are_answered_from_memory(self):
+        token = token_index.IndexedRefreshToken.for_user(self.user)
+        token_index.IndexedRefreshToken(str(token))
+        with self.assertNumQueries(0):
+            token_index.IndexedRefreshToken(str(token))
+
+        # Another worker blacklists the token and bumps the shared version.
+        outstanding = OutstandingToken.objects.get(jti=token["jti"])
+        BlacklistedToken.objects.create(token=outstanding)
+        cache.set(token_index.VERSION_KEY, 99)
+        with self.assertRaises(TokenError):
+            token_index.IndexedRefreshToken(str(token))
+
+    @override_settings(TOKEN_BLACKLIST_SYNC_SECONDS=0)
+    def test_index_catches_up_without_a_shared_cache(self):
+        token = token_index.IndexedRefreshToken.for_user(self.user)
+        token_index.IndexedRefreshToken(str(token))
+        BlacklistedToken.objects.create(
+            token=OutstandingToken.objects.get(jti=token["jti"])
+        )
+        with self.assertRaises(TokenError):
+            token_index.IndexedRefreshToken(str(token))
+
+    @override_settings(TOKEN_BLACKLIST_SYNC_SECONDS=0)
+    def test_index_sees_rows_committed_out_of_id_order(self):
+        first, second = (
+            token_index.IndexedRefreshToken.for_user(self.user) for _ in range(2)
+        )
+        outstanding = {
+            token["jti"]: OutstandingToken.objects.get(jti=token["jti"])
+            for token in (first, second)
+        }
+        BlacklistedToken.objects.create(id=50, token=outstanding[second["jti"]])
+        with self.assertRaises(TokenError):
+            token_index.IndexedRefreshToken(str(second))
+
+        # A transaction that took id 10 commits after id 50 was synced.
+        BlacklistedToken.objects.create(id=10, token=outstanding[first["jti"]])
+        with self.assertRaises(TokenError):
+            token_index.IndexedRefreshToken(str(first))
+
+    def test_prune_removes_only_expired_tokens(self):
+        now = timezone.now()
+        for index, expires_at in enumerate(
+            [
+                now - timedelta(days=1),
+                now - timedelta(minutes=1),
+                now + timedelta(days=1),
+            ]
+        ):
+            outstanding = OutstandingToken.objects.create(
+                user=self.user, jti=f"jti-{index}", token="t", expires_at=expires_at
+            )
+            BlacklistedToken.objects.create(token=outstanding)
+
+        out = StringIO()
+        call_command("prune_tokens", batch_size=1, stdout=out)
+        self.assertIn("Pruned 2", out.getvalue())
+        self.assertEqual(
+            list(OutstandingToken.objects.values_list("jti", flat=True)), ["jti-2"]
+        )
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+
+class FlakyEmailBackend(BaseEmailBackend):
+    """Fails for recipients listed in ``failing``; records everything else."""
+
+    failing = set()
+    sent = []
+    opened = 0
+
+    def open(self):
+        FlakyEmailBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & self.failing:
+                raise ConnectionError("provider unavailable")
+            self.sent.append(message)
+        return len(messages)
+
+
+class AccountWriteTests(TestCase):
+    def test_register_inserts_user_and_profile_once(self):
+        payload = {
+            "full_name": "New Candidate",
+            "email": "new@example.com",
+            "password": "Str0ng-pass!",
+            "password2": "Str0ng-pass!",
+        }
+        # Two uniqueness checks, then a savepoint around both INSERTs.
+        with self.assertNumQueries(6):
+            response = APIClient().post("/api/v1/user/register/", payload)
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(email="new@example.com")
+        self.assertEqual(user.username, "new")
+        self.assertTrue(user.check_password("Str0ng-pass!"))
+        self.assertEqual(user.profile.full_name, "new")
+
+    def test_password_reset_and_change_write_only_the_user_row(self):
+        user = make_user()
+        updated_at = user.profile.updated_at
+        # User lookup, outstanding token, then the OTP UPDATE and outbox
+        # INSERT in a savepoint; the response reads groups and permissions.
+        with self.assertNumQueries(8):
+            APIClient().get(f"/api/v1/user/password-reset/{user.email}/")
+        user.refresh_from_db()
+
+        # Lookup by id and OTP, then one UPDATE of password and otp.
+        with self.assertNumQueries(2):
+            response = APIClient().post(
+                "/api/v1/user/password-change/",
+                {"otp": user.otp, "uuidb64": user.pk, "password": "N3w-pass!"},
+            )
+        self.assertEqual(response.status_code, 201)
+        user.refresh_from_db()
+        self.assertTrue(user.check_password("N3w-pass!"))
+        self.assertEqual(user.otp, "")
+        user.profile.refresh_from_db()
+        self.assertEqual(user.profile.updated_at, updated_at)
+
+    def test_saving_a_user_leaves_a_named_profile_alone(self):
+        user = make_user()
+        # The user UPDATE and a profile UPDATE that matches no rows.
+        with self.assertNumQueries(2):
+            user.save()
+        Profile.objects.filter(user=user).update(full_name="")
+        user.save()
+        self.assertEqual(Profile.objects.get(user=user).full_name, user.username)
+
+
+@override_settings(
+    EMAIL_BACKEND="api.tests.FlakyEmailBackend",
+    OUTBOX_MAX_ATTEMPTS=2,
+    OUTBOX_RETRY_BASE_SECONDS=60,
+)
+class OutboxTests(TestCase):
+    def setUp(self):
+        FlakyEmailBackend.failing = set()
+        FlakyEmailBackend.sent = []
+        FlakyEmailBackend.opened = 0
+
+    def test_password_reset_queues_instead_of_sending(self):
+        user = make_user()
+        response = APIClient().get(f"/api/v1/user/password-reset/{user.email}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(FlakyEmailBackend.sent, [])
+        queued = OutboxEmail.objects.get()
+        user.refresh_from_db()
+        self.assertEqual(queued.to, [user.email])
+        self.assertIn(f"otp={user.otp}", queued.html_body)
+
+    def test_rolled_back_request_queues_nothing(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                outbox.enqueue("a@example.com", "Hello", "body")
+                raise RuntimeError
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    def test_batch_shares_one_connection_and_retries_then_dead_letters(self):
+        for index in range(3):
+            outbox.enqueue(f"user{index}@example.com", "Hello", "body", "<p>body</p>")
+        FlakyEmailBackend.failing = {"user1@example.com"}
+
+        out = StringIO()
+        call_command("send_outbox", once=True, stdout=out)
+        self.assertIn("2 sent, 1 to retry, 0 dead", out.getvalue())
+        self.assertEqual(FlakyEmailBackend.opened, 1)
+        self.assertEqual(
+            sorted(message.to[0] for message in FlakyEmailBackend.sent),
+            ["user0@example.com", "user2@example.com"],
+        )
+        self.assertEqual(FlakyEmailBackend.sent[0].alternatives[0][1], "text/html")
+
+        failed = OutboxEmail.objects.get(to=["user1@example.com"])
+        self.assertEqual(failed.status, OutboxEmail.STATUS_PENDING)
+        self.assertIn("provider unavailable", failed.last_error)
+        self.assertGreater(failed.next_attempt_at, timezone.now())
+
+        # Not due yet, then due and failing again: out of attempts.
+        self.assertEqual(outbox.deliver(), (0, 0, 0))
+        OutboxEmail.objects.filter(pk=failed.pk).update(next_attempt_at=timezone.now())
+        with self.assertLogs("api.outbox", "ERROR") as logs:
+            self.assertEqual(outbox.deliver(), (0, 0, 1))
+        self.assertIn(f"Outbox email {failed.pk} dead after 2 attempts", logs.output[0])
+        failed.refresh_from_db()
+        self.assertEqual(failed.status, OutboxEmail.STATUS_DEAD)
+        self.assertEqual(failed.attempts, 2)
+
+
+class AsyncViewsTests(TestCase):
+    def setUp(self):
+        question_bank.clear()
+        self.user = make_user()
+        token = MyTokenObtainPairSerializer.get_token(self.user).access_token
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.questions = [
+            make_question(level="1", text=f"Question {index}") for index in range(3)
+        ]
+        self.assessment = Assessment.objects.create(profile=self.user.profile)
+
+    async def call(self, view_class, method, path, data=None):
+        factory = AsyncRequestFactory()
+        if method == "get":
+            request = factory.get(path, data, headers=self.headers)
+        else:
+            request = factory.post(
+                path, data, content_type="application/json", headers=self.headers
+            )
+        return await view_class.as_view()(request)
+
+    async def test_question_list_matches_sync_payload(self):
+        response = await self.call(
+            async_views.AssessmentQuestionListView, "get", "/", {"level": "1"}
+        )
+        self.assertEqual(response.status_code, 200)
+        _, body = await sync_to_async(question_bank.get_level_payload)("1")
+        self.assertEqual(response.content, body)
+
+    async def test_queries_are_recorded_through_the_middleware(self):
+        class urls:
+            urlpatterns = [
+                path("questions/", async_views.AssessmentQuestionListView.as_view())
+            ]
+
+        await sync_to_async(middleware.reset)()
+        with override_settings(ROOT_URLCONF=urls):
+            response = await AsyncClient().get(
+                "/questions/", {"level": "1"}, headers=self.headers
+            )
+        self.assertEqual(response.status_code, 200)
+        metrics = middleware.snapshot()["AssessmentQuestionListView"]
+        self.assertEqual(metrics["requests"], 1)
+        self.assertEqual(metrics["queries"]["max"], 3)
+        self.assertGreater(metrics["db_ms"]["max"], 0)
+
+    async def test_rejects_missing_token(self):
+        request = AsyncRequestFactory().get("/", {"level": "1"})
+        response = await async_views.AssessmentQuestionListView.as_view()(request)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("WWW-Authenticate", response)
+
+    async def test_answers_update_counters_and_results(self):
+        question = self.questions[0]
+        correct = await question.choices.filter(is_correct=True).afirst()
+        response = await self.call(
+            async_views.AssessmentResponseSubmitView,
+            "post",
+            "/",
+            {
+                "assessment": self.assessment.id,
+                "profile": self.user.profile.id,
+                "question": question.id,
+                "selected_choice": correct.id,
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+
+        wrong = [
+            {
+                "question": question.id,
+                "selected_choice": (
+                    await question.choices.filter(is_correct=False).afirst()
+                ).id,
+            }
+            for question in self.questions[1:]
+        ]
+        response = await self.call(
+            async_views.AssessmentResponseBulkSubmitView,
+            "post",
+            "/",
+            {"assessment": self.assessment.id, "responses": wrong},
+        )
+        self.assertEqual(json.loads(response.content)["saved"], 2)
+
+        response = await self.call(async_views.AssessmentResultsAPIView, "get", "/")
+        [result] = json.loads(response.content)["results"]
+        self.assertEqual((result["level"], result["score"]), ("1", 33.33))
+
+    async def test_invalid_bulk_payload_returns_serializer_errors(self):
+        response = await self.call(
+            async_views.AssessmentResponseBulkSubmitView,
+            "post",
+            "/",
+            {"assessment": self.assessment.id, "responses": []},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("responses", json.loads(response.content))
+
+    @override_settings(TELEMETRY_BUFFER_ENABLED=False)
+    async def test_telemetry_batch_is_written(self):
+        response = await self.call(
+            async_views.UxTelemetryEventBatchAPIView,
+            "post",
+            "/",
+            {"events": [{"event_type": "timer_tick"}, {"event_type": "timer_tick"}]},
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(
+            await UxTelemetryEvent.objects.filter(user=self.user).acount(), 2
+        )
+
+
+class SqliteProductionBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "profile.sqlite3")
+        self.wrapper = sqlite_backend.DatabaseWrapper(
+            {
+                **connection.settings_dict,
+                "ENGINE": "backend.sqlite",
+                "NAME": self.path,
+                "OPTIONS": {
+                    "timeout": 0.1,
+                    "begin_immediate": True,
+                    "pragmas": {"journal_mode": "WAL", "synchronous": "NORMAL"},
+                },
+            },
+            alias="sqlite-profile",
+        )
+        self.addCleanup(self.wrapper.close)
+
+    def pragma(self, name):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied_on_connect(self):
+        self.assertEqual(self.pragma("journal_mode"), "wal")
+        self.assertEqual(self.pragma("synchronous"), 1)
+        self.assertEqual(self.pragma("busy_timeout"), 100)
+
+    def test_atomic_blocks_take_the_write_lock_up_front(self):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute("CREATE TABLE t (id INTEGER)")
+
+        other = sqlite3.connect(self.path, timeout=0)
+        self.addCleanup(other.close)
+        # What atomic() runs on SQLite, before any statement of the block.
+        self.wrapper._start_transaction_under_autocommit()
+        try:
+            with self.assertRaisesMessage(sqlite3.OperationalError, "locked"):
+                other.execute("INSERT INTO t VALUES (1)")
+        finally:
+            self.wrapper.cursor().execute("ROLLBACK")
+
+
+@override_settings(REPLICA_DATABASE="replica", REPLICA_STICKY_SECONDS=10)
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.router = replica.ReplicaRouter()
+        self.middleware = replica.ReplicaMiddleware(lambda request: HttpResponse())
+
+    def route(self, request, model=AssessmentResponse):
+        token = replica._request.set(request)
+        try:
+            return self.router.db_for_read(model)
+        finally:
+            replica._request.reset(token)
+
+    def request(self, replica_view=True):
+        request = AsyncRequestFactory().get("/")
+        request._replica = replica_view
+        return request
+
+    def decide(self, **headers):
+        request = RequestFactory().get("/api/v1/assessment/history/", **headers)
+        request.user = self.user
+        view = api_views.AssessmentHistoryAPIView.as_view()
+        request.resolver_match = resolve(request.path)
+        self.middleware.process_view(request, view, (), {})
+        return request._replica
+
+    def test_only_designated_views_read_from_the_replica(self):
+        self.assertEqual(self.route(self.request()), "replica")
+        self.assertIsNone(self.route(self.request(replica_view=False)))
+        self.assertIsNone(self.router.db_for_read(AssessmentResponse))
+        self.assertIsNone(self.router.db_for_write(AssessmentResponse))
+        self.assertFalse(self.router.allow_migrate("replica", "api"))
+
+    def test_authentication_reads_stay_on_the_primary(self):
+        for model in (User, Session, Permission):
+            self.assertIsNone(self.route(self.request(), model))
+
+    def test_views_opt_in(self):
+        self.assertTrue(api_views.AssessmentHistoryAPIView.read_replica)
+        self.assertTrue(api_views.AssessmentResultsAPIView.read_replica)
+        self.assertTrue(async_views.AssessmentResultsAPIView.read_replica)
+        self.assertTrue(api_views.UxTelemetrySummaryAPIView.read_replica)
+        self.assertFalse(
+            hasattr(api_views.AssessmentResponseSubmitView, "read_replica")
+        )
+
+    def test_writer_is_pinned_to_the_primary(self):
+        token = MyTokenObtainPairSerializer.get_token(self.user).access_token
+        bearer = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        self.assertTrue(self.decide(**bearer))
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post(
+            "/api/v1/assessment/telemetry/batch/",
+            {"events": [{"event_type": "x"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(cache.get(replica.pin_key(self.user.id)))
+        self.assertFalse(self.decide(**bearer))
+        # The session user when there is no bearer token.
+        self.assertFalse(self.decide())
+
+    def test_failed_writes_do_not_pin(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        client.post(
+            "/api/v1/assessment/telemetry/batch/", {"events": []}, format="json"
+        )
+        self.assertIsNone(cache.get(replica.pin_key(self.user.id)))
+
+    # The test database has no replica alias; routing replica reads to
+    # "default" still runs the router on every admin query.
+    @override_settings(REPLICA_DATABASE="default")
+    def test_admin_changelist_with_a_replica(self):
+        admin = make_user(email="admin@example.com", is_staff=True, is_superuser=True)
+        self.client.force_login(admin)
+        response = self.client.get("/admin/userauths/user/")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.user.email)
+
+
+class SyncReplicaCommandTests(SimpleTestCase):
+    def test_copies_the_primary_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, "primary.sqlite3")
+            target = os.path.join(tmpdir, "replica.sqlite3")
+            with sqlite3.connect(source) as db:
+                db.execute("CREATE TABLE t (id INTEGER)")
+                db.execute("INSERT INTO t VALUES (1), (2)")
+            replica.copy_sqlite(source, target)
+            with contextlib.closing(sqlite3.connect(target)) as db:
+                self.assertEqual(db.execute("SELECT COUNT(*) FROM t").fetchone()[0], 2)
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_requires_a_replica(self):
+        with self.assertRaisesMessage(CommandError, "DATABASE_REPLICA_URL"):
+            call_command("sync_replica", stdout=StringIO())
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_matches_drf_json_renderer(self):
+        data = {
+            "when": datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            "naive": datetime(2024, 5, 1, 12, 30),
+            "score": Decimal("0.75"),
+            "text": "caf\u00e9 \u2028 \u2029",
+            1: ["a", None, True, 2.5],
+        }
+        self.assertEqual(
+            renderers.ORJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_falls_back_for_data_orjson_cannot_encode(self):
+        self.assertEqual(
+            renderers.dumps({"big": 2**70}), b'{"big":1180591620717411303424}'
+        )
+
+    def test_honours_requested_indent(self):
+        body = renderers.ORJSONRenderer().render(
+            {"a": 1}, "application/json; indent=2", {}
+        )
+        self.assertEqual(body, b'{\n  "a": 1\n}')
+
+
+class LeanSerializerTests(TestCase):
+    def test_match_the_model_serializers(self):
+        user = make_user()
+        question = AssessmentQuestion.objects.create(level="1", type="MC", text="Q")
+        Choice.objects.create(question=question, text="A", is_correct=True)
+        Choice.objects.create(question=question, text="B")
+        question = AssessmentQuestion.objects.prefetch_related("choices").get()
+
+        for model_serializer, lean, instance in (
+            (
+                api_serializer.AssessmentQuestionSerializer,
+                api_serializer.question_data,
+                question,
+            ),
+            (
+                api_serializer.ProfileSerializer,
+                api_serializer.profile_data,
+                user.profile,
+            ),
+        ):
+            self.assertEqual(
+                renderers.dumps(lean(instance)),
+                JSONRenderer().render(model_serializer(instance).data),
+            )
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        question_bank.clear()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        make_question(level="1", text="Question")
+
+    def revalidate(self, url, etag, **params):
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+
+    def test_questions_not_modified_until_the_bank_changes(self):
+        url = "/api/v1/assessment/questions/"
+        first = self.client.get(url, {"level": "1"})
+        etag = first["ETag"]
+        self.assertIn("private", first["Cache-Control"])
+
+        with self.assertNumQueries(1):
+            response = self.revalidate(url, etag, level="1")
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(self.revalidate(url, etag, level="2").status_code, 200)
+
+        make_question(level="1", text="Another")
+        response = self.revalidate(url, etag, level="1")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_profile_not_modified_until_it_is_saved(self):
+        url = "/api/v1/user/profile/"
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+        profile = self.user.profile
+        profile.full_name = "Renamed"
+        profile.save()
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["full_name"], "Renamed")
+
+    def test_results_not_modified_until_an_answer_changes(self):
+        url = "/api/v1/assessment/results/"
+        assessment_id = self.client.post("/api/v1/assessment/start/").data[
+            "assessment_id"
+        ]
+        etag = self.client.get(url)["ETag"]
+        # Only the ETag stamps; no results are read or rendered.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+        question = AssessmentQuestion.objects.get()
+        self.client.post(
+            "/api/v1/assessment/submit-response/",
+            {
+                "assessment": assessment_id,
+                "profile": self.user.profile.id,
+                "question": question.id,
+                "selected_choice": question.choices.first().id,
+            },
+        )
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content)["results"]), 1)
+
+
+class ProfileCacheTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_me_and_profile_share_one_load(self):
+        with self.assertNumQueries(1):
+            self.client.get("/api/v1/user/profile/")
+        with self.assertNumQueries(0):
+            me = json.loads(self.client.get("/api/v1/user/").content)
+            profile = json.loads(self.client.get("/api/v1/user/profile/").content)
+        self.assertEqual(me["email"], self.user.email)
+        self.assertEqual(profile["id"], self.user.profile.id)
+
+    def test_saves_invalidate_the_entry(self):
+        self.client.get("/api/v1/user/")
+        self.user.full_name = "New Name"
+        self.user.save()
+        me = json.loads(self.client.get("/api/v1/user/").content)
+        self.assertEqual(me["full_name"], "New Name")
+
+        profile = self.user.profile
+        profile.full_name = "Profile Name"
+        profile.save()
+        data = json.loads(self.client.get("/api/v1/user/profile/").content)
+        self.assertEqual(data["full_name"], "Profile Name")
+
+        profile.delete()
+        response = self.client.get("/api/v1/user/profile/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_resolved_once_per_request(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        entry = profiles.for_request(request)
+        profiles.invalidate_user(self.user.id)
+        with self.assertNumQueries(0):
+            self.assertIs(profiles.for_request(request), entry)
+
+
+@override_settings(COMPRESSION_MIN_BYTES=100)
+class CompressionTests(TestCase):
+    def setUp(self):
+        question_bank.clear()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for index in range(5):
+            make_question(level="1", text=f"Level 1 question {index}")
+
+    def middleware(self, response, encoding="gzip, br", view=None):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=encoding)
+        middleware = compression.CompressionMiddleware(lambda request: response)
+        if view is not None:
+            middleware.process_view(request, view, (), {})
+        return middleware.process_response(request, response)
+
+    def json_response(self, size):
+        return HttpResponse(
+            b"[" + b"1," * size + b"1]", content_type="application/json"
+        )
+
+    def test_negotiates_brotli_then_gzip(self):
+        def negotiate(header):
+            return compression.negotiate(
+                RequestFactory().get("/", HTTP_ACCEPT_ENCODING=header)
+            )
+
+        best = "br" if compression.brotli else "gzip"
+        self.assertEqual(negotiate("gzip, deflate, br"), best)
+        self.assertEqual(negotiate("gzip, br;q=0"), "gzip")
+        self.assertEqual(negotiate("*"), best)
+        self.assertIsNone(negotiate("identity"))
+        self.assertIsNone(negotiate(""))
+
+    def test_compresses_large_json_only(self):
+        response = self.json_response(1000)
+        response["ETag"] = '"v1"'
+        body = response.content
+        response = self.middleware(response, encoding="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["ETag"], 'W/"v1"')
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), body)
+
+        small = self.middleware(self.json_response(10))
+        self.assertFalse(small.has_header("Content-Encoding"))
+        image = HttpResponse(b"x" * 1000, content_type="image/png")
+        self.assertFalse(self.middleware(image).has_header("Content-Encoding"))
+
+    def test_views_can_opt_out(self):
+        self.assertFalse(api_views.MyTokenObtainView.compress)
+        self.assertFalse(api_views.TokenRefreshAPIView.compress)
+        response = self.middleware(
+            self.json_response(1000), view=api_views.TokenRefreshAPIView.as_view()
+        )
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_streams_are_compressed_incrementally(self):
+        chunks = [b"[", b"1," * 500, b"1]"]
+        response = self.middleware(
+            StreamingHttpResponse(iter(chunks), content_type="application/json"),
+            encoding="gzip",
+        )
+        self.assertEqual(
+            gzip.decompress(b"".join(response.streaming_content)), b"".join(chunks)
+        )
+
+    def test_question_bank_is_served_precompressed(self):
+        url = "/api/v1/assessment/questions/"
+        plain = self.client.get(url, {"level": "1"}).content
+        response = self.client.get(url, {"level": "1"}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), plain)
+
+        cached = question_bank._encoded[("1", "gzip")]
+        self.client.get(url, {"level": "1"}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertIs(question_bank._encoded[("1", "gzip")], cached)
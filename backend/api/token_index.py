@@ -0,0 +1,185 @@
+"""In-process index of blacklisted refresh tokens, plus pruning.
+
+Every refresh checks whether the presented token was blacklisted by an earlier
+rotation. Instead of a joined query per refresh, each worker keeps the JTIs of
+unexpired blacklisted tokens in memory and syncs it from ``BlacklistedToken``
+by id watermark. Ids are allocated before commit, so a row can become
+visible after a higher id was already read; each sync re-reads the last
+``TOKEN_BLACKLIST_SYNC_OVERLAP`` ids below the watermark to pick it up.
+Workers learn about each other's writes through a version stamp in the
+shared cache. Even with a local-memory cache the index is never more than
+``TOKEN_BLACKLIST_SYNC_SECONDS`` behind. A full rebuild every
+``TOKEN_BLACKLIST_REBUILD_SECONDS`` drops expired entries.
+
+Expired tokens are useless, so ``prune_expired`` deletes them in batches, and
+``maybe_prune`` runs it in the background once per
+``TOKEN_PRUNE_INTERVAL_SECONDS`` per worker.
+"""
+
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "token-blacklist:version"
+PRUNE_KEY = "token-blacklist:prune"
+
+
+def _compact(jti):
+    # simplejwt JTIs are uuid4 hex; 16 bytes instead of a 32-character str.
+    try:
+        return uuid.UUID(hex=jti).bytes
+    except (TypeError, ValueError):
+        return jti
+
+
+class BlacklistIndex:
+    def __init__(self):
+        self._entries = {}  # compact jti -> expiry
+        self._watermark = 0
+        self._version = None
+        self._synced_at = None
+        self._rebuilt_at = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def contains(self, jti):
+        self.sync()
+        return _compact(jti) in self._entries
+
+    def add(self, jti, expires_at):
+        with self._lock:
+            self._entries[_compact(jti)] = expires_at
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, 1, None)
+
+    def sync(self):
+        now = time.monotonic()
+        version = cache.get(VERSION_KEY)
+        if (
+            self._synced_at is not None
+            and version == self._version
+            and now - self._synced_at < settings.TOKEN_BLACKLIST_SYNC_SECONDS
+        ):
+            return
+
+        with self._lock:
+            rebuild = (
+                self._rebuilt_at is None
+                or now - self._rebuilt_at >= settings.TOKEN_BLACKLIST_REBUILD_SECONDS
+            )
+            rows = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+            if not rebuild:
+                rows = rows.filter(
+                    id__gt=self._watermark - settings.TOKEN_BLACKLIST_SYNC_OVERLAP
+                )
+            entries = {} if rebuild else self._entries
+            watermark = 0 if rebuild else self._watermark
+            for row_id, jti, expires_at in rows.values_list(
+                "id", "token__jti", "token__expires_at"
+            ).order_by("id"):
+                entries[_compact(jti)] = expires_at
+                watermark = max(watermark, row_id)
+            if rebuild:
+                # Keep tokens this worker blacklisted after the snapshot began.
+                cutoff = timezone.now()
+                for key, expires_at in self._entries.items():
+                    if expires_at > cutoff:
+                        entries.setdefault(key, expires_at)
+                self._rebuilt_at = now
+            self._entries = entries
+            self._watermark = watermark
+            self._version = version
+            self._synced_at = now
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = BlacklistIndex()
+    return _index
+
+
+def clear():
+    global _index
+    with _index_lock:
+        _index = None
+    cache.delete_many([VERSION_KEY, PRUNE_KEY])
+
+
+class IndexedRefreshToken(RefreshToken):
+    """Refresh token whose blacklist check is answered by the in-process index."""
+
+    def check_blacklist(self):
+        if get_index().contains(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError("Token is blacklisted")
+
+    def blacklist(self):
+        result = super().blacklist()
+        get_index().add(
+            self.payload[api_settings.JTI_CLAIM],
+            datetime_from_epoch(self.payload["exp"]),
+        )
+        return result
+
+
+def prune_expired(batch_size=5000):
+    """Delete expired outstanding tokens and their blacklist rows; return how many."""
+    now = timezone.now()
+    deleted = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+
+
+def _prune_in_background():
+    try:
+        pruned = prune_expired()
+        if pruned:
+            logger.info("Pruned %s expired refresh tokens", pruned)
+    except Exception:
+        logger.exception("Pruning expired refresh tokens failed")
+    finally:
+        close_old_connections()
+
+
+def maybe_prune():
+    """Start a background prune if none ran within the prune interval."""
+    interval = settings.TOKEN_PRUNE_INTERVAL_SECONDS
+    if interval > 0 and cache.add(PRUNE_KEY, True, interval):
+        threading.Thread(
+            target=_prune_in_background, name="token-prune", daemon=True
+        ).start()
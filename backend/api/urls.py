@@ -1,13 +1,20 @@
+from api import async_views
 from api import views as api_views
+from django.conf import settings
 from django.urls import path
 
-from rest_framework_simplejwt.views import TokenRefreshView
+# The hot endpoints have async versions for ASGI deployments; see docs/asgi.md.
+hot_views = async_views if settings.ASYNC_VIEWS else api_views
 
 urlpatterns = [
     path(
         "user/token/", api_views.MyTokenObtainView.as_view(), name="token_obtain_pair"
     ),
-    path("user/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path(
+        "user/token/refresh/",
+        api_views.TokenRefreshAPIView.as_view(),
+        name="token_refresh",
+    ),
     path("user/register/", api_views.RegisterView.as_view(), name="register"),
     path(
         "user/password-reset/<email>/",
@@ -19,14 +26,19 @@ urlpatterns = [
     # Assessment routes
     path(
         "assessment/questions/",
-        api_views.AssessmentQuestionListView.as_view(),
+        hot_views.AssessmentQuestionListView.as_view(),
         name="assessment-questions",
     ),
     path(
         "assessment/submit-response/",
-        api_views.AssessmentResponseSubmitView.as_view(),
+        hot_views.AssessmentResponseSubmitView.as_view(),
         name="submit-response",
     ),
+    path(
+        "assessment/submit-response/bulk/",
+        hot_views.AssessmentResponseBulkSubmitView.as_view(),
+        name="submit-response-bulk",
+    ),
     path(
         "assessment/start/",
         api_views.StartAssessmentAPIView.as_view(),
@@ -39,7 +51,7 @@ urlpatterns = [
     ),
     path(
         "assessment/results/",
-        api_views.AssessmentResultsAPIView.as_view(),
+        hot_views.AssessmentResultsAPIView.as_view(),
         name="assessment-results",
     ),
     path(
@@ -49,12 +61,22 @@ urlpatterns = [
     ),
     path(
         "assessment/telemetry/",
-        api_views.UxTelemetryEventAPIView.as_view(),
+        hot_views.UxTelemetryEventAPIView.as_view(),
         name="assessment-telemetry",
     ),
+    path(
+        "assessment/telemetry/batch/",
+        hot_views.UxTelemetryEventBatchAPIView.as_view(),
+        name="assessment-telemetry-batch",
+    ),
     path(
         "assessment/telemetry-summary/",
         api_views.UxTelemetrySummaryAPIView.as_view(),
         name="assessment-telemetry-summary",
     ),
+    path(
+        "metrics/queries/",
+        api_views.QueryMetricsAPIView.as_view(),
+        name="query-metrics",
+    ),
 ]
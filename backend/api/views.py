@@ -1,12 +1,28 @@
 from django.shortcuts import render
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework.views import APIView
-from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Subquery
 
 
 from api import serializer as api_serializer
+from api.authentication import CachedJWTAuthentication, profile_id_for
+from api import caching
+from api import conditional
+from api import fieldsets
+from api import middleware as api_middleware
+from api import outbox
+from api import pagination
+from api import profiles
+from api import question_bank
+from api import renderers
+from api import rollups
+from api import scoring
+from api import telemetry
+from api import token_index
 from userauths.models import (
     User,
     Profile,
@@ -18,9 +34,10 @@ from userauths.models import (
     Choice,
     AssessmentResponse,
     Assessment,
+    AssessmentLevelScore,
 )
 
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework import generics, status, permissions
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
@@ -31,6 +48,9 @@ from rest_framework.response import Response
 
 from rest_framework.permissions import IsAdminUser
 from django.utils import timezone
+from asgiref.sync import sync_to_async
+import functools
+import itertools
 import logging
 
 import random
@@ -39,6 +59,11 @@ from api.models import UxTelemetryEvent
 logger = logging.getLogger(__name__)
 
 
+# Read-only and answer-submission views authenticate from token claims and
+# skip the per-request user lookup; see api/authentication.py.
+CLAIMS_AUTHENTICATION = [CachedJWTAuthentication]
+
+
 def _safe_percent(numerator, denominator):
     if denominator <= 0:
         return None
@@ -50,6 +75,19 @@ def _safe_percent(numerator, denominator):
 
 class MyTokenObtainView(TokenObtainPairView):
     serializer_class = api_serializer.MyTokenObtainPairSerializer
+    # Responses carrying tokens are never compressed; see api/compression.py.
+    compress = False
+
+
+class TokenRefreshAPIView(TokenRefreshView):
+    serializer_class = api_serializer.IndexedTokenRefreshSerializer
+    query_budget = 8
+    compress = False
+
+    def post(self, request, *args, **kwargs):
+        response = super().post(request, *args, **kwargs)
+        token_index.maybe_prune()
+        return response
 
 
 class RegisterView(generics.CreateAPIView):
@@ -69,6 +107,33 @@ class RegisterView(generics.CreateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def prepopulate_level_responses(assessment, level, ignore_conflicts=False):
+    """Create the blank response rows for every question of ``level``.
+
+    Runs as one bulk INSERT inside a transaction instead of a commit per
+    question, and seeds the level's score counters. ``ignore_conflicts``
+    skips rows that already exist, which the level-advance path relies on
+    when a level is re-submitted.
+    """
+    question_ids = AssessmentQuestion.objects.filter(
+        level=level, is_active=True
+    ).values_list("id", flat=True)
+    with transaction.atomic():
+        AssessmentResponse.objects.bulk_create(
+            [
+                AssessmentResponse(
+                    assessment=assessment,
+                    profile_id=assessment.profile_id,
+                    question_id=question_id,
+                )
+                for question_id in question_ids
+            ],
+            batch_size=500,
+            ignore_conflicts=ignore_conflicts,
+        )
+        scoring.refresh_level_scores([assessment.id], [level])
+
+
 def generate_random_otp(Length=7):
     otp = "".join([str(random.randint(0, 9)) for _ in range(Length)])
     return otp
@@ -77,6 +142,7 @@ def generate_random_otp(Length=7):
 class PasswordResetEmailVerifyAPIView(generics.RetrieveAPIView):
     permission_classes = [AllowAny]
     serializer_class = api_serializer.UserSerializer
+    compress = False
 
     def get_object(self):
         email = self.kwargs["email"]  # api/v1/password-email-verify/desphixs@gmail.com/
@@ -88,27 +154,22 @@ class PasswordResetEmailVerifyAPIView(generics.RetrieveAPIView):
             refresh = RefreshToken.for_user(user)
             refresh_token = str(refresh.access_token)
 
-            user.refresh_token = refresh_token
-            user.otp = generate_random_otp()
-            user.save()
-
-            link = f"http://localhost:5173/create-new-password/?otp={user.otp}&uuidb64={uuidb64}&refresh_token={refresh_token}"
-
-            context = {"link": link, "username": user.username}
-
-            subject = "Password Rest Email"
-            text_body = render_to_string("email/password_reset.txt", context)
-            html_body = render_to_string("email/password_reset.html", context)
-
-            msg = EmailMultiAlternatives(
-                subject=subject,
-                from_email=settings.FROM_EMAIL,
-                to=[user.email],
-                body=text_body,
-            )
-
-            msg.attach_alternative(html_body, "text/html")
-            msg.send()
+            # The email is queued with the OTP it carries and sent by the
+            # send_outbox worker, so a slow mail provider never holds up
+            # this request.
+            with transaction.atomic():
+                user.refresh_token = refresh_token
+                user.otp = generate_random_otp()
+                user.save(update_fields=["refresh_token", "otp"])
+
+                link = f"http://localhost:5173/create-new-password/?otp={user.otp}&uuidb64={uuidb64}&refresh_token={refresh_token}"
+                context = {"link": link, "username": user.username}
+                outbox.enqueue(
+                    to=user.email,
+                    subject="Password Rest Email",
+                    body=render_to_string("email/password_reset.txt", context),
+                    html_body=render_to_string("email/password_reset.html", context),
+                )
 
             print("link ======", link)
         return user
@@ -127,7 +188,7 @@ class PasswordChangeAPIView(generics.CreateAPIView):
         if user:
             user.set_password(password)
             user.otp = ""
-            user.save()
+            user.save(update_fields=["password", "otp"])
 
             return Response(
                 {"message": "Password changed successfully"},
@@ -156,14 +217,151 @@ class SubmitResponsesAPIView(APIView):
 class AssessmentQuestionListView(generics.ListAPIView):
     serializer_class = api_serializer.AssessmentQuestionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = CLAIMS_AUTHENTICATION
+    query_budget = 4
 
     def get_queryset(self):
         level = self.request.query_params.get("level")
-        return AssessmentQuestion.objects.filter(level=level)
+        return AssessmentQuestion.objects.filter(
+            level=level, is_active=True
+        ).prefetch_related("choices")
+
+    def list(self, request, *args, **kwargs):
+        # The bank is shared by every candidate; serve the pre-rendered bytes.
+        level = request.query_params.get("level")
+        version = question_bank.current_version()
+        etag = conditional.etag("questions", level, version)
+        not_modified = conditional.not_modified(request, etag)
+        if not_modified:
+            return not_modified
+        version, body = question_bank.get_level_payload(level, version)
+        response = HttpResponse(body, content_type="application/json")
+        response.precompressed = functools.partial(
+            question_bank.get_encoded_payload, level, version
+        )
+        return conditional.tag(response, etag)
+
+
+def save_response(assessment, profile, question, selected_choice, text_response):
+    """Upsert one answer and adjust its level counters; return the response id."""
+    values = {
+        "selected_choice": selected_choice,
+        "text_response": text_response,
+        "is_correct": selected_choice.is_correct if selected_choice else None,
+    }
+
+    with transaction.atomic():
+        existing = (
+            AssessmentResponse.objects.select_for_update()
+            .filter(assessment=assessment, question=question)
+            .values_list("id", "selected_choice_id", "is_correct")
+            .first()
+        )
+        if existing:
+            response_id = existing[0]
+            submitted_at = timezone.now()
+            AssessmentResponse.objects.filter(id=response_id).update(
+                profile=profile, submitted_at=submitted_at, **values
+            )
+        else:
+            response = AssessmentResponse.objects.create(
+                assessment=assessment, profile=profile, question=question, **values
+            )
+            response_id, submitted_at = response.id, response.submitted_at
+
+        after = (
+            selected_choice.id if selected_choice else None,
+            values["is_correct"],
+        )
+        scoring.apply_answer_deltas(
+            assessment.id,
+            question.level,
+            [scoring.answer_delta(existing[1:] if existing else None, after)],
+            submitted_at=submitted_at if selected_choice else None,
+        )
+    return response_id
+
+
+def build_bulk_responses(assessment, questions, items):
+    """Return unsaved responses for ``items`` and the questions with bad choices.
+
+    ``questions`` maps id to question with its choices prefetched.
+    """
+    rows = []
+    invalid_choices = []
+    for item in items:
+        question = questions[item["question"]]
+        selected_choice = None
+        if item.get("selected_choice"):
+            selected_choice = next(
+                (
+                    choice
+                    for choice in question.choices.all()
+                    if choice.id == item["selected_choice"]
+                ),
+                None,
+            )
+            if not selected_choice:
+                invalid_choices.append(item["question"])
+                continue
+
+        rows.append(
+            AssessmentResponse(
+                assessment=assessment,
+                profile=assessment.profile,
+                question=question,
+                selected_choice=selected_choice,
+                text_response=item.get("text_response"),
+                is_correct=(selected_choice.is_correct if selected_choice else None),
+            )
+        )
+    return rows, invalid_choices
+
+
+def save_bulk_responses(assessment, questions, rows):
+    with transaction.atomic():
+        existing = {
+            question_id: (selected_choice_id, is_correct)
+            for question_id, selected_choice_id, is_correct in (
+                AssessmentResponse.objects.select_for_update()
+                .filter(assessment=assessment, question_id__in=questions)
+                .values_list("question_id", "selected_choice_id", "is_correct")
+            )
+        }
+        AssessmentResponse.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["assessment", "question"],
+            # submitted_at is the time of the latest answer, so rewrite it too.
+            update_fields=[
+                "selected_choice",
+                "text_response",
+                "is_correct",
+                "submitted_at",
+            ],
+        )
+        scoring.apply_answer_deltas(
+            assessment.id,
+            assessment.current_level,
+            [
+                scoring.answer_delta(
+                    existing.get(row.question_id),
+                    (row.selected_choice_id, row.is_correct),
+                )
+                for row in rows
+            ],
+            # bulk_create stamped each row's submitted_at.
+            submitted_at=max(
+                (row.submitted_at for row in rows if row.selected_choice_id),
+                default=None,
+            ),
+        )
 
 
 class AssessmentResponseSubmitView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = CLAIMS_AUTHENTICATION
+    query_budget = 9
 
     def post(self, request, *args, **kwargs):
         data = request.data
@@ -186,7 +384,9 @@ class AssessmentResponseSubmitView(APIView):
 
         assessment = Assessment.objects.filter(id=assessment_id).first()
         profile = Profile.objects.filter(id=profile_id).first()
-        question = AssessmentQuestion.objects.filter(id=question_id).first()
+        question = AssessmentQuestion.objects.filter(
+            id=question_id, is_active=True
+        ).first()
 
         if not assessment or not profile or not question:
             return Response(
@@ -205,21 +405,91 @@ class AssessmentResponseSubmitView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-        response, _ = AssessmentResponse.objects.update_or_create(
-            assessment=assessment,
-            profile=profile,
-            question=question,
-            defaults={
-                "selected_choice": selected_choice,
-                "text_response": text_response,
-                "is_correct": selected_choice.is_correct if selected_choice else None,
-            },
+        response_id = save_response(
+            assessment, profile, question, selected_choice, text_response
         )
 
         return Response(
             {
                 "message": "Response submitted successfully.",
-                "response_id": response.id,
+                "response_id": response_id,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class AssessmentResponseBulkSubmitView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = CLAIMS_AUTHENTICATION
+    # Clearing an answer recounts the level: three more queries.
+    query_budget = 11
+
+    def post(self, request, *args, **kwargs):
+        serializer = api_serializer.BulkResponseSubmitSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        payload = serializer.validated_data
+
+        assessment = (
+            Assessment.objects.select_related("profile")
+            .filter(id=payload["assessment"])
+            .first()
+        )
+        if not assessment:
+            return Response(
+                {"detail": "Assessment not found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        if assessment.profile.user_id != request.user.id:
+            return Response(
+                {"detail": "You are not allowed to answer this assessment."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        if assessment.completed_at:
+            return Response(
+                {"detail": "Assessment already completed."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        items = payload["responses"]
+        questions = {
+            question.id: question
+            for question in AssessmentQuestion.objects.filter(
+                id__in=[item["question"] for item in items],
+                level=assessment.current_level,
+                is_active=True,
+            ).prefetch_related("choices")
+        }
+
+        invalid_questions = [
+            item["question"] for item in items if item["question"] not in questions
+        ]
+        if invalid_questions:
+            return Response(
+                {
+                    "detail": "Questions do not belong to the current level.",
+                    "invalid_questions": invalid_questions,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rows, invalid_choices = build_bulk_responses(assessment, questions, items)
+        if invalid_choices:
+            return Response(
+                {
+                    "detail": "Selected choice is invalid for these questions.",
+                    "invalid_questions": invalid_choices,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        save_bulk_responses(assessment, questions, rows)
+
+        return Response(
+            {
+                "message": "Responses submitted successfully.",
+                "saved": len(rows),
             },
             status=status.HTTP_200_OK,
         )
@@ -227,17 +497,35 @@ class AssessmentResponseSubmitView(APIView):
 
 class UserProfileView(APIView):
     permission_classes = [IsAuthenticated]
+    authentication_classes = CLAIMS_AUTHENTICATION
+    query_budget = 1
 
     def get(self, request):
-        profile = Profile.objects.get(user=request.user)
-        serializer = api_serializer.ProfileSerializer(profile)
-        return Response(serializer.data)
+        entry = profiles.for_request(request)
+        if entry is None:
+            return Response(
+                {"detail": "Profile not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        profile = entry["profile"]
+        etag = conditional.etag(
+            "profile", profile["id"], profile["updated_at"].timestamp()
+        )
+        not_modified = conditional.not_modified(request, etag)
+        if not_modified:
+            return not_modified
+        return conditional.tag(Response(profile), etag)
 
 
 class UserMeAPIView(APIView):
     permission_classes = [IsAuthenticated]
+    authentication_classes = CLAIMS_AUTHENTICATION
+    # A token without claims looks the user up before the profile cache fills.
+    query_budget = 2
 
     def get(self, request):
+        entry = profiles.for_request(request)
+        if entry is not None:
+            return Response(entry["user"])
         return Response(
             {
                 "id": request.user.id,
@@ -250,22 +538,25 @@ class UserMeAPIView(APIView):
 
 class StartAssessmentAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = CLAIMS_AUTHENTICATION
+    query_budget = 12
 
     def post(self, request, *args, **kwargs):
-        profile = Profile.objects.get(user=request.user)
-
-        # Create a new assessment starting at level 1
-        assessment = Assessment.objects.create(profile=profile, current_level="1")
+        profile_id = profile_id_for(request.user)
+        if profile_id is None:
+            return Response(
+                {"detail": "Profile not found."}, status=status.HTTP_404_NOT_FOUND
+            )
 
-        # Prepopulate responses for level 1
-        questions = AssessmentQuestion.objects.filter(level="1")
-        for question in questions:
-            AssessmentResponse.objects.create(
-                assessment=assessment,
-                profile=profile,
-                question=question,
+        with transaction.atomic():
+            # Create a new assessment starting at level 1
+            assessment = Assessment.objects.create(
+                profile_id=profile_id, current_level="1"
             )
 
+            # Prepopulate responses for level 1
+            prepopulate_level_responses(assessment, "1")
+
         return Response(
             {
                 "assessment_id": assessment.id,
@@ -277,17 +568,23 @@ class StartAssessmentAPIView(APIView):
 
 class SubmitAssessmentAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = CLAIMS_AUTHENTICATION
+    query_budget = 15
 
     def post(self, request, *args, **kwargs):
         assessment_id = request.data.get("assessment_id")
-        assessment = Assessment.objects.filter(id=assessment_id).first()
+        assessment = (
+            Assessment.objects.select_related("profile")
+            .filter(id=assessment_id)
+            .first()
+        )
         if not assessment:
             return Response(
                 {"detail": "Assessment not found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        if assessment.profile.user != request.user:
+        if assessment.profile.user_id != request.user.id:
             return Response(
                 {"detail": "You are not allowed to submit this assessment."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -304,30 +601,20 @@ class SubmitAssessmentAPIView(APIView):
 
         current_level = assessment.current_level
 
-        print(f"Assessment ID: {assessment.id}")
-        print(f"Current Level: {current_level}")
+        # Read the score for the current level from its running counters
+        counter = AssessmentLevelScore.objects.filter(
+            assessment=assessment, level=current_level
+        ).first()
 
-        # Calculate the score for the current level
-        responses = AssessmentResponse.objects.filter(
-            assessment=assessment, question__level=current_level
-        )
-        print(f"Total Responses: {responses.count()}")
-        for response in responses:
-            print(
-                f"Response ID: {response.id}, Question Level: {response.question.level}"
-            )
-        total_questions = responses.count()
-        print("🤣", total_questions)
-        correct_answers = responses.filter(is_correct=True).count()
-
-        if total_questions == 0:
+        if not counter or not counter.total_count:
             return Response(
                 {"message": "No responses found for the current level."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        score = (correct_answers / total_questions) * 100
-        passed = score >= 60
+        level_score = scoring.score_from_counter(counter)
+        score = level_score["score"]
+        passed = level_score["passed"]
 
         # Save or update latest result record for this profile+level
         existing_result = (
@@ -336,14 +623,14 @@ class SubmitAssessmentAPIView(APIView):
             .first()
         )
         if existing_result:
-            existing_result.score = round(score, 2)
+            existing_result.score = score
             existing_result.passed = passed
             existing_result.save(update_fields=["score", "passed"])
         else:
             Result.objects.create(
                 profile=assessment.profile,
                 level=current_level,
-                score=round(score, 2),
+                score=score,
                 passed=passed,
             )
 
@@ -356,7 +643,7 @@ class SubmitAssessmentAPIView(APIView):
                     {
                         "message": "Assessment completed. All levels passed!",
                         "level": current_level,
-                        "score": round(score, 2),
+                        "score": score,
                         "passed": True,
                         "next_level": None,
                         "completed": True,
@@ -365,23 +652,20 @@ class SubmitAssessmentAPIView(APIView):
                 )
             else:
                 next_level = str(int(current_level) + 1)
-                assessment.current_level = next_level
-                assessment.save()
+                with transaction.atomic():
+                    assessment.current_level = next_level
+                    assessment.save()
 
-                # Prepopulate responses for the next level
-                questions = AssessmentQuestion.objects.filter(level=next_level)
-                for question in questions:
-                    AssessmentResponse.objects.get_or_create(
-                        assessment=assessment,
-                        profile=assessment.profile,
-                        question=question,
+                    # Prepopulate responses for the next level
+                    prepopulate_level_responses(
+                        assessment, next_level, ignore_conflicts=True
                     )
 
                 return Response(
                     {
                         "message": f"Level {current_level} passed. Proceed to Level {next_level}.",
                         "level": current_level,
-                        "score": round(score, 2),
+                        "score": score,
                         "passed": True,
                         "next_level": next_level,
                         "completed": False,
@@ -396,7 +680,7 @@ class SubmitAssessmentAPIView(APIView):
                 {
                     "message": f"Level {current_level} failed. Assessment ended.",
                     "level": current_level,
-                    "score": round(score, 2),
+                    "score": score,
                     "passed": False,
                     "next_level": None,
                     "completed": True,
@@ -407,201 +691,354 @@ class SubmitAssessmentAPIView(APIView):
 
 class AssessmentResultsAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = CLAIMS_AUTHENTICATION
+    query_budget = 4
+    read_replica = True
+    item_fields = dict.fromkeys(("level", "score", "passed", "date", "feedback"), ())
 
     def get(self, request, *args, **kwargs):
-        profile = Profile.objects.filter(user=request.user).first()
-        if not profile:
+        try:
+            fields = fieldsets.parse_fields(
+                request.query_params.get("fields"), self.item_fields
+            )
+        except fieldsets.InvalidFields as exc:
+            return Response(
+                {"detail": f"Unknown field: {exc}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        profile_id = profile_id_for(request.user)
+        if not profile_id:
             return Response({"results": []}, status=status.HTTP_200_OK)
 
+        etag = conditional.results_etag(profile_id)
+        not_modified = conditional.not_modified(request, etag)
+        if not_modified:
+            return not_modified
+
         latest_assessment = (
-            Assessment.objects.filter(profile=profile)
+            Assessment.objects.filter(profile_id=profile_id)
             .order_by("-completed_at", "-started_at", "-id")
             .first()
         )
 
         if not latest_assessment:
-            return Response({"results": []}, status=status.HTTP_200_OK)
-
-        payload = []
-        for level in ["1", "2", "3"]:
-            responses = AssessmentResponse.objects.filter(
-                assessment=latest_assessment,
-                question__level=level,
-                selected_choice__isnull=False,
-            )
-            total_questions = responses.count()
-            if total_questions == 0:
-                continue
+            return conditional.tag(
+                Response({"results": []}, status=status.HTTP_200_OK), etag
+            )
 
-            correct_answers = responses.filter(is_correct=True).count()
-            score = round((correct_answers / total_questions) * 100, 2)
-            passed = score >= 60
-            last_response = responses.order_by("-submitted_at").first()
+        counters = AssessmentLevelScore.objects.filter(
+            assessment=latest_assessment, answered_count__gt=0
+        ).order_by("level")
 
-            payload.append(
-                {
-                    "level": level,
-                    "score": score,
-                    "passed": passed,
-                    "date": (last_response.submitted_at if last_response else None),
-                    "feedback": None,
-                }
-            )
+        payload = []
+        for counter in counters:
+            level = counter.level
+            level_score = scoring.score_from_counter(counter, answered_only=True)
+            row = {
+                "level": level,
+                "score": level_score["score"],
+                "passed": level_score["passed"],
+                "date": level_score["last_submitted_at"],
+                "feedback": None,
+            }
+            # Results are at most one row per level, so only the output
+            # is narrowed.
+            payload.append(fieldsets.pick(row, fields))
 
-        return Response({"results": payload}, status=status.HTTP_200_OK)
+        return conditional.tag(
+            Response({"results": payload}, status=status.HTTP_200_OK), etag
+        )
 
 
 class AssessmentHistoryAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = CLAIMS_AUTHENTICATION
+    query_budget = 4
+    read_replica = True
+    default_page_size = 10
+    max_page_size = 50
+    # Attempts scored and reviewed per batch of a streamed response.
+    stream_chunk_size = 100
+
+    item_fields = {
+        "assessment_id": (),
+        "started_at": (),
+        "completed_at": (),
+        "level_results": ("level", "score", "passed", "date"),
+        "question_review": (
+            "question_id",
+            "level",
+            "question",
+            "selected_answer",
+            "correct_answer",
+            "is_correct",
+            "submitted_at",
+        ),
+    }
+    # question_review key -> AssessmentResponse.values() column
+    review_columns = {
+        "question_id": "question_id",
+        "level": "question__level",
+        "question": "question__text",
+        "selected_answer": "selected_choice__text",
+        "correct_answer": "correct_answer",
+        "is_correct": "is_correct",
+        "submitted_at": "submitted_at",
+    }
 
     def get(self, request, *args, **kwargs):
-        profile = Profile.objects.filter(user=request.user).first()
-        if not profile:
-            return Response({"history": []}, status=status.HTTP_200_OK)
+        profile_id = profile_id_for(request.user)
+        if not profile_id:
+            return Response(
+                {"history": [], "next_cursor": None}, status=status.HTTP_200_OK
+            )
+
+        try:
+            fields = fieldsets.parse_fields(
+                request.query_params.get("fields"), self.item_fields
+            )
+        except fieldsets.InvalidFields as exc:
+            return Response(
+                {"detail": f"Unknown field: {exc}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        include_review = request.query_params.get("include_review", "1").lower()
+        if include_review in ("0", "false", "no"):
+            fields.pop("question_review", None)
 
-        assessments = Assessment.objects.filter(profile=profile).order_by(
-            "-started_at", "-id"
+        # Only attempts with at least one answered question appear in history.
+        answered = AssessmentResponse.objects.filter(
+            assessment=OuterRef("pk"), selected_choice__isnull=False
         )
+        assessments = (
+            Assessment.objects.filter(profile_id=profile_id)
+            .filter(Exists(answered))
+            .only(*self.assessment_columns(fields))
+        )
+        cursor = request.query_params.get("cursor")
 
-        history = []
-        for assessment in assessments:
-            responses = (
-                AssessmentResponse.objects.filter(assessment=assessment)
-                .select_related("question", "selected_choice")
-                .order_by("question__level", "id")
+        if request.query_params.get("stream", "").lower() in ("1", "true", "yes"):
+            # Every attempt from the cursor on, without a page size.
+            try:
+                assessments = pagination.keyset_filter(
+                    assessments, "started_at", cursor
+                )
+            except pagination.InvalidCursor:
+                return Response(
+                    {"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST
+                )
+            if isinstance(request._request, ASGIRequest):
+                content = self.astream(assessments, fields)
+            else:
+                content = self.stream(assessments, fields)
+            return StreamingHttpResponse(content, content_type="application/json")
+
+        limit = pagination.parse_limit(
+            request.query_params.get("limit"),
+            self.default_page_size,
+            self.max_page_size,
+        )
+        try:
+            assessments, next_cursor = pagination.keyset_page(
+                assessments, "started_at", cursor, limit
+            )
+        except pagination.InvalidCursor:
+            return Response(
+                {"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST
             )
 
-            if not responses.exists():
-                continue
+        return Response(
+            {
+                "history": self.history_items(assessments, fields),
+                "next_cursor": next_cursor,
+            },
+            status=status.HTTP_200_OK,
+        )
 
-            question_ids = [response.question_id for response in responses]
-            correct_choice_map = {
-                choice.question_id: choice.text
-                for choice in Choice.objects.filter(
-                    question_id__in=question_ids, is_correct=True
-                )
-            }
+    def assessment_columns(self, fields):
+        columns = ["id", "started_at"]
+        if "completed_at" in fields or "date" in fields.get("level_results", ()):
+            columns.append("completed_at")
+        return columns
+
+    def stream(self, assessments, fields):
+        """Yield the history document, holding one batch of attempts at a time.
+
+        The rows are read while the response is sent, after the middleware
+        has returned, so they come from the primary database.
+        """
+        yield b'{"history":['
+        separator = b""
+        rows = assessments.iterator(chunk_size=self.stream_chunk_size)
+        while True:
+            batch = list(itertools.islice(rows, self.stream_chunk_size))
+            if not batch:
+                break
+            items = self.history_items(batch, fields)
+            yield separator + b",".join(renderers.dumps(item) for item in items)
+            separator = b","
+        yield b'],"next_cursor":null}'
+
+    async def astream(self, assessments, fields):
+        """``stream`` for ASGI, which would otherwise buffer a sync iterator whole.
+
+        Each batch is built on the request's thread-sensitive worker thread,
+        so the database cursor stays on one connection.
+        """
+        chunks = self.stream(assessments, fields)
+        produce = sync_to_async(next)
+        try:
+            while True:
+                chunk = await produce(chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            await sync_to_async(chunks.close)()
+
+    def history_items(self, assessments, fields):
+        assessment_ids = [assessment.id for assessment in assessments]
+        scores = {}
+        if "level_results" in fields:
+            scores = scoring.score_assessments(assessment_ids, answered_only=True)
+        reviews = {}
+        if "question_review" in fields:
+            reviews = self.question_reviews(assessment_ids, fields["question_review"])
 
-            level_results = []
-            for level in ["1", "2", "3"]:
-                level_responses = responses.filter(
-                    question__level=level, selected_choice__isnull=False
+        history = []
+        for assessment in assessments:
+            item = {}
+            if "assessment_id" in fields:
+                item["assessment_id"] = assessment.id
+            if "started_at" in fields:
+                item["started_at"] = assessment.started_at
+            if "completed_at" in fields:
+                item["completed_at"] = assessment.completed_at
+            if "level_results" in fields:
+                item["level_results"] = self.level_results(
+                    assessment, scores, fields["level_results"]
                 )
-                total_questions = level_responses.count()
-                if total_questions == 0:
-                    continue
-                correct_answers = level_responses.filter(is_correct=True).count()
-                score = round((correct_answers / total_questions) * 100, 2)
-                passed = score >= 60
-                last_level_response = level_responses.order_by("-submitted_at").first()
-
-                level_results.append(
-                    {
-                        "level": level,
-                        "score": score,
-                        "passed": passed,
-                        "date": (
-                            last_level_response.submitted_at
-                            if last_level_response
-                            else assessment.completed_at
-                        ),
-                    }
+            if "question_review" in fields:
+                item["question_review"] = reviews.get(assessment.id, [])
+            history.append(item)
+        return history
+
+    def level_results(self, assessment, scores, keys):
+        level_results = []
+        for level in scoring.LEVELS:
+            level_score = scores.get((assessment.id, level))
+            if not level_score:
+                continue
+
+            row = {
+                "level": level,
+                "score": level_score["score"],
+                "passed": level_score["passed"],
+            }
+            if "date" in keys:
+                row["date"] = (
+                    level_score["last_submitted_at"] or assessment.completed_at
                 )
+            level_results.append(fieldsets.pick(row, keys))
+        return level_results
 
-            if not level_results:
-                continue
+    def question_reviews(self, assessment_ids, keys):
+        rows = AssessmentResponse.objects.filter(
+            assessment_id__in=assessment_ids, selected_choice__isnull=False
+        )
+        if "correct_answer" in keys:
+            correct_answer = Choice.objects.filter(
+                question=OuterRef("question_id"), is_correct=True
+            ).values("text")[:1]
+            rows = rows.annotate(correct_answer=Subquery(correct_answer))
+        rows = rows.order_by("assessment_id", "question__level", "id").values(
+            "assessment_id", *(self.review_columns[key] for key in keys)
+        )
 
-            history.append(
-                {
-                    "assessment_id": assessment.id,
-                    "started_at": assessment.started_at,
-                    "completed_at": assessment.completed_at,
-                    "level_results": level_results,
-                    "question_review": [
-                        {
-                            "question_id": response.question.id,
-                            "level": response.question.level,
-                            "question": response.question.text,
-                            "selected_answer": (
-                                response.selected_choice.text
-                                if response.selected_choice
-                                else None
-                            ),
-                            "correct_answer": correct_choice_map.get(
-                                response.question_id
-                            ),
-                            "is_correct": response.is_correct,
-                            "submitted_at": response.submitted_at,
-                        }
-                        for response in responses
-                        if response.selected_choice
-                    ],
-                }
+        reviews = {}
+        for row in rows:
+            reviews.setdefault(row["assessment_id"], []).append(
+                {key: row[self.review_columns[key]] for key in keys}
             )
+        return reviews
+
+
+def build_telemetry_event(user, payload):
+    return UxTelemetryEvent(
+        user_id=user.id,
+        event_type=payload.get("event_type"),
+        stage=payload.get("stage") or "",
+        level=payload.get("level") or "",
+        assessment_id=payload.get("assessment_id"),
+        time_left=payload.get("time_left"),
+        details=payload.get("details") or {},
+    )
+
+
+def record_telemetry(user, payloads):
+    events = [build_telemetry_event(user, payload) for payload in payloads]
+    if not telemetry.record_events(events):
+        response = Response(
+            {"detail": "Telemetry is busy. Retry later."},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+        response["Retry-After"] = "5"
+        return response
 
-        return Response({"history": history}, status=status.HTTP_200_OK)
+    logger.debug(
+        "ux_telemetry_events user_id=%s count=%s event_types=%s",
+        user.id,
+        len(events),
+        ",".join(event.event_type for event in events),
+    )
+    return Response(
+        {"status": "accepted", "accepted": len(events)},
+        status=status.HTTP_202_ACCEPTED,
+    )
 
 
 class UxTelemetryEventAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = CLAIMS_AUTHENTICATION
+    query_budget = 2
 
     def post(self, request, *args, **kwargs):
         serializer = api_serializer.UxTelemetryEventSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        return record_telemetry(request.user, [serializer.validated_data])
 
-        payload = serializer.validated_data
-        event = UxTelemetryEvent.objects.create(
-            user=request.user,
-            event_type=payload.get("event_type"),
-            stage=payload.get("stage") or "",
-            level=payload.get("level") or "",
-            assessment_id=payload.get("assessment_id"),
-            time_left=payload.get("time_left"),
-            details=payload.get("details") or {},
-        )
 
-        logger.info(
-            "ux_telemetry_event user_id=%s event_type=%s stage=%s level=%s assessment_id=%s time_left=%s details=%s",
-            request.user.id,
-            event.event_type,
-            event.stage,
-            event.level,
-            event.assessment_id,
-            event.time_left,
-            event.details,
-        )
+class UxTelemetryEventBatchAPIView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = CLAIMS_AUTHENTICATION
+    query_budget = 3
 
-        return Response({"status": "accepted"}, status=status.HTTP_202_ACCEPTED)
+    def post(self, request, *args, **kwargs):
+        serializer = api_serializer.UxTelemetryEventBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return record_telemetry(request.user, serializer.validated_data["events"])
 
 
 class UxTelemetrySummaryAPIView(APIView):
     permission_classes = [IsAdminUser]
+    query_budget = 7
+    read_replica = True
 
     def get(self, request, *args, **kwargs):
-        events = UxTelemetryEvent.objects.all()
-
-        event_counts = {
-            row["event_type"]: row["count"]
-            for row in events.values("event_type")
-            .annotate(count=Count("id"))
-            .order_by()
-        }
-
-        stage_counts = {
-            row["stage"]: row["count"]
-            for row in events.exclude(stage="")
-            .values("stage")
-            .annotate(count=Count("id"))
-            .order_by()
-        }
+        summary, as_of = caching.single_flight(
+            "telemetry-summary",
+            settings.TELEMETRY_SUMMARY_CACHE_TTL,
+            self.build_summary,
+            force=request.query_params.get("fresh") == "1",
+        )
+        return Response({**summary, "as_of": as_of}, status=status.HTTP_200_OK)
 
-        level_counts = {
-            row["level"]: row["count"]
-            for row in events.exclude(level="")
-            .values("level")
-            .annotate(count=Count("id"))
-            .order_by()
-        }
+    def build_summary(self):
+        counts = rollups.totals()
+        event_counts = counts["event_counts"]
+        stage_counts = counts["stage_counts"]
+        level_counts = counts["level_counts"]
 
         ready_views = event_counts.get("assessment_ready_viewed", 0)
         starts = event_counts.get("assessment_started", 0)
@@ -615,50 +1052,61 @@ class UxTelemetrySummaryAPIView(APIView):
             event_counts.items(), key=lambda item: item[1], reverse=True
         )[:8]
 
-        last_event = events.order_by("-created_at", "-id").first()
+        # Newest rows by primary key, which tracks insertion order.
         recent_events = list(
-            events.values("created_at", "user_id", "event_type", "stage", "level")[:20]
+            UxTelemetryEvent.objects.order_by("-id").values(
+                "created_at", "user_id", "event_type", "stage", "level"
+            )[:20]
         )
 
-        return Response(
-            {
-                "total_events": events.count(),
-                "distinct_users": events.values("user_id").distinct().count(),
-                "last_event_at": last_event.created_at if last_event else None,
-                "event_counts": event_counts,
-                "stage_counts": stage_counts,
-                "level_counts": level_counts,
-                "top_events": [
-                    {"event_type": event_type, "count": count}
-                    for event_type, count in top_events
-                ],
-                "funnel": {
-                    "ready_views": ready_views,
-                    "starts": starts,
-                    "completions": completions,
-                    "start_rate_from_ready": _safe_percent(starts, ready_views),
-                    "completion_rate_from_start": _safe_percent(completions, starts),
-                },
-                "dropoff": {
-                    "failed": failures,
-                    "timed_out": timeouts,
-                    "exit_prompt_opened": exit_prompt_opens,
-                    "exit_confirmed": exit_confirms,
-                    "exit_confirm_rate": _safe_percent(
-                        exit_confirms, exit_prompt_opens
-                    ),
-                },
-                "recent_events": [
-                    {
-                        "at": item["created_at"],
-                        "user_id": item["user_id"],
-                        "event_type": item["event_type"],
-                        "stage": item["stage"],
-                        "level": item["level"],
-                    }
-                    for item in recent_events
-                ],
-                "note": "Telemetry summary is database-backed and persists across restarts.",
+        return {
+            "total_events": counts["total_events"],
+            "distinct_users": counts["distinct_users"],
+            "last_event_at": (
+                recent_events[0]["created_at"] if recent_events else None
+            ),
+            "event_counts": event_counts,
+            "stage_counts": stage_counts,
+            "level_counts": level_counts,
+            "top_events": [
+                {"event_type": event_type, "count": count}
+                for event_type, count in top_events
+            ],
+            "funnel": {
+                "ready_views": ready_views,
+                "starts": starts,
+                "completions": completions,
+                "start_rate_from_ready": _safe_percent(starts, ready_views),
+                "completion_rate_from_start": _safe_percent(completions, starts),
             },
-            status=status.HTTP_200_OK,
-        )
+            "dropoff": {
+                "failed": failures,
+                "timed_out": timeouts,
+                "exit_prompt_opened": exit_prompt_opens,
+                "exit_confirmed": exit_confirms,
+                "exit_confirm_rate": _safe_percent(exit_confirms, exit_prompt_opens),
+            },
+            "recent_events": [
+                {
+                    "at": item["created_at"],
+                    "user_id": item["user_id"],
+                    "event_type": item["event_type"],
+                    "stage": item["stage"],
+                    "level": item["level"],
+                }
+                for item in recent_events
+            ],
+            "rolled_up_at": counts["rolled_up_at"],
+            "note": "Telemetry summary is database-backed and persists across restarts.",
+        }
+
+
+class QueryMetricsAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response({"views": api_middleware.snapshot()}, status=status.HTTP_200_OK)
+
+    def delete(self, request, *args, **kwargs):
+        api_middleware.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
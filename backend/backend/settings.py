@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 from datetime import timedelta
 import os
+import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -22,6 +23,8 @@ from environs import Env
 env = Env()
 env.read_env()
 
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
 
@@ -57,12 +60,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.middleware.QueryMetricsMiddleware",
+    "api.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "api.replica.ReplicaMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -91,13 +97,59 @@ WSGI_APPLICATION = "backend.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# DATABASE_URL selects any database dj-database-url understands; the default is
+# the db.sqlite3 file. DATABASE_PROFILE=production keeps connections open
+# between requests (with health checks) and, for SQLite, switches to WAL with
+# the pragmas below and BEGIN IMMEDIATE transactions; see backend/sqlite/base.py.
+DATABASE_PROFILE = env.str("DATABASE_PROFILE", "default")
+DB_CONN_MAX_AGE = env.int(
+    "DB_CONN_MAX_AGE", 600 if DATABASE_PROFILE == "production" else 0
+)
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+    "default": env.dj_db_url(
+        "DATABASE_URL",
+        default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_MAX_AGE > 0,
+    )
 }
 
+# Optional read replica for history, results, the telemetry summary and admin
+# changelists; see api/replica.py. For SQLite, refresh it with
+# `manage.py sync_replica`.
+REPLICA_DATABASE = "replica" if env.str("DATABASE_REPLICA_URL", "") else None
+if REPLICA_DATABASE:
+    DATABASES[REPLICA_DATABASE] = env.dj_db_url(
+        "DATABASE_REPLICA_URL",
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_MAX_AGE > 0,
+        test_options={"MIRROR": "default"},
+    )
+DATABASE_ROUTERS = ["api.replica.ReplicaRouter"]
+# Seconds a user's reads stay on the primary after they write.
+REPLICA_STICKY_SECONDS = env.int("REPLICA_STICKY_SECONDS", 10)
+
+for database in DATABASES.values():
+    if (
+        DATABASE_PROFILE != "production"
+        or database["ENGINE"] != "django.db.backends.sqlite3"
+    ):
+        continue
+    database["ENGINE"] = "backend.sqlite"
+    database["OPTIONS"] = {
+        # Seconds a connection waits for the write lock before failing.
+        "timeout": env.float("SQLITE_BUSY_TIMEOUT_SECONDS", 5.0),
+        "begin_immediate": True,
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": env.int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024),
+            # Negative sizes are in KiB.
+            "cache_size": -env.int("SQLITE_CACHE_SIZE_KB", 64 * 1024),
+            "temp_store": "MEMORY",
+        },
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -155,7 +207,10 @@ ANYMAIL = {
 }
 
 FROM_EMAIL = os.getenv("FROM_EMAIL")
-EMAIL_BACKEND = "anymail.backends.mailgun.EmailBackend"
+# Use django.core.mail.backends.console.EmailBackend or .filebased.EmailBackend
+# (with EMAIL_FILE_PATH) locally; the test runner swaps in the locmem backend.
+EMAIL_BACKEND = env.str("EMAIL_BACKEND", "anymail.backends.mailgun.EmailBackend")
+EMAIL_FILE_PATH = env.str("EMAIL_FILE_PATH", str(BASE_DIR / "sent_emails"))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -237,4 +292,72 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    # orjson-backed, byte-compatible with JSONRenderer; see api/renderers.py.
+    "DEFAULT_RENDERER_CLASSES": (
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
 }
+
+# Responses at least this large are gzip/brotli compressed when the client
+# accepts it; see api/compression.py. Brotli needs the brotli package.
+COMPRESSION_MIN_BYTES = env.int("COMPRESSION_MIN_BYTES", 1024)
+COMPRESSION_BROTLI_QUALITY = env.int("COMPRESSION_BROTLI_QUALITY", 5)
+
+# UX telemetry is buffered in-process and written in batches; see api/telemetry.py
+# Off under tests, where the writer thread would outlive each test's database.
+TELEMETRY_BUFFER_ENABLED = env.bool("TELEMETRY_BUFFER_ENABLED", not TESTING)
+TELEMETRY_BUFFER_MAX_BATCH = env.int("TELEMETRY_BUFFER_MAX_BATCH", 200)
+TELEMETRY_BUFFER_MAX_AGE_SECONDS = env.float("TELEMETRY_BUFFER_MAX_AGE_SECONDS", 2.0)
+TELEMETRY_BUFFER_MAX_QUEUE = env.int("TELEMETRY_BUFFER_MAX_QUEUE", 10000)
+
+CACHES = {
+    "default": {
+        "BACKEND": env.str(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": env.str("CACHE_LOCATION", ""),
+    }
+}
+
+# Seconds the staff telemetry summary is served from cache before one worker
+# recomputes it; ?fresh=1 bypasses the cache.
+TELEMETRY_SUMMARY_CACHE_TTL = env.int("TELEMETRY_SUMMARY_CACHE_TTL", 30)
+
+# Seconds a worker trusts a cached user lookup for access tokens that predate
+# the profile_id/is_staff claims, and how many users it keeps; see
+# api/authentication.py.
+AUTH_CLAIMS_CACHE_TTL = env.int("AUTH_CLAIMS_CACHE_TTL", 60)
+AUTH_CLAIMS_CACHE_SIZE = env.int("AUTH_CLAIMS_CACHE_SIZE", 10000)
+
+# Seconds the current user/profile payloads stay in the default cache. Saves
+# invalidate them; the TTL only bounds staleness on other workers when the
+# cache is not shared; see api/profiles.py.
+PROFILE_CACHE_TTL = env.int("PROFILE_CACHE_TTL", 300)
+
+# Per-view query counts and timings, exposed at /api/v1/metrics/queries/.
+# Views over their query_budget log a warning, or fail when strict (tests).
+QUERY_METRICS_ENABLED = env.bool("QUERY_METRICS_ENABLED", True)
+QUERY_BUDGET_STRICT = env.bool("QUERY_BUDGET_STRICT", TESTING)
+
+# Blacklisted refresh tokens are checked against a per-worker index; see
+# api/token_index.py. Expired tokens are pruned in the background.
+TOKEN_BLACKLIST_SYNC_SECONDS = env.float("TOKEN_BLACKLIST_SYNC_SECONDS", 1.0)
+TOKEN_BLACKLIST_REBUILD_SECONDS = env.int("TOKEN_BLACKLIST_REBUILD_SECONDS", 300)
+# Ids below the watermark each sync reads again, for rows whose transaction
+# committed after a higher id was already seen.
+TOKEN_BLACKLIST_SYNC_OVERLAP = env.int("TOKEN_BLACKLIST_SYNC_OVERLAP", 1000)
+TOKEN_PRUNE_INTERVAL_SECONDS = env.int(
+    "TOKEN_PRUNE_INTERVAL_SECONDS", 0 if TESTING else 3600
+)
+
+# Emails are queued in the outbox table and sent by `manage.py send_outbox`;
+# see api/outbox.py. Failures back off exponentially until dead-lettered.
+OUTBOX_MAX_ATTEMPTS = env.int("OUTBOX_MAX_ATTEMPTS", 5)
+OUTBOX_RETRY_BASE_SECONDS = env.int("OUTBOX_RETRY_BASE_SECONDS", 30)
+OUTBOX_RETRY_MAX_SECONDS = env.int("OUTBOX_RETRY_MAX_SECONDS", 3600)
+OUTBOX_LEASE_SECONDS = env.int("OUTBOX_LEASE_SECONDS", 300)
+
+# Serve the hot assessment endpoints from the async views in api/async_views.py.
+# Turn on when running under uvicorn (backend/asgi.py); see docs/asgi.md.
+ASYNC_VIEWS = env.bool("ASYNC_VIEWS", False)
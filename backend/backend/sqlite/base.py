@@ -0,0 +1,37 @@
+"""SQLite backend for serving traffic from a single database file.
+
+Two ``OPTIONS`` keys on top of Django's SQLite backend:
+
+``pragmas``
+    ``{name: value}`` run on every new connection, e.g. ``journal_mode=WAL``
+    so readers no longer wait for the writer.
+
+``begin_immediate``
+    Start ``atomic`` blocks with ``BEGIN IMMEDIATE``. A deferred ``BEGIN``
+    that reads and then writes cannot wait on ``busy_timeout`` when another
+    writer got there first: SQLite fails it straight away with "database is
+    locked". Taking the write lock up front makes concurrent writers queue
+    on the timeout instead.
+"""
+
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pragmas", None)
+        params.pop("begin_immediate", None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict["OPTIONS"].get("pragmas", {}).items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.settings_dict["OPTIONS"].get("begin_immediate"):
+            self.cursor().execute("BEGIN IMMEDIATE")
+        else:
+            super()._start_transaction_under_autocommit()
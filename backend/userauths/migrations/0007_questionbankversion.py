@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('userauths', '0006_assessment_assessmentresponse_assessment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionBankVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
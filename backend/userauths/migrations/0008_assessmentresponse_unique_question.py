@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:50
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def remove_duplicate_responses(apps, schema_editor):
+    # Keep the most recent row for each (assessment, question) pair so the
+    # unique constraint below can be created on existing databases.
+    AssessmentResponse = apps.get_model("userauths", "AssessmentResponse")
+    duplicates = (
+        AssessmentResponse.objects.filter(assessment__isnull=False)
+        .values("assessment_id", "question_id")
+        .annotate(keep_id=Max("id"), total=models.Count("id"))
+        .filter(total__gt=1)
+    )
+    for row in duplicates:
+        AssessmentResponse.objects.filter(
+            assessment_id=row["assessment_id"], question_id=row["question_id"]
+        ).exclude(id=row["keep_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('userauths', '0007_questionbankversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_responses, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='assessmentresponse',
+            constraint=models.UniqueConstraint(fields=('assessment', 'question'), name='unique_response_per_assessment_question'),
+        ),
+    ]
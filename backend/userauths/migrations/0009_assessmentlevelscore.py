@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, F, Max, Q
+
+
+def backfill_level_scores(apps, schema_editor):
+    AssessmentResponse = apps.get_model("userauths", "AssessmentResponse")
+    AssessmentLevelScore = apps.get_model("userauths", "AssessmentLevelScore")
+    answered = Q(selected_choice__isnull=False)
+    rows = (
+        AssessmentResponse.objects.filter(assessment__isnull=False)
+        .values("assessment_id", question_level=F("question__level"))
+        .annotate(
+            total=Count("id"),
+            answered=Count("id", filter=answered),
+            correct=Count("id", filter=Q(is_correct=True)),
+            last_submitted_at=Max("submitted_at", filter=answered),
+        )
+        .order_by()
+    )
+    AssessmentLevelScore.objects.bulk_create(
+        (
+            AssessmentLevelScore(
+                assessment_id=row["assessment_id"],
+                level=row["question_level"],
+                total_count=row["total"],
+                answered_count=row["answered"],
+                correct_count=row["correct"],
+                last_submitted_at=row["last_submitted_at"],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('userauths', '0008_assessmentresponse_unique_question'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssessmentLevelScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.CharField(choices=[('1', 'Soft Skills / Professionalism'), ('2', 'Teamwork / Quality of Care'), ('3', 'Ethical Decision-Making')], max_length=1)),
+                ('total_count', models.PositiveIntegerField(default=0)),
+                ('answered_count', models.PositiveIntegerField(default=0)),
+                ('correct_count', models.PositiveIntegerField(default=0)),
+                ('last_submitted_at', models.DateTimeField(blank=True, null=True)),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='level_scores', to='userauths.assessment')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='assessmentlevelscore',
+            constraint=models.UniqueConstraint(fields=('assessment', 'level'), name='unique_score_per_assessment_level'),
+        ),
+        migrations.RunPython(backfill_level_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('userauths', '0009_assessmentlevelscore'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentquestion',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='assessmentquestion',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='assessmentquestion',
+            name='key',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
 
 # --- User and Profile Models ---
 
@@ -32,6 +34,8 @@ class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     full_name = models.CharField(max_length=100)
     date = models.DateTimeField(auto_now_add=True)
+    # Version stamp for the profile endpoint's ETag.
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.full_name or self.user.full_name
@@ -60,6 +64,12 @@ class AssessmentQuestion(models.Model):
     level = models.CharField(max_length=1, choices=QuestionLevel.choices)
     type = models.CharField(max_length=2, choices=QuestionType.choices)
     text = models.TextField()
+    # Identity and fingerprint of the question-pack entry this row was
+    # loaded from; see the ``loadquestions`` command.
+    key = models.CharField(max_length=100, unique=True, null=True, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    # Retired questions stay for past responses but are not asked any more.
+    is_active = models.BooleanField(default=True)
 
     def __str__(self):
         return f"{self.get_level_display()}: {self.text[:50]}"
@@ -76,6 +86,19 @@ class Choice(models.Model):
         return self.text
 
 
+class QuestionBankVersion(models.Model):
+    """Single-row stamp bumped whenever a question or choice changes.
+
+    Workers compare it against the version of their cached question payload,
+    so edits made through any process invalidate every worker's cache.
+    """
+
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Question bank v{self.version}"
+
+
 class Assessment(models.Model):
     profile = models.ForeignKey(
         Profile, on_delete=models.CASCADE, related_name="assessments"
@@ -109,10 +132,46 @@ class AssessmentResponse(models.Model):
     is_correct = models.BooleanField(null=True, blank=True)
     submitted_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["assessment", "question"],
+                name="unique_response_per_assessment_question",
+            )
+        ]
+
     def __str__(self):
         return f"Response by {self.profile.full_name} to Q{self.question.id}"
 
 
+class AssessmentLevelScore(models.Model):
+    """Running answered/correct counters for one level of an assessment.
+
+    Kept in step with ``AssessmentResponse`` writes so results and level
+    submission read a single row instead of aggregating responses.
+    """
+
+    assessment = models.ForeignKey(
+        Assessment, on_delete=models.CASCADE, related_name="level_scores"
+    )
+    level = models.CharField(max_length=1, choices=QuestionLevel.choices)
+    total_count = models.PositiveIntegerField(default=0)
+    answered_count = models.PositiveIntegerField(default=0)
+    correct_count = models.PositiveIntegerField(default=0)
+    last_submitted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["assessment", "level"],
+                name="unique_score_per_assessment_level",
+            )
+        ]
+
+    def __str__(self):
+        return f"Assessment {self.assessment_id} - Level {self.level}: {self.correct_count}/{self.answered_count}"
+
+
 class Result(models.Model):
     profile = models.ForeignKey(
         Profile, on_delete=models.CASCADE, related_name="results"
@@ -143,9 +202,28 @@ def create_user_profile(sender, instance, created, **kwargs):
         Profile.objects.create(user=instance)
 
 
-def save_user_profile(sender, instance, **kwargs):
-    instance.profile.save()
+def save_user_profile(sender, instance, created, update_fields=None, **kwargs):
+    # The profile only copies the username, as its full_name when that is
+    # blank, so saves that leave the username alone never touch it.
+    if created or (update_fields is not None and "username" not in update_fields):
+        return
+    Profile.objects.filter(user=instance, full_name="").update(
+        full_name=instance.username, updated_at=timezone.now()
+    )
+
+
+def bump_question_bank_version(*args, **kwargs):
+    # Bulk operations (bulk_create, queryset.update) skip signals, so callers
+    # using them must call this directly once they are done.
+    updated = QuestionBankVersion.objects.filter(pk=1).update(version=F("version") + 1)
+    if not updated:
+        QuestionBankVersion.objects.get_or_create(pk=1, defaults={"version": 1})
 
 
 post_save.connect(create_user_profile, sender=User)
 post_save.connect(save_user_profile, sender=User)
+
+post_save.connect(bump_question_bank_version, sender=AssessmentQuestion)
+post_delete.connect(bump_question_bank_version, sender=AssessmentQuestion)
+post_save.connect(bump_question_bank_version, sender=Choice)
+post_delete.connect(bump_question_bank_version, sender=Choice)
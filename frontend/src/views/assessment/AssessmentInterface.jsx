@@ -6,6 +6,8 @@ import Sidebar from '../partials/Sidebar';
 
 const LEVEL_TIMER_SECONDS = 60 * 60;
 const TRANSITION_TIMER_SECONDS = 5 * 60;
+const TELEMETRY_FLUSH_INTERVAL_MS = 5000;
+const TELEMETRY_MAX_BATCH = 20;
 
 const AssessmentInterface = () => {
     const axios = useAxios;
@@ -49,6 +51,9 @@ const AssessmentInterface = () => {
     const assessmentIdRef = useRef(currentAssessmentId);
     const timeLeftRef = useRef(timeLeft);
     const transitionTimeLeftRef = useRef(transitionTimeLeft);
+    const telemetryQueueRef = useRef([]);
+    const questionsRef = useRef(questions);
+    const answersRef = useRef(answers);
 
     useEffect(() => {
         stageRef.current = stage;
@@ -56,38 +61,95 @@ const AssessmentInterface = () => {
         assessmentIdRef.current = currentAssessmentId;
         timeLeftRef.current = timeLeft;
         transitionTimeLeftRef.current = transitionTimeLeft;
+        questionsRef.current = questions;
+        answersRef.current = answers;
     }, [
         stage,
         currentLevel,
         currentAssessmentId,
         timeLeft,
-        transitionTimeLeft
+        transitionTimeLeft,
+        questions,
+        answers
     ]);
 
+    // Answers are sent once per level, so save what has been answered
+    // before leaving the level early (timeout or exit).
+    const flushAnswers = useCallback(async () => {
+        const assessmentId = assessmentIdRef.current;
+        const responses = questionsRef.current
+            .map((item, index) => ({
+                question: item.id,
+                selected_choice: answersRef.current[index] ?? null
+            }))
+            .filter((response) => response.selected_choice !== null);
+        if (
+            stageRef.current !== 'level' ||
+            !assessmentId ||
+            !responses.length
+        ) {
+            return;
+        }
+
+        try {
+            await axios.post('/assessment/submit-response/bulk/', {
+                assessment: assessmentId,
+                responses
+            });
+        } catch (error) {
+            console.error('Failed to save answers:', error);
+        }
+    }, [axios]);
+
+    const flushTelemetry = useCallback(async () => {
+        const events = telemetryQueueRef.current;
+        if (!events.length) {
+            return;
+        }
+
+        telemetryQueueRef.current = [];
+        try {
+            await axios.post('/assessment/telemetry/batch/', { events });
+        } catch (error) {
+            console.debug('Telemetry batch failed:', events.length, error);
+        }
+    }, [axios]);
+
     const emitTelemetry = useCallback(
         async (eventType, details = {}) => {
-            try {
-                const currentStage = stageRef.current;
-                await axios.post('/assessment/telemetry/', {
-                    event_type: eventType,
-                    stage: currentStage,
-                    level: currentLevelRef.current,
-                    assessment_id: assessmentIdRef.current,
-                    time_left:
-                        currentStage === 'level'
-                            ? timeLeftRef.current
-                            : currentStage === 'transition'
-                              ? transitionTimeLeftRef.current
-                              : null,
-                    details
-                });
-            } catch (error) {
-                console.debug('Telemetry event failed:', eventType, error);
+            const currentStage = stageRef.current;
+            telemetryQueueRef.current.push({
+                event_type: eventType,
+                stage: currentStage,
+                level: currentLevelRef.current,
+                assessment_id: assessmentIdRef.current,
+                time_left:
+                    currentStage === 'level'
+                        ? timeLeftRef.current
+                        : currentStage === 'transition'
+                          ? transitionTimeLeftRef.current
+                          : null,
+                details
+            });
+
+            if (telemetryQueueRef.current.length >= TELEMETRY_MAX_BATCH) {
+                await flushTelemetry();
             }
         },
-        [axios]
+        [flushTelemetry]
     );
 
+    useEffect(() => {
+        const interval = setInterval(
+            flushTelemetry,
+            TELEMETRY_FLUSH_INTERVAL_MS
+        );
+        return () => {
+            clearInterval(interval);
+            flushTelemetry();
+        };
+    }, [flushTelemetry]);
+
     const showFeedback = (type, text) => {
         setFeedback({ type, text });
     };
@@ -249,6 +311,7 @@ const AssessmentInterface = () => {
                         level: currentLevel
                     });
                     showFeedback('warning', "Time's up for this level.");
+                    flushAnswers();
                     navigate('/profile');
                     return 0;
                 }
@@ -257,7 +320,14 @@ const AssessmentInterface = () => {
         }, 1000);
 
         return () => clearInterval(timer);
-    }, [stage, currentAssessmentId, currentLevel, navigate, emitTelemetry]);
+    }, [
+        stage,
+        currentAssessmentId,
+        currentLevel,
+        navigate,
+        emitTelemetry,
+        flushAnswers
+    ]);
 
     useEffect(() => {
         if (stage !== 'level') {
@@ -424,23 +494,26 @@ const AssessmentInterface = () => {
             return;
         }
 
+        const next = currentIndex + 1;
+        if (next < questions.length) {
+            setFeedback(null);
+            setCurrentIndex(next);
+            return;
+        }
+
         try {
             setFeedback(null);
             setIsSubmitting(true);
 
-            await axios.post('/assessment/submit-response/', {
+            await axios.post('/assessment/submit-response/bulk/', {
                 assessment: currentAssessmentId,
-                profile: profile.id,
-                question: question.id,
-                selected_choice: answer
+                responses: questions.map((item, index) => ({
+                    question: item.id,
+                    selected_choice: answers[index] ?? null
+                }))
             });
 
-            const next = currentIndex + 1;
-            if (next < questions.length) {
-                setCurrentIndex(next);
-            } else {
-                await handleLevelSubmit();
-            }
+            await handleLevelSubmit();
         } catch (error) {
             console.error('Error submitting answer:', error);
             showFeedback(
@@ -458,6 +531,7 @@ const AssessmentInterface = () => {
             total_questions: questions.length
         });
         setShowExitConfirm(false);
+        flushAnswers();
         navigate('/profile');
     };
 
@@ -53,6 +53,14 @@ const StaffDashboardPage = () => {
                     <div className="d-flex align-items-center gap-2 mb-4">
                         <h1 className="h3 mb-0">Staff Dashboard</h1>
                         <span className="badge bg-secondary">Staff only</span>
+                        {telemetrySummary?.as_of && (
+                            <small className="text-muted ms-auto">
+                                Data as of{' '}
+                                {new Date(
+                                    telemetrySummary.as_of
+                                ).toLocaleTimeString()}
+                            </small>
+                        )}
                     </div>
 
                     {loading && <p>Loading staff dashboard...</p>}
@@ -12,6 +12,8 @@ const ProfilePage = () => {
 
     const [results, setResults] = useState([]);
     const [history, setHistory] = useState([]);
+    const [historyCursor, setHistoryCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [loading, setLoading] = useState(true);
     const [loadError, setLoadError] = useState(null);
     const [ariaStatusMessage, setAriaStatusMessage] = useState('');
@@ -27,10 +29,12 @@ const ProfilePage = () => {
 
             setResults(resultsRes.data.results || []);
             setHistory(historyRes.data.history || []);
+            setHistoryCursor(historyRes.data.next_cursor || null);
         } catch (error) {
             console.error('Failed to fetch assessment results:', error);
             setResults([]);
             setHistory([]);
+            setHistoryCursor(null);
             setLoadError(
                 'Unable to load assessment data right now. Please try again.'
             );
@@ -43,6 +47,28 @@ const ProfilePage = () => {
         fetchResults();
     }, [fetchResults]);
 
+    const loadMoreHistory = async () => {
+        if (!historyCursor) {
+            return;
+        }
+
+        try {
+            setLoadingMore(true);
+            const historyRes = await axios.get('/assessment/history/', {
+                params: { cursor: historyCursor }
+            });
+            setHistory((previous) => [
+                ...previous,
+                ...(historyRes.data.history || [])
+            ]);
+            setHistoryCursor(historyRes.data.next_cursor || null);
+        } catch (error) {
+            console.error('Failed to load more quiz history:', error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     useEffect(() => {
         if (loading) {
             setAriaStatusMessage(
@@ -318,6 +344,17 @@ const ProfilePage = () => {
                         ) : (
                             <p>No previous quiz attempts available.</p>
                         )}
+                        {!loading && historyCursor && (
+                            <button
+                                className="btn btn-outline-primary"
+                                disabled={loadingMore}
+                                onClick={loadMoreHistory}
+                            >
+                                {loadingMore
+                                    ? 'Loading...'
+                                    : 'Load More Attempts'}
+                            </button>
+                        )}
                     </section>
                 </div>
             </div>